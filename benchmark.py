@@ -0,0 +1,335 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+benchmark.py: Benchmark suite that generates synthetic corpora and times every stage of the NLP pipeline, saving the
+results as JSON so that the performance of different commits can be compared, and that checks how long the modules take
+to import
+"""
+# import necessary libraries
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from nlp import Nlp
+import nlp_parsers as nlp_par
+import nlp_sentiment
+import taylorviz as tviz
+
+# letters used to spell the synthetic words
+_LETTERS = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+
+# punctuation sometimes attached to the end of a synthetic word, which the parsers have to strip
+_PUNCTUATION = ['', '', '', '', '', '', ',', '.', '!', '?']
+
+# most seconds that importing each module may take, so that short jobs and worker processes start quickly
+IMPORT_BUDGETS = {'nlp': 0.25, 'taylorviz': 0.3}
+
+# libraries that are slow to import, which importing the modules above must not load (only the functions that use
+# them do)
+HEAVY_MODULES = ('matplotlib', 'plotly', 'wordcloud', 'pandas', 'nltk', 'numpy', 'scipy')
+
+
+def synthetic_vocabulary(vocab_size, seed=0):
+    """ Makes up distinct words of realistic lengths
+    Args:
+        vocab_size (int): number of words
+        seed (int): seed of the random number generator
+    Returns:
+        vocabulary (list): the words (str), from the most to the least frequent
+    """
+    assert isinstance(vocab_size, int) and vocab_size > 0, 'The size of the vocabulary must be a positive integer'
+    rng = np.random.default_rng(seed)
+
+    vocabulary = {}
+    while len(vocabulary) < vocab_size:
+        # word lengths roughly follow those of English words
+        for length in rng.poisson(5, vocab_size - len(vocabulary)) + 2:
+            vocabulary[''.join(rng.choice(_LETTERS, length))] = None
+
+    return list(vocabulary)[:vocab_size]
+
+
+def synthetic_words(num_words, vocabulary, zipf=1.1, stop_words=(), stop_fraction=0.3, seed=0):
+    """ Draws the words of a synthetic text, with word frequencies following Zipf's law
+    Args:
+        num_words (int): number of words in the text
+        vocabulary (list): words (str) to draw from, from the most to the least frequent
+        zipf (float): skew of the word frequencies (the frequency of the word of rank r is proportional to r ** -zipf)
+        stop_words (list): optional stop words (str) mixed into the text
+        stop_fraction (float): share of the words that are stop words (if any are given)
+        seed (int): seed of the random number generator
+    Returns:
+        words (np.ndarray): the words (str) of the text in order
+    """
+    rng = np.random.default_rng(seed)
+
+    # probability of drawing each word of the vocabulary
+    weights = np.arange(1, len(vocabulary) + 1, dtype=np.float64) ** -zipf
+    words = np.asarray(vocabulary, dtype=object)[rng.choice(len(vocabulary), num_words, p=weights / weights.sum())]
+
+    if stop_words:
+        is_stop = rng.random(num_words) < stop_fraction
+        words[is_stop] = rng.choice(np.asarray(sorted(stop_words), dtype=object), int(is_stop.sum()))
+
+    return words
+
+
+def generate_corpus(directory, num_docs=4, words_per_doc=100000, vocab_size=50000, zipf=1.1,
+                    formats=('txt', 'csv', 'json'), stop_words=(), words_per_line=12, seed=0):
+    """ Writes a synthetic corpus to files, with every document written in each format
+    Args:
+        directory (str): folder where the files are written
+        num_docs (int): number of documents
+        words_per_doc (int): number of words in each document
+        vocab_size (int): number of distinct words the documents draw from
+        zipf (float): skew of the word frequencies
+        formats (tuple): file formats (str) to write: 'txt', 'csv' (one line per row of a "text" column) and/or 'json'
+        stop_words (list): optional stop words (str) mixed into the documents
+        words_per_line (int): number of words on each line of a document
+        seed (int): seed of the random number generators
+    Returns:
+        files (dict): maps each format to the names of its files (str), one per document
+    """
+    assert all(fmt in ('txt', 'csv', 'json') for fmt in formats), 'The formats must be "txt", "csv" and/or "json"'
+    os.makedirs(directory, exist_ok=True)
+
+    vocabulary = synthetic_vocabulary(vocab_size, seed)
+    rng = np.random.default_rng(seed)
+    files = {fmt: [] for fmt in formats}
+
+    for doc in range(num_docs):
+        words = synthetic_words(words_per_doc, vocabulary, zipf, stop_words, seed=seed + doc + 1)
+
+        # capitalize and punctuate some of the words, as in real text
+        capitalized = rng.random(len(words)) < 0.05
+        words[capitalized] = [word.capitalize() for word in words[capitalized]]
+        words = words + rng.choice(np.asarray(_PUNCTUATION, dtype=object), len(words))
+
+        lines = [' '.join(words[start:start + words_per_line]) for start in range(0, len(words), words_per_line)]
+        stem = os.path.join(directory, 'doc' + str(doc))
+
+        if 'txt' in formats:
+            with open(stem + '.txt', 'w') as text_file:
+                text_file.write('\n'.join(lines) + '\n')
+            files['txt'].append(stem + '.txt')
+        if 'csv' in formats:
+            pd.DataFrame({'text': lines}).to_csv(stem + '.csv', index=False)
+            files['csv'].append(stem + '.csv')
+        if 'json' in formats:
+            pd.DataFrame({'text': lines}).to_json(stem + '.json', orient='records')
+            files['json'].append(stem + '.json')
+
+    return files
+
+
+def time_stage(func, repeat=3):
+    """ Times a stage of the pipeline, keeping its best time
+    Args:
+        func (function): runs the stage once
+        repeat (int): number of times the stage is run
+    Returns:
+        seconds (float): wall time of the fastest run
+        result (object): what the last run returned
+    """
+    best = float('inf')
+    result = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+
+    return best, result
+
+
+def run_benchmarks(sizes=(10000, 100000), num_docs=4, vocab_size=50000, zipf=1.1, repeat=3, workdir=None):
+    """ Times every stage of the pipeline on synthetic corpora of increasing size
+    Args:
+        sizes (tuple): numbers of words per document (int) of the corpora, giving one point of each scaling curve
+        num_docs (int): number of documents in each corpus
+        vocab_size (int): number of distinct words the documents draw from
+        zipf (float): skew of the word frequencies
+        repeat (int): number of times each stage is run (the fastest run is kept)
+        workdir (str): optional folder where the corpora are written (a temporary folder if None)
+    Returns:
+        results (list): one dict per stage and size, with the 'stage', 'words_per_doc', 'tokens' processed,
+                        'seconds' and 'tokens_per_sec'
+    """
+    stop_words = Nlp().stop_words
+    results = []
+
+    with tempfile.TemporaryDirectory(dir=workdir) as directory:
+        for size in sizes:
+            files = generate_corpus(os.path.join(directory, str(size)), num_docs, size, vocab_size, zipf,
+                                    stop_words=stop_words)
+            txt = files['txt'][0]
+            tokens = size
+
+            # the words of the first document at every stage of the pipeline, so that each stage is timed alone
+            words = Nlp._default_parser(txt)
+            clean_words = Nlp._filter_stopwords(words, stop_words)
+            loaded = Nlp()
+            loaded.load_texts(files['txt'], workers=1, use_cache=False)
+
+            stages = {
+                'default_parser': (lambda: Nlp._default_parser(txt), tokens),
+                'default_parser_stream': (lambda: sum(1 for _ in Nlp._default_parser(txt, stream=True)), tokens),
+                'filter_stopwords': (lambda: Nlp._filter_stopwords(words, stop_words), len(words)),
+                'data_results': (lambda: Nlp._data_results(clean_words), len(clean_words)),
+                'custom_parser_csv': (lambda: nlp_par.custom_parser(files['csv'][0], 'text', 'csv'), tokens),
+                'custom_parser_json': (lambda: nlp_par.custom_parser(files['json'][0], 'text', 'json'), tokens),
+                'load_text': (lambda: Nlp().load_text(txt, use_cache=False), tokens),
+                'load_table_csv': (lambda: Nlp().load_table(files['csv'][0]), tokens),
+                'load_texts': (lambda: Nlp().load_texts(files['txt'], use_cache=False), tokens * num_docs),
+                'aload_texts': (lambda: asyncio.run(Nlp().aload_texts(files['txt'], use_cache=False)),
+                                tokens * num_docs),
+                'wordcount_sankey_prep': (lambda: tviz.wordcount_sankey(loaded.data, render=False),
+                                          tokens * num_docs),
+                'sentiment_scores': (lambda: nlp_sentiment.score_corpus(loaded.data['wordcount']), tokens * num_docs)
+            }
+
+            for stage, (func, stage_tokens) in stages.items():
+                seconds, _ = time_stage(func, repeat)
+                results.append({'stage': stage, 'words_per_doc': size, 'tokens': stage_tokens, 'seconds': seconds,
+                                'tokens_per_sec': stage_tokens / seconds if seconds > 0 else None})
+                print('{:<24}{:>12,} words/doc {:>10.4f} s {:>14,.0f} tokens/s'.format(
+                    stage, size, seconds, results[-1]['tokens_per_sec'] or 0))
+
+    return results
+
+
+def import_time(module, repeat=3):
+    """ Times importing a module in a fresh interpreter with python -X importtime
+    Args:
+        module (str): name of the module
+        repeat (int): number of fresh interpreters the module is imported in (the fastest import is kept)
+    Returns:
+        seconds (float): cumulative time of the fastest import, including the modules it imported
+        heavy (list): names of the HEAVY_MODULES (str) that the import loaded
+    """
+    code = 'import sys, {}; print(",".join(name for name in {!r} if name in sys.modules))'.format(module,
+                                                                                                 HEAVY_MODULES)
+    best = float('inf')
+    heavy = []
+
+    for _ in range(repeat):
+        run = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                             check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+        # each line reads "import time: self [us] | cumulative [us] | name", and the module itself is the only
+        # line that isn't indented
+        for line in run.stderr.splitlines():
+            fields = line.split('|')
+            if len(fields) == 3 and fields[2].rstrip() == ' ' + module:
+                best = min(best, int(fields[1]) / 1e6)
+        heavy = [name for name in run.stdout.strip().split(',') if name]
+
+    return best, heavy
+
+
+def check_import_budgets(budgets=None, repeat=3):
+    """ Checks that importing each module stays within its startup budget without loading any heavy library
+    Args:
+        budgets (dict): maps the name of each module (str) to the most seconds its import may take (IMPORT_BUDGETS
+                        if None)
+        repeat (int): number of times each module is imported (the fastest import is kept)
+    Returns:
+        results (list): one dict per module, with the 'module', import 'seconds', 'budget', 'heavy' libraries it
+                        loaded, and whether it is within budget ('ok')
+    """
+    results = []
+
+    for module, budget in (budgets or IMPORT_BUDGETS).items():
+        seconds, heavy = import_time(module, repeat)
+        results.append({'module': module, 'seconds': seconds, 'budget': budget, 'heavy': heavy,
+                        'ok': seconds <= budget and not heavy})
+        print('import {:<19}{:>10.4f} s (budget {:.2f} s){}{}'.format(
+            module, seconds, budget, '  loads ' + ', '.join(heavy) if heavy else '',
+            '' if results[-1]['ok'] else '  OVER BUDGET'))
+
+    return results
+
+
+def environment():
+    """ Describes where the benchmarks ran, so that results from different commits and machines can be told apart
+    Returns:
+        environment (dict): git commit, Python version, platform, number of CPUs and time of the run
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {'commit': commit, 'python': platform.python_version(), 'platform': platform.platform(),
+            'cpus': os.cpu_count(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def compare(results, baseline):
+    """ Prints how the throughput of each stage changed compared to an earlier run
+    Args:
+        results (list): benchmark results of this run
+        baseline (list): benchmark results of the earlier run
+    Returns:
+        speedups (dict): maps each (stage, words per doc) measured in both runs to its speedup (above 1 is faster)
+    """
+    before = {(result['stage'], result['words_per_doc']): result['seconds'] for result in baseline}
+    speedups = {}
+
+    for result in results:
+        key = (result['stage'], result['words_per_doc'])
+        if key in before and result['seconds'] > 0:
+            speedups[key] = before[key] / result['seconds']
+            print('{:<24}{:>12,} words/doc {:>8.2f}x'.format(key[0], key[1], speedups[key]))
+
+    return speedups
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark every stage of the NLP pipeline on synthetic corpora')
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000],
+                            help='numbers of words per document, one corpus each')
+    arg_parser.add_argument('--docs', type=int, default=4, help='number of documents in each corpus')
+    arg_parser.add_argument('--vocab', type=int, default=50000, help='number of distinct words')
+    arg_parser.add_argument('--zipf', type=float, default=1.1, help='skew of the word frequencies')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='number of runs of each stage (the best is kept)')
+    arg_parser.add_argument('--output', default='benchmark.json', help='JSON file where the results are saved')
+    arg_parser.add_argument('--compare', help='JSON file of an earlier run to compare the results against')
+    arg_parser.add_argument('--imports-only', action='store_true',
+                            help='only check the import time budgets, without timing the pipeline')
+    args = arg_parser.parse_args()
+
+    # the run fails if a module got slower to import or started loading a heavy library
+    imports = check_import_budgets(repeat=args.repeat)
+    if args.imports_only:
+        sys.exit(0 if all(result['ok'] for result in imports) else 1)
+
+    results = run_benchmarks(tuple(args.sizes), args.docs, args.vocab, args.zipf, args.repeat)
+
+    report = {'environment': environment(), 'settings': {'sizes': args.sizes, 'docs': args.docs, 'vocab': args.vocab,
+                                                         'zipf': args.zipf, 'repeat': args.repeat},
+              'imports': imports, 'results': results}
+    with open(args.output, 'w') as output:
+        json.dump(report, output, indent=2)
+    print('Results saved to', args.output)
+
+    if args.compare is not None:
+        with open(args.compare) as baseline:
+            compare(results, json.load(baseline)['results'])
+
+    if not all(result['ok'] for result in imports):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
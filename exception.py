@@ -10,14 +10,14 @@ exception.py: A set of framework-specific exception classes
 
 class DataResultsError(Exception):
     """ A user-defined exception for signaling an issue with creating a dictionary containing the word frequencies,
-    overall word count, world length list, and average word lengths of a file
+    overall word count, word length histogram, and average word lengths of a file
     Attributes:
         clean_words (list): list of words of interest that are clean
         msg (str): message shown to user
     """
     def __init__(self, clean_words, msg=''):
-        super().__init__('A dictionary containing the word frequencies, overall word count, world length list, and '
-                         'average word lengths could not be made for this file')
+        super().__init__('A dictionary containing the word frequencies, overall word count, word length histogram, '
+                         'and average word lengths could not be made for this file')
         self.clean_words = clean_words
         self.msg = msg
 
@@ -78,6 +78,30 @@ class ParserError(Exception):
         self.msg = msg
 
 
+class UnloadTextError(Exception):
+    """ A user-defined exception for signaling an issue with removing a registered document
+    Attributes:
+        label (str): unique label of the document
+        msg (str): message shown to user
+    """
+    def __init__(self, label, msg=''):
+        super().__init__('The document could not be unloaded')
+        self.label = label
+        self.msg = msg
+
+
+class ReloadTextError(Exception):
+    """ A user-defined exception for signaling an issue with registering a document again from its file
+    Attributes:
+        label (str): unique label of the document
+        msg (str): message shown to user
+    """
+    def __init__(self, label, msg=''):
+        super().__init__('The document could not be reloaded')
+        self.label = label
+        self.msg = msg
+
+
 class LoadStopWordError(Exception):
     """ A user-defined exception for an issue with loading the stop words
     Attributes:
@@ -116,3 +140,41 @@ class VisualizeError(Exception):
         super().__init__('Visualization(s) could not be plotted')
         self.name = name
         self.msg = msg
+
+
+class RegisterMetricError(Exception):
+    """ A user-defined exception for an issue with registering a derived statistic of the documents
+    Attributes:
+        name (str): name of the statistic
+        func (function): function that computes the statistic of a document
+        msg (str): message shown to user
+    """
+    def __init__(self, name, func, msg=''):
+        super().__init__(name, 'could not be registered as a statistic')
+        self.name = name
+        self.func = func
+        self.msg = msg
+
+
+class SnapshotError(Exception):
+    """ A user-defined exception for an issue with saving or opening a snapshot of the registered documents
+    Attributes:
+        path (str): folder of the snapshot
+        msg (str): message shown to user
+    """
+    def __init__(self, path, msg=''):
+        super().__init__(path, 'could not be saved or opened as a snapshot')
+        self.path = path
+        self.msg = msg
+
+
+class MergeError(Exception):
+    """ A user-defined exception for an issue with combining the documents of two frameworks
+    Attributes:
+        label (str): optional label of the document that could not be combined
+        msg (str): message shown to user
+    """
+    def __init__(self, label=None, msg=''):
+        super().__init__('The registered documents could not be merged')
+        self.label = label
+        self.msg = msg
@@ -7,86 +7,353 @@ Reusable NLP Library - HW3
 nlp.py: Core framework class for NLP Comparative Analysis
 """
 
-from collections import Counter, defaultdict
-from nltk.corpus import stopwords
-import nlp_parsers as nlp_par
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+from operator import itemgetter
+import codecs
+import functools
+import hashlib
+import heapq
+import locale
+import os
+import time
+from nlp_cache import ResultCache
+from nlp_corpus import Corpus, Document
+import nlp_metrics
+import nlp_telemetry as nlp_tel
 from exception import *
 
+# NLTK, pandas (through nlp_parsers) and NumPy (through nlp_similarity, nlp_ngrams and nlp_sketch) are only imported by
+# the methods that use them, so that processes that only register txt files start quickly
+
+# stop word sets that have already been loaded, keyed by where they came from (and when that source last changed) so
+# that every Nlp instance in a process shares one copy instead of re-reading the same corpus for each document
+_STOP_WORD_CACHE = {}
+
+# number of bytes read at a time when a text file is streamed
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# number of bytes at the start of a file appended to that are compared to tell whether it was rewritten or replaced
+APPEND_HEAD_BYTES = 4096
+
+# digest of each loaded stop word set, used to tell cached results built with different stop words apart
+_STOP_WORD_FINGERPRINTS = {}
+
+# stop words, result cache, n-gram and sketch settings handed to each worker process of Nlp.load_texts once, when the
+# worker starts
+_WORKER_STOP_WORDS = None
+_WORKER_CACHE = None
+_WORKER_NGRAMS = None
+_WORKER_SKETCH = None
+
+# data of the registered documents handed to each worker process of Nlp.render once, when the worker starts
+_WORKER_DATA = None
+
+# messages about the documents being registered (silent by default, see nlp_telemetry.set_verbosity)
+logger = nlp_tel.logger
+
+
+def top_words(data, label, k, key='wordcount'):
+    """ List the k most frequent words of a registered document, most frequent first
+    Args:
+        data (dict): data extracted from the files as a dictionary attribute--> raw data
+        label (str): unique label of a registered document
+        k (int): number of words to list
+        key (str): data key of the counts of interest ('bigramcount' or 'trigramcount' to list n-grams instead)
+    Returns:
+        top (list): (word, count) pairs of the k most frequent words (ties keep the order the words were counted in)
+    """
+    assert isinstance(k, int) and k >= 0, 'The number of words must be a non-negative integer'
+
+    # use the document's top words index if it holds enough words
+    index = data['topwords'].get(label) if key == 'wordcount' and 'topwords' in data else None
+    word_count = data[key][label]
+    if index is not None and (k <= len(index) or len(index) == len(word_count)):
+        return index[:k]
+
+    # otherwise select the words with a heap instead of sorting the whole vocabulary
+    return heapq.nlargest(k, word_count.items(), key=itemgetter(1))
+
 
 class Nlp:
     """ Core framework class for NLP comparative analysis
     Attributes:
-        data (dict): dictionary managing data about the different texts that we register with the framework
+        corpus (Corpus): the registered documents, each holding its own counts and statistics
+        data (CorpusView): read-only view of the registered documents as data[statistic][label], which is what the
+                           visualization functions receive
         viz (dict): dictionary that maps the name of the visualization to a visualization function
+        stopfile (str): optional file containing the stop words to filter out (NLTK's English stop words if None)
+        stop_parser (str): optional parser used to read the stop file
+        compact (bool): whether word counts are stored as integer ids into a shared vocabulary instead of Counters
+        cache (ResultCache): optional on-disk cache of the data results of processed files (None if caching is off)
+        sources (dict): maps the label of each registered document to the file and settings it was loaded with
+        metrics (dict): maps the name of each registered statistic to the function that computes it and the data it is
+                        computed from
+        ngrams (dict): optional settings of the n-grams counted in every document loaded afterwards (None if only
+                       words are counted)
+        sketch (dict): optional settings of the approximate word counts of every document loaded afterwards (None if
+                       words are counted exactly)
+        stage_metrics (StageMetrics): timings, token counts and bytes read of each stage of registering every file
     """
 
-    def __init__(self):
-        self.data = defaultdict(dict)
+    def __init__(self, stopfile=None, stop_parser=None, compact=False, cache_dir=None, cache_size=256 * 1024 * 1024):
+        # with compact set, every word is stored once, and data['wordcount'][label] becomes a read-only Counter-like
+        # view
+        self.corpus = Corpus(compact)
         self.viz = {}
+        self.stopfile = stopfile
+        self.stop_parser = stop_parser
+        self.compact = compact
+        self.cache = ResultCache(cache_dir, cache_size) if cache_dir is not None else None
+        self.sources = {}
+        self.metrics = self.corpus.metrics
+        self.ngrams = None
+        self.sketch = None
+        self.stage_metrics = nlp_tel.StageMetrics()
+
+        # word counts of every document added together, and TF-IDF weights of the documents, built when first needed
+        self._corpus_count = None
+        self._tfidf = {}
+
+        # statistics that the visualizations use, each computed from a document's word counts when first needed
+        self.register_metric('wordlengthhist', nlp_metrics.length_histogram)
+        self.register_metric('numwords', nlp_metrics.hist_total, 'wordlengthhist')
+        self.register_metric('avgwordlength', nlp_metrics.hist_mean, 'wordlengthhist')
+        self.register_metric('wordlengthvar', nlp_metrics.hist_variance, 'wordlengthhist')
+        self.register_metric('topwords', nlp_metrics.top_words_index)
+        self.register_metric('sentiment', nlp_metrics.sentiment)
+
+    @property
+    def data(self):
+        """ The registered documents in the layout the visualization functions receive
+        Returns:
+            data (CorpusView): read-only view where data[name][label] is the counts or statistic called name of the
+                               document labeled label
+        """
+        return self.corpus.view
+
+    @property
+    def stop_words(self):
+        """ The stop words registered with the framework, loaded once and shared by every document
+        Returns:
+            stop_words (frozenset): set of stop words based on NLTK library or the registered stop file
+        """
+        return Nlp._load_stop_words(self.stopfile, self.stop_parser)
+
+    def register_metric(self, name, func, source='wordcount'):
+        """ Declare a statistic of the registered documents, stored as data[name] and computed for a document the first
+        time it is accessed, then remembered until the document is reloaded or removed
+        Args:
+            name (str): name of the statistic
+            func (function): module-level function computing the statistic of one document from its source value (it
+                             must be importable so that the statistic can be used by worker processes)
+            source (str): name of the data the statistic is computed from: 'wordcount' for the word counts of the
+                          document, or the name of another registered statistic
+        Returns:
+            None (just adds the statistic to the internal state)
+        """
+        # Ensure the inputted parameters are valid based on their type
+        import nlp_ngrams as nlp_ng
+
+        assert isinstance(name, str), 'The name of the statistic must be a string'
+        assert callable(func), 'You must input a callable function to compute the statistic'
+        assert name != 'wordcount' and name not in nlp_ng.NGRAM_KEYS.values(), 'The counts of the documents cannot ' \
+                                                                                'be replaced by a statistic'
+        assert source == 'wordcount' or source in self.metrics, 'A statistic must be computed from the word counts ' \
+                                                                'or from another registered statistic'
+        assert source != name and not self.corpus.depends_on(source, {name}), 'A statistic cannot be computed ' \
+                                                                               'from itself'
+
+        try:
+            # replace any statistic registered under the same name, including values already computed for it (and
+            # for the statistics computed from it)
+            self.corpus.register_metric(name, func, source)
+
+        except Exception as e:
+            # throws an error message if the statistic cannot be registered
+            raise RegisterMetricError(name, func, str(e))
+
+    def count_ngrams(self, orders=(2, 3), min_count=2, max_entries=1000000):
+        """ Count the bigrams and/or trigrams of every document loaded afterwards, alongside its words, stored as
+        data['bigramcount'] and data['trigramcount']
+        Args:
+            orders (tuple): lengths (int) of the n-grams to count: 2 for bigrams, 3 for trigrams (none if empty)
+            min_count (int): minimum count of the n-grams that are kept for a document
+            max_entries (int): optional maximum number of distinct n-grams of each length held in memory for a document
+                               while it is counted (the rarest are evicted whenever a table outgrows it, so counts may
+                               fall short of the true ones for n-grams seen both before and after an eviction)
+        Returns:
+            None (just updates the n-gram configuration of the framework)
+        """
+        if not orders:
+            self.ngrams = None
+            return
+
+        import nlp_ngrams as nlp_ng
+
+        # build a counter right away so that bad settings are reported before any document gets registered
+        counter = nlp_ng.NgramCounter(orders, min_count, max_entries)
+        self.ngrams = {'orders': counter.orders, 'min_count': min_count, 'max_entries': max_entries}
+
+    def approximate_counts(self, epsilon=0.001, delta=0.01, capacity=1000, enabled=True):
+        """ Count the words of every document loaded afterwards approximately, in a fixed amount of memory per document
+        no matter how long it is (see nlp_sketch.ApproximateCounts)
+        Args:
+            epsilon (float): a word's count exceeds its true count by at most epsilon times the number of words in the
+                             document, except with probability delta (a Count-Min Sketch of e / epsilon counters per
+                             row is kept for each document)
+            delta (float): probability of a count exceeding that error (ln(1 / delta) rows are kept)
+            capacity (int): number of most frequent words (heavy hitters) listed for each document, which is all that
+                            iterating over data['wordcount'][label] and the visualizations see
+            enabled (bool): whether to count approximately (False to go back to exact counts)
+        Returns:
+            None (just updates the counting configuration of the framework)
+
+        The word length histogram, word count and the statistics derived from them stay exact.
+        """
+        if not enabled:
+            self.sketch = None
+            return
+
+        assert not self.compact, 'Approximate counts cannot be stored in the compact vocabulary'
+        import nlp_sketch as nlp_sk
+
+        # build the counts right away so that bad settings are reported before any document gets registered
+        nlp_sk.ApproximateCounts(epsilon, delta, capacity)
+        self.sketch = {'epsilon': epsilon, 'delta': delta, 'capacity': capacity}
+
+    def count_bounds(self, label, word):
+        """ Bound how often a word occurs in a registered document
+        Args:
+            label (str): unique label of a registered document
+            word (str): word of interest
+        Returns:
+            lower (int): the word occurs at least this often
+            upper (int): the word occurs at most this often (both are the exact count if the document is counted
+                         exactly)
+        """
+        assert label in self.corpus, 'No document is registered as ' + str(label)
+
+        word_count = self.corpus[label].wordcount
+        if hasattr(word_count, 'bounds'):
+            # approximate counts (see nlp_sketch.ApproximateCounts) know how far off they may be
+            return word_count.bounds(word)
+
+        return word_count.get(word, 0), word_count.get(word, 0)
+
+    def load_stop_words(self, stopfile=None, parser=None):
+        """ Register the stop words that get filtered out of every document loaded afterwards
+        Args:
+            stopfile (str): optional txt file containing stop words, or common words, that will get filtered
+            parser (str): optional parser to be used
+        Returns:
+            None (just updates the stop word configuration of the framework)
+        """
+        self.stopfile = stopfile
+        self.stop_parser = parser
+
+        # load the stop words right away so that a bad stop file is reported before any document gets registered
+        _ = self.stop_words
 
     @staticmethod
-    def _data_results(clean_words):
+    def _data_results(clean_words, ngrams=None, sketch=None):
         """ Return data results about an inputted list of words
         Args:
-            clean_words (list): list of clean words
+            clean_words (list or iterator): list of clean words, or a stream of them that is consumed in one pass
+            ngrams (dict): optional settings of the n-grams counted alongside the words (see Nlp.count_ngrams)
+            sketch (dict): optional settings of approximate word counts (see Nlp.approximate_counts)
         Returns:
             results (dict): dictionary with data about the inputted words
         """
-        # make sure the inputted parameters are valid based on their type
-        assert isinstance(clean_words, list), 'Clean words must be consolidated into a list'
-        assert all(isinstance(clean_word, str) for clean_word in clean_words), 'Clean word list must only contain ' \
-                                                                               'strings before getting used'
+        # make sure the inputted parameters are valid based on their type (a stream can only be checked as it is read)
+        # (the words come from the parsers, so they aren't checked one by one)
+        assert isinstance(clean_words, (list, Iterator)), 'Clean words must be consolidated into a list or a stream'
 
         try:
-            length = 0
-            for word in clean_words:
-                # add length of word to length variable
-                length += len(word)
-            # compute average word length
-            avg_wl = length / len(clean_words)
-
-            # initialize empty list
-            word_length_list = []
-            for word in clean_words:
-                # append length of word to the new list
-                word_length_list.append(len(word))
-
-            # create a dictionary with info on the frequency of each unique word in a file, the word count of the file,
-            # the lengths of the words, and the average word length of a file
-            results = {
-                'wordcount': Counter(clean_words),
-                'numwords': len(clean_words),
-                'wordlengthlist': word_length_list,
-                'avgwordlength': avg_wl
-            }
+            # count the frequency of each unique word (and of each n-gram) while reading the words only once
+            counter = None
+            if ngrams is not None:
+                import nlp_ngrams as nlp_ng
+                counter = nlp_ng.NgramCounter(**ngrams)
+            words = counter.consume(clean_words) if counter else clean_words
+            if sketch is not None:
+                import nlp_sketch as nlp_sk
+                results = Nlp._count_results(nlp_sk.ApproximateCounts.from_words(words, **sketch))
+            else:
+                results = Nlp._count_results(Counter(words))
+            if counter is not None:
+                results.update(counter.results())
         except Exception as e:
             # throw an error message if the dictionary cannot be created
             raise DataResultsError(clean_words, str(e))
 
         else:
-            # throw a success message if the dictionary gets created
-            print('Dictionary containing the word frequencies, overall word count, world length list, and average'
-                  'word lengths successfully created')
+            # log a success message if the dictionary gets created
+            logger.debug('Dictionary containing the word frequencies successfully created')
 
             return results
 
     @staticmethod
-    def _filter_stopwords(words):
+    def _count_results(word_count):
+        """ Build the data results of a document from the frequencies of its words
+        Args:
+            word_count (Counter): contains the words in a file (key) and their frequencies (value)
+        Returns:
+            results (dict): dictionary with data about the words
+
+        Only the word counts are stored when a document is registered. Every other statistic (see Nlp.register_metric)
+        is computed from them the first time it is used.
+        """
+        assert len(word_count) > 0, 'There are no words left in the file once its stop words are filtered out'
+
+        return {'wordcount': word_count}
+
+    @staticmethod
+    def _merge_results(results, other):
+        """ Combine the data results of two parts of the same document
+        Args:
+            results (dict): data results of the first part
+            other (dict): data results of the second part
+        Returns:
+            merged (dict): data results of both parts together, as if they had been processed at once
+        """
+        # add up the word and n-gram counts (the statistics derived from them are computed again when they are next
+        # used); an n-gram spanning the end of the first part and the start of the second isn't counted
+        merged = {}
+        for key in results.keys() | other.keys():
+            if hasattr(results.get(key), 'merge'):
+                # approximate counts are merged sketch by sketch
+                merged[key] = results[key].merge(other.get(key, {}))
+            else:
+                merged[key] = Counter(dict(results.get(key, {}).items()))
+                merged[key].update(other.get(key, {}))
+
+        return merged
+
+    @staticmethod
+    def _filter_stopwords(words, stop_words=None):
         """ Filter out stop words from a list of given words
         Args:
-            words (list): list of words that may have stop words
+            words (list or iterator): list of words that may have stop words, or a stream of them
+            stop_words (frozenset): optional set of stop words to filter out (NLTK's English stop words if None)
         Returns:
-            clean_words (list): updated version of the inputted list of words without stop words
+            clean_words (list or iterator): updated version of the inputted words without stop words (a stream of
+                                            them if a stream was inputted)
         """
         # make sure the inputted parameters are valid based on their type
-        assert isinstance(words, list), 'Must input the words to be filtered as a list'
-        assert all(isinstance(word, str) for word in words), 'Word list must only contain strings before getting ' \
-                                                             'filtered'
+        assert isinstance(words, (list, Iterator)), 'Must input the words to be filtered as a list or a stream'
 
-        try:
-            # load the stop words
+        # load the stop words if none are given
+        if stop_words is None:
             stop_words = Nlp._load_stop_words()
 
+        if isinstance(words, Iterator):
+            # filter the stream lazily, so no more than one word is held at a time
+            return (word for word in map(str.lower, words) if word not in stop_words)
+
+        try:
             # make all the letters lower case and filter out the file's stop words
             # Citation: https://realpython.com/python-nltk-sentiment-analysis/
             clean_words = [word.lower() for word in words if word.lower() not in stop_words]
@@ -96,63 +363,142 @@ class Nlp:
             raise StopWordError(words, str(e))
 
         else:
-            # throws a success message if the stop words are filtered out
-            print('Stop words successfully filtered out')
+            # logs a success message if the stop words are filtered out
+            logger.debug('Stop words successfully filtered out')
             return clean_words
 
     @staticmethod
-    def _default_parser(filename):
+    def _clean_word(word):
+        """ Clean a single word the way the default parser does
+        Args:
+            word (str): word as it appears in the file
+        Returns:
+            word (str): lower case version of the word without surrounding whitespace or trailing punctuation (None if
+                        it is blank or possibly not a word, e.g., it starts with a number)
+        """
+        # change all letters to lower case and remove leading and trailing white-spaces
+        word = word.lower().strip()
+
+        # filter out blank words and possible non-words (e.g., 'words' that start with a number)
+        if word == '' or not word[0].isalpha():
+            return None
+
+        # remove punctuation from the end of words
+        while not word[-1].isalpha():
+            word = word[:-1]
+
+        return word
+
+    @staticmethod
+    def _stream_words(filename, chunk_size=DEFAULT_CHUNK_SIZE, start=0, end=None):
+        """ Lazily read the words of a txt file in fixed-size chunks, so the file is never held in memory all at once
+        Args:
+            filename (str): name of the file of interest
+            chunk_size (int): number of bytes read from the file at a time
+            start (int): byte offset where reading begins
+            end (int): optional byte offset where reading stops (the end of the file if None)
+        Returns:
+            words (iterator): stream of the cleaned words (str) from the file
+        """
+        # decode the bytes incrementally, so a character split across two chunks is decoded correctly
+        decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))()
+
+        with open(filename, 'rb') as text_file:
+            text_file.seek(start)
+            remaining = float('inf') if end is None else end - start
+
+            # the end of a chunk may cut a word in half, so the last piece of each chunk is carried into the next one
+            carry = ''
+
+            while remaining > 0:
+                chunk = text_file.read(int(min(chunk_size, remaining)))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+
+                # words are separated by spaces or line breaks
+                pieces = (carry + decoder.decode(chunk)).replace('\n', ' ').split(' ')
+                carry = pieces.pop()
+
+                for word in pieces:
+                    word = Nlp._clean_word(word)
+                    if word is not None:
+                        yield word
+
+            # the last piece of the file has no chunk after it to complete it
+            word = Nlp._clean_word(carry + decoder.decode(b'', final=True))
+            if word is not None:
+                yield word
+
+    @staticmethod
+    def _split_words(data):
+        """ Break the contents of a txt file that was already read into memory into clean words, the same way as
+        _stream_words
+        Args:
+            data (bytes): contents of the file
+        Returns:
+            words (list): list of the cleaned words (str) from the file
+        """
+        pieces = data.decode(locale.getpreferredencoding(False)).replace('\n', ' ').split(' ')
+        return [word for word in map(Nlp._clean_word, pieces) if word is not None]
+
+    @staticmethod
+    def _complete_lines_end(filename, start=0):
+        """ Find where the last complete line of a file ends, so that a line that is still being written is left alone
+        Args:
+            filename (str): name of the file of interest
+            start (int): byte offset from which the file is of interest
+        Returns:
+            end (int): byte offset just past the last line break of the file (start if there is none after it)
+        """
+        with open(filename, 'rb') as text_file:
+            end = text_file.seek(0, os.SEEK_END)
+
+            # search backwards from the end of the file, one block at a time
+            while end > start:
+                block_start = max(start, end - DEFAULT_CHUNK_SIZE)
+                text_file.seek(block_start)
+                block = text_file.read(end - block_start)
+
+                line_break = block.rfind(b'\n')
+                if line_break != -1:
+                    return block_start + line_break + 1
+                end = block_start
+
+        return start
+
+    @staticmethod
+    def _default_parser(filename, stream=False, chunk_size=DEFAULT_CHUNK_SIZE):
         """ Parser that reads in a txt file
         Args:
             filename (str): name of the file of interest
+            stream (bool): whether to return the words as a lazy stream instead of a list
+            chunk_size (int): number of bytes read from the file at a time
         Returns:
-            words (list): list of words (str) from the file
+            words (list or iterator): list of words (str) from the file, or a stream of them if stream is True
         """
         # Checking that the inputted parameters are valid based on their type
+        assert isinstance(filename, str), 'File must be inputted as a string'
         assert filename[-3:] in ('csv', 'txt', 'son', 'xls', 'lsx', 'lsm'), 'File type unsupported. Must input a' \
                                                                             ' file of the following types: .csv, ' \
                                                                             '.txt, .json, .xls, .xlsx, .xlsm'
-        assert isinstance(filename, str), 'File must be inputted as a string'
+        assert isinstance(chunk_size, int) and chunk_size > 0, 'The chunk size must be a positive integer'
+
+        # the words of a streamed file are only read once they are needed
+        if stream:
+            return Nlp._stream_words(filename, chunk_size)
 
         try:
-            # initialize empty list to store words
-            words = []
-
-            # open and read the file of interest
-            text_file = open(filename, 'r')
-            rows_of_text = text_file.readlines()
-
-            # break the file into words
-
-            # filtering the file
-            for row in rows_of_text:
-                # remove all break lines
-                row = row.replace('\n', '')
-                # separate the words from each row in the txt file
-                row_words = row.split(' ')
-
-                for word in row_words:
-                    # change all letters to lower case
-                    word = word.lower()
-                    # remove leading and trailing white-spaces
-                    word = word.strip()
-                    # filter out blank words and possible non-words (e.g., 'words' that start with a number)
-                    if word != '' and word[0].isalpha():
-                        # remove punctuation from the end of words
-                        while not word[-1].isalpha():
-                            word = word[:-1]
-                        words.append(word)
-
-            # close the file
-            text_file.close()
+            # open and read the file of interest, breaking it into clean words
+            words = list(Nlp._stream_words(filename, chunk_size))
 
         except Exception as e:
             # throws an error message if the file is not parsed
             raise DefaultParsingError(filename, str(e))
 
         else:
-            # throws a success message if the file is successfully parsed
-            print('File is successfully parsed')
+            # logs a success message if the file is successfully parsed
+            logger.debug('File %s is successfully parsed', filename)
             return words
 
     def _save_results(self, label, results):
@@ -161,28 +507,47 @@ class Nlp:
             label (str): unique label for a text file that we parsed
             results (dict): the data extracted from the file as a dictionary attribute--> raw data
         Return:
-            None (just updates the internal variable, 'data')
+            None (just updates the registered documents)
         """
-        # Ensure the inputted parameters are valid based on their type
-        assert isinstance(label, str), 'Label for the text file must be a string'
-        assert isinstance(results, dict), 'The data extracted from this file must be stored in a dictionary'
-
         try:
-            # adds the parsing results into the internal state
-            for k, v in results.items():
-                self.data[k][label] = v
+            # the document is checked once as it is built, and replaces whatever was registered under the same label
+            # (along with the statistics computed from it)
+            self.corpus.add(Document(label, results))
+
+            # the corpus-wide word counts and weights no longer add up
+            self._corpus_count = None
+            self._tfidf = {}
 
         except Exception as e:
             # throws an error message if the results cannot be saved
             raise SaveResultsError(label, str(e))
 
-    def load_text(self, filename, label=None, parser=None, text_column='text'):
+    def _drop_label(self, label):
+        """ Remove every entry of a document from the internal state
+        Args:
+            label (str): unique label of a registered document
+        Returns:
+            None (just updates the registered documents)
+        """
+        # forget the document along with the statistics computed for it
+        self.corpus.remove(label)
+
+        # the corpus-wide word counts and weights no longer add up
+        self._corpus_count = None
+        self._tfidf = {}
+
+    def load_text(self, filename, label=None, parser=None, text_column='text', stream=False, use_cache=True,
+                  append=False):
         """ Register a document with the framework
         Args:
             filename (str): name of the file of interest
             label (str): optional label for file
             parser (str): optional type of parser to be used
             text_column (str): name of column that has the text of interest
+            stream (bool): whether to read the file lazily in chunks, keeping memory flat for very large files
+            use_cache (bool): whether to restore and store the file's data results with the cache (if there is one)
+            append (bool): whether to only read the lines added to a growing txt file since it was last loaded in
+                           append mode, adding their words to the document
         Return:
             None, just registers the document
         """
@@ -195,131 +560,1354 @@ class Nlp:
         if label is not None:
             assert isinstance(label, str), 'Label for the text file must be a string'
 
+        if append:
+            assert parser is None, 'Only txt files read with the default parser can be appended to'
+
+        # defining the default label for a file
+        if label is None:
+            label = filename
+
         try:
-            # do default parsing of standard .txt file
-            if parser is None:
-                words = Nlp._default_parser(filename)
+            if append:
+                # read the new complete lines of the file and add their words to the document
+                self._append_text(filename, label)
 
             else:
-                # checking that the custom parser is inputted as a string
-                assert isinstance(parser, str), 'Parser must be a string'
+                # parse the file, filter out its stop words and compute statistics about the remaining words (or
+                # restore them from the cache if the same file was already processed the same way)
+                cache = self.cache if use_cache else None
+                timings = nlp_tel.new_timings()
+                results = Nlp._cached_process_file(filename, parser, text_column, self.stop_words, stream, cache,
+                                                   self.ngrams, self.sketch, timings)
 
-                # do custom parsing for non-.txt files
-                words = nlp_par.custom_parser(filename, text_column=text_column, parser=parser)
+                # Save/integrate the data we extracted from the file into the internal state of the framework,
+                # replacing whatever was registered under the same label before
+                start = time.perf_counter()
+                self._save_results(label, results)
+                self.sources[label] = {'filename': filename, 'parser': parser, 'text_column': text_column,
+                                       'stream': stream, 'append': False, 'offset': None}
+                self.stage_metrics.record(label, filename, timings, time.perf_counter() - start)
+
+        except Exception as e:
+            # throws an error message if the document cannot be registered into the framework
+            raise ParserError(filename, str(e))
+
+        else:
+            # logs a success message if the document is successfully registered
+            logger.info('%s is successfully registered', label)
+
+    def _append_text(self, filename, label):
+        """ Add the words of the complete lines appended to a txt file since it was last read to its document
+        Args:
+            filename (str): name of the file of interest
+            label (str): unique label of the document
+        Returns:
+            None (just updates the internal variable, 'data')
+        """
+        source = self.sources.get(label)
 
-            # clean the list of words, removing stopwords
-            clean_words = Nlp._filter_stopwords(words)
-            # compute statistics/calculations regarding the list of words
-            results = Nlp._data_results(clean_words)
+        # continue from where the file was last read, unless the document came from elsewhere or the file was
+        # truncated, rewritten or replaced by another file since then, in which case it is read again from the start
+        if source is not None and source['append'] and source['filename'] == filename and \
+                source['offset'] <= os.path.getsize(filename) and \
+                source.get('identity') == Nlp._file_identity(filename, source['offset']):
+            start = source['offset']
+        else:
+            start = 0
+            self._drop_label(label)
 
-            # defining the default label for a file
-            if label is None:
-                label = filename
+        # only read up to the last line break, since the last line may still be being written
+        end = Nlp._complete_lines_end(filename, start)
+        words = Nlp._filter_stopwords(Nlp._stream_words(filename, start=start, end=end), self.stop_words)
+
+        # the new words are parsed and filtered while they are counted, so only the stages together are timed
+        timings = nlp_tel.new_timings()
+        timings['bytes'] = end - start
+        started = time.perf_counter()
+        save = None
+
+        # the new lines may not have any words left once their stop words are filtered out
+        first_word = next(words, None)
+        if first_word is not None:
+            results = Nlp._data_results(chain([first_word], words), self.ngrams, self.sketch)
+            timings['words'] = results['wordcount'].total()
+
+            # add the new words to the ones the document already had
+            saving = time.perf_counter()
+            timings['stats'] = saving - started
+            if label in self.corpus:
+                results = Nlp._merge_results(self.corpus[label].counts, results)
 
-            # Save/integrate the data we extracted from the file into the internal state of the framework
             self._save_results(label, results)
+            save = time.perf_counter() - saving
+
+        else:
+            timings['stats'] = time.perf_counter() - started
+            timings['words'] = 0
+
+        self.sources[label] = {'filename': filename, 'parser': None, 'text_column': 'text', 'stream': True,
+                               'append': True, 'offset': end, 'identity': Nlp._file_identity(filename, end)}
+        self.stage_metrics.record(label, filename, timings, save)
+
+    @staticmethod
+    def _file_identity(filename, offset):
+        """ Describe a file that is appended to, so that a file replaced or rewritten since it was read can be told
+        apart from the same file with more lines
+        Args:
+            filename (str): name of the file of interest
+            offset (int): byte offset up to which the file was read
+        Returns:
+            identity (dict): 'device' and 'inode' of the file, and a 'head' digest of its first bytes up to the offset
+                             (at most APPEND_HEAD_BYTES of them)
+        """
+        stat = os.stat(filename)
+
+        with open(filename, 'rb') as text_file:
+            head = hashlib.sha256(text_file.read(min(offset, APPEND_HEAD_BYTES))).hexdigest()
+
+        return {'device': stat.st_dev, 'inode': stat.st_ino, 'head': head}
+
+    def load_table(self, filename, text_column='text', parser='csv', group_column=None, label=None, groups=None,
+                   stream=False):
+        """ Register the texts of a JSON, CSV, or Excel file as one document, or as one document per value of a
+        grouping column, tokenizing them with vectorized Pandas string operations
+        Args:
+            filename (str): name of the file of interest
+            text_column (str): name of column that has the text of interest
+            parser (str): type of parser to be used ("CSV", "JSON", "JSONL", or "Excel")
+            group_column (str): optional column whose values split the rows into separate documents, each labeled by
+                                its value (the whole file is one document if None)
+            label (str): optional label for the file when there is no group column
+            groups (list): optional labels (str) of the only groups to register (every group if None)
+            stream (bool): whether to read the file a chunk of rows at a time (CSV and JSON Lines files only)
+        Returns:
+            labels (list): labels of the registered documents
+        """
+        # Ensuring the inputted parameters are valid based on their type
+        assert isinstance(filename, str), 'File must be inputted as a string'
+        assert isinstance(parser, str), 'Parser must be a string'
+        if label is not None:
+            assert isinstance(label, str), 'Label for the file must be a string'
+            assert group_column is None, 'The documents of a grouped file are labeled by their group'
+        import nlp_parsers as nlp_par
+
+        try:
+            # tokenize and count the words of every document in the file at once (the file is parsed, filtered and
+            # counted by the same vectorized operations, so only the stages together are timed)
+            chunksize = nlp_par.DEFAULT_CHUNKSIZE if stream else None
+            timings = nlp_tel.new_timings()
+            start = time.perf_counter()
+            group_results = nlp_par.vectorized_word_counts(filename, text_column, parser, self.stop_words,
+                                                           group_column, chunksize, self.ngrams, self.sketch)
+            saving = time.perf_counter()
+            timings['stats'] = saving - start
+
+            labels = []
+            words = 0
+            for group, counts in group_results.items():
+                # defining the label of each document
+                doc_label = str(group) if group_column is not None else (label if label is not None else filename)
+                if groups is not None and doc_label not in groups:
+                    continue
+
+                # Save/integrate the data about the document into the internal state of the framework
+                results = Nlp._count_results(counts['wordcount'])
+                results.update(counts)
+                self._save_results(doc_label, results)
+                self.sources[doc_label] = {'filename': filename, 'parser': parser, 'text_column': text_column,
+                                           'stream': stream, 'append': False, 'offset': None, 'table': True,
+                                           'group_column': group_column}
+                labels.append(doc_label)
+                words += results['wordcount'].total()
+
+            # the whole file is measured at once, so it is only labeled by its document if it has a single one
+            timings['words'] = words
+            timings['bytes'] = os.path.getsize(filename)
+            self.stage_metrics.record(labels[0] if group_column is None and labels else None, filename, timings,
+                                      time.perf_counter() - saving)
 
         except Exception as e:
-            # throws an error message if the document cannot be registered into the framework
-            raise ParserError(filename, str(e))
+            # throws an error message if the documents cannot be registered into the framework
+            raise ParserError(filename, label, parser, text_column, str(e))
 
         else:
-            # throws a success message if the document is successfully registered
-            print('Document is successfully registered')
+            # logs a success message if the documents are successfully registered
+            logger.info('%d document(s) successfully registered from %s', len(labels), filename)
+            return labels
 
-    @staticmethod
-    def _load_stop_words(stopfile=None, parser=None):
-        """ Load the stop word file and clean it
-        Citation: https://www.geeksforgeeks.org/removing-stop-words-nltk-python/
+    def unload_text(self, label):
+        """ Remove a registered document from the framework
         Args:
-            stopfile (str): optional txt file containing stop words, or common words, that will get filtered
-            parser (str): optional parser to be used
+            label (str): unique label of a registered document
         Returns:
-            stop_words (list): list of stopwords based on NLTK library or user-inputted stop file
+            None (just removes the document from the internal state)
         """
+        # Ensuring the inputted parameters are valid based on their type
+        assert isinstance(label, str), 'Label for the text file must be a string'
+
         try:
-            # retrieves a list of stopwords from the NLTK library if none is given
-            if stopfile is None:
-                stop_words = list(stopwords.words('english'))
+            assert label in self.corpus or label in self.sources, 'No document is registered as ' + label
+
+            # remove the document's data and forget where it came from
+            self._drop_label(label)
+            self.sources.pop(label, None)
+
+        except Exception as e:
+            # throws an error message if the document cannot be removed
+            raise UnloadTextError(label, str(e))
+
+        else:
+            # logs a success message if the document is removed
+            logger.info('%s is successfully unloaded', label)
+
+    def reload_text(self, label):
+        """ Register a document again from its file, picking up any changes made to the file since it was loaded
+        Args:
+            label (str): unique label of a registered document
+        Returns:
+            None (just refreshes the document in the internal state)
+        """
+        # Ensuring the inputted parameters are valid based on their type
+        assert isinstance(label, str), 'Label for the text file must be a string'
 
+        # the document as it is now, and its place among the documents, put back if the file can't be loaded again
+        source = self.sources.get(label)
+        document = self.corpus.get(label)
+        position = list(self.corpus).index(label) if document is not None else None
+
+        try:
+            assert source is not None, 'No file is known for the document ' + label
+
+            # forget the document, then load its file again the same way it was loaded before
+            self.unload_text(label)
+
+            if source['append']:
+                self.load_text(source['filename'], label, append=True)
+            elif source.get('table'):
+                # only the rows of this document are registered again
+                table_label = label if source['group_column'] is None else None
+                self.load_table(source['filename'], source['text_column'], source['parser'], source['group_column'],
+                                table_label, groups=[label], stream=source['stream'])
             else:
-                # ensure that the custom stop file is inputted as a string and that its file type is valid
-                assert stopfile[-3:] in ('csv', 'txt', 'son', 'xls', 'lsx', 'lsm'), 'File type unsupported. Must ' \
-                                                                                    'input a file of the following ' \
-                                                                                    'types: .csv, .txt, .json, .xls, ' \
-                                                                                    '.xlsx, .xlsm '
-                assert isinstance(stopfile, str), 'File must be inputted as a string'
+                self.load_text(source['filename'], label, source['parser'], source['text_column'], source['stream'])
 
-                if parser is None:
-                    # clean the custom stopfile
-                    stop_words = Nlp._default_parser(stopfile)
-                else:
-                    # check that the parser is inputted as a string
-                    assert isinstance(parser, str), 'Parser must be inputted as a string'
+            # a file that no longer holds the document's rows doesn't replace it
+            assert source['append'] or label in self.corpus, 'The file no longer holds the document ' + label
+
+        except Exception as e:
+            # the document is kept as it was before the failed reload
+            if source is not None:
+                self._drop_label(label)
+                if document is not None:
+                    self.corpus.add(document, position)
+                self.sources[label] = source
+
+            # throws an error message if the document cannot be reloaded
+            raise ReloadTextError(label, getattr(e, 'msg', '') or str(e))
+
+    def save(self, path):
+        """ Save the registered documents as a binary snapshot (a vocabulary table and count arrays per kind of counts,
+        see nlp_snapshot) that Nlp.open can reopen without reading every document into memory
+        Args:
+            path (str): folder of the snapshot (an older snapshot there is replaced)
+        Returns:
+            None (just writes the snapshot)
+
+        The snapshot also records the stop words, parsers and n-gram settings the documents were built with. Statistics
+        are computed again from the counts once they are used, and custom statistics have to be registered again.
+        """
+        import nlp_snapshot as nlp_snap
 
-                    # clean the NLTK stopfile
-                    stop_words = nlp_par.custom_parser(stopfile, text_column='text', parser=parser)
+        try:
+            nlp_snap.save(self, path)
 
         except Exception as e:
-            # throws an error message if the stop words cannot get filtered out
-            raise LoadStopWordError(stopfile, str(e))
+            # throws an error message if the snapshot cannot be saved
+            raise SnapshotError(path, str(e))
 
         else:
-            # throws a success message if the stop words are filtered out
-            print('Stop words successfully loaded')
-            return stop_words
+            # logs a success message if the snapshot is saved
+            logger.info('%d document(s) saved to %s', len(self.corpus), path)
 
-    def load_visualization(self, name, vizfunc, *args, **kwargs):
-        """ Integrate visualization into internal state
+    @classmethod
+    def open(cls, path, mmap=True, cache_dir=None, compact=None):
+        """ Reopen a snapshot saved by Nlp.save, memory-mapping its arrays so that only the documents that are used get
+        read from disk
         Args:
-            name (str): name of visualization
-            vizfunc (function): name of function to execute the visualization
-            *args (tuple): unlimited number of defined parameters for the visualization
-            **kwargs (dict): unlimited number of undefined parameters for the visualization (parameter name = key,
-                             parameter value = value)
+            path (str): folder of the snapshot
+            mmap (bool): whether to memory-map the arrays (False to read them into memory at once)
+            cache_dir (str): optional folder of the cache used for documents registered afterwards
+            compact (bool): optional storage of the word counts, which must match the one the snapshot was saved with
+                            (that one if None); a compact framework reads every document's words in as it opens
         Returns:
-            None (just loads the visualization into the internal state)
+            nlp (Nlp): framework holding the documents of the snapshot (as read-only, Counter-like views) with the stop
+                       word, parser, n-gram and storage settings they were built with
         """
-        # Ensure the inputted parameters are valid based on their type
-        assert isinstance(name, str), 'The name of the visualization must be a string'
-        assert (callable(vizfunc)), 'You must input a callable function to execute the visualization'
+        import nlp_snapshot as nlp_snap
 
         try:
-            # add the visualization into the internal state
-            self.viz[name] = (vizfunc, args, kwargs)
+            manifest = nlp_snap.read_manifest(path)
+            stop_words = manifest['stop_words']
+            assert compact is None or compact == manifest['compact'], 'The snapshot was saved ' + \
+                ('with' if manifest['compact'] else 'without') + ' compact word counts'
+
+            # the word counts are stored the way they were before the snapshot was saved
+            nlp = cls(stop_words['stopfile'], stop_words['parser'], manifest['compact'], cache_dir=cache_dir)
+            if manifest['ngrams'] is not None:
+                nlp.count_ngrams(**manifest['ngrams'])
+
+            for label, counts in nlp_snap.documents(path, manifest, mmap).items():
+                nlp.corpus.add(Document(label, counts))
+            nlp.sources = manifest['sources']
 
         except Exception as e:
-            # throws an error message if the visualization cannot get added to the internal state
-            raise LoadVisualizationError(vizfunc, str(e))
+            # throws an error message if the snapshot cannot be opened
+            raise SnapshotError(path, str(e))
 
         else:
-            # throws a success message if the visualization is added to the internal state
-            print(name, 'is successfully integrated into the internal state')
+            # logs a success message if the snapshot is opened
+            logger.info('%d document(s) opened from %s', len(nlp.corpus), path)
+            return nlp
 
-    def visualize(self, name=None):
-        """ Call the vizfunc to plot the visualization(s)
+    def _empty_like(self):
+        """ Build a framework without documents that registers documents the same way as this one
+        Returns:
+            nlp (Nlp): framework with the same stop words, storage, statistics, counting settings and cache
+        """
+        nlp = type(self)(self.stopfile, self.stop_parser, self.compact)
+        nlp.metrics.update(self.metrics)
+        nlp.cache = self.cache
+        nlp.ngrams = self.ngrams
+        nlp.sketch = self.sketch
+        return nlp
+
+    def merge(self, other, on_collision='error'):
+        """ Add the documents of another framework (e.g., one built by another process or machine) to this one
         Args:
-            name (str): optional parameter for the name of a visualization
+            other (Nlp or str): framework whose documents are added, or the folder of a snapshot saved by Nlp.save
+            on_collision (str): what to do with a document whose label is already registered: 'error' to refuse,
+                                'sum' to add up the counts of both documents (as if they were one longer document,
+                                registered last), 'keep' to keep this framework's document, or 'replace' to take the
+                                other one
         Returns:
-            None (just plots the specified visualization(s))
+            nlp (Nlp): this framework, so that merges can be chained
+
+        Both frameworks must filter the same stop words and count words and n-grams the same way. Every statistic is
+        computed from the combined counts, so the word length statistics of summed documents are exact.
         """
+        assert on_collision in ('error', 'sum', 'keep', 'replace'), 'The collision policy must be "error", "sum", ' \
+                                                                     '"keep" or "replace"'
+        if isinstance(other, str):
+            other = type(self).open(other)
+        assert isinstance(other, Nlp), 'Only another framework or a snapshot folder can be merged'
+
         try:
-            # run all the visualizations
-            if name is None:
-                for _, v in self.viz.items():
-                    vizfunc, args, kwargs = v
-                    vizfunc(self.data, *args, **kwargs)
+            # counts built with different stop words or counting settings don't add up (stop files are compared by
+            # the words they hold, as in the snapshot manifests, so copies of the same file at other paths match)
+            assert Nlp._stop_word_fingerprint(self.stop_words) == Nlp._stop_word_fingerprint(other.stop_words), \
+                'The frameworks must use the same stop words'
+            assert self.ngrams == other.ngrams, 'The frameworks must count the same n-grams'
+            assert self.sketch == other.sketch, 'The frameworks must count words the same way (exactly or ' \
+                                                'approximately with the same settings)'
 
-            else:
-                # run only the named visualization
-                assert isinstance(name, str), 'The name of the visualization must be a string'
-                vizfunc, args, kwargs = self.viz[name]
-                vizfunc(self.data, *args, **kwargs)
+            # check every label first, so that a refused merge leaves this framework unchanged
+            collisions = [label for label in other.corpus if label in self.corpus]
+            assert on_collision != 'error' or not collisions, 'Both frameworks registered ' + repr(collisions[:5])
+
+            for label, document in other.corpus.items():
+                if label in self.corpus:
+                    if on_collision == 'keep':
+                        continue
+                    if on_collision == 'sum':
+                        # the documents are added together, and the summed document is registered last
+                        counts = Nlp._merge_results(self.corpus[label].counts, document.counts)
+                        self.corpus.add(Document(label, counts))
+                        self.sources[label] = {'merged': [self.sources.get(label), other.sources.get(label)]}
+                        continue
+
+                # the counts are never changed in place, so both frameworks can share them
+                self.corpus.add(Document(label, document.counts))
+                self.sources[label] = other.sources.get(label)
+
+            self.stage_metrics.records.extend(other.stage_metrics.records)
+
+            # the corpus-wide word counts and weights no longer add up
+            self._corpus_count = None
+            self._tfidf = {}
 
         except Exception as e:
-            # throws an error message if the visualization(s) cannot get plotted
-            raise VisualizeError(name, str(e))
+            # throws an error message if the documents cannot be merged
+            raise MergeError(None, str(e))
 
         else:
-            # throws a success message if the visualization gets plotted
-            print('Visualization(s) successfully plotted')
+            # logs a success message once the documents are merged
+            logger.info('%d document(s) merged, %d label collision(s)', len(other.corpus), len(collisions))
+            return self
+
+    @classmethod
+    def reduce(cls, partials, on_collision='error'):
+        """ Combine several frameworks or snapshots into a new framework, merging them in pairs (a tree of merges)
+        so that documents summed across many partials are only copied a logarithmic number of times
+        Args:
+            partials (list): frameworks (Nlp) and/or folders of snapshots (str), in the order their documents go in
+            on_collision (str): what to do with documents registered in several partials (see Nlp.merge)
+        Returns:
+            nlp (Nlp): new framework holding the documents of every partial (the partials are left unchanged)
+        """
+        assert isinstance(partials, list) and partials, 'The partials must be inputted as a non-empty list'
+
+        # the first round merges the partials into new frameworks, later rounds merge those into each other
+        level = [cls.open(partial) if isinstance(partial, str) else partial for partial in partials]
+        level = [level[0]._empty_like().merge(level[i], on_collision).merge(level[i + 1], on_collision)
+                 if i + 1 < len(level) else level[0]._empty_like().merge(level[i], on_collision)
+                 for i in range(0, len(level), 2)]
+
+        while len(level) > 1:
+            level = [level[i].merge(level[i + 1], on_collision) if i + 1 < len(level) else level[i]
+                     for i in range(0, len(level), 2)]
+
+        return level[0]
+
+    @staticmethod
+    def _process_file(filename, parser=None, text_column='text', stop_words=None, stream=False, ngrams=None,
+                      sketch=None, timings=None):
+        """ Parse a file, filter out its stop words and compute the data results about the words that are left
+        Args:
+            filename (str): name of the file of interest
+            parser (str): optional type of parser to be used
+            text_column (str): name of column that has the text of interest
+            stop_words (frozenset): optional set of stop words to filter out (NLTK's English stop words if None)
+            stream (bool): whether to read the file lazily in chunks, keeping memory flat for very large files
+            ngrams (dict): optional settings of the n-grams counted alongside the words (see Nlp.count_ngrams)
+            sketch (dict): optional settings of approximate word counts (see Nlp.approximate_counts)
+            timings (dict): optional measurements of the stages (see nlp_telemetry.new_timings), filled in here
+        Returns:
+            results (dict): dictionary with data about the words in the file
+        """
+        start = time.perf_counter()
+
+        # do default parsing of standard .txt file (streamed words flow through the filtering and counting one by one)
+        if parser is None:
+            words = Nlp._default_parser(filename, stream=stream)
+
+        else:
+            # checking that the custom parser is inputted as a string
+            assert isinstance(parser, str), 'Parser must be a string'
+            import nlp_parsers as nlp_par
+
+            # do custom parsing for non-.txt files (streamed files are read a chunk of rows at a time)
+            if stream:
+                words = nlp_par.stream_custom_parser(filename, text_column=text_column, parser=parser)
+            else:
+                words = nlp_par.custom_parser(filename, text_column=text_column, parser=parser)
+
+        # clean the list of words, removing stopwords
+        parsed = time.perf_counter()
+        clean_words = Nlp._filter_stopwords(words, stop_words)
+
+        # compute statistics/calculations regarding the list of words
+        filtered = time.perf_counter()
+        results = Nlp._data_results(clean_words, ngrams, sketch)
+
+        if timings is not None:
+            if stream:
+                # the words of a streamed file are parsed and filtered while they are counted, so only the stages
+                # together are timed
+                timings['stats'] = time.perf_counter() - start
+            else:
+                timings.update(parse=parsed - start, filter=filtered - parsed, stats=time.perf_counter() - filtered,
+                               tokens=len(words))
+            timings['words'] = results['wordcount'].total()
+            timings['bytes'] = os.path.getsize(filename)
+
+        return results
+
+    @staticmethod
+    def _stop_word_fingerprint(stop_words):
+        """ Get a digest that identifies a set of stop words
+        Args:
+            stop_words (frozenset): set of stop words
+        Returns:
+            fingerprint (str): hexadecimal digest of the sorted stop words
+        """
+        # a frozenset remembers its own hash, so looking up a set that was already fingerprinted is cheap
+        if stop_words not in _STOP_WORD_FINGERPRINTS:
+            digest = hashlib.sha256('\n'.join(sorted(stop_words)).encode()).hexdigest()
+            _STOP_WORD_FINGERPRINTS[stop_words] = digest
+
+        return _STOP_WORD_FINGERPRINTS[stop_words]
+
+    @staticmethod
+    def _cached_process_file(filename, parser=None, text_column='text', stop_words=None, stream=False, cache=None,
+                             ngrams=None, sketch=None, timings=None):
+        """ Process a file, reusing its data results from the cache when the file and its settings haven't changed
+        Args:
+            filename (str): name of the file of interest
+            parser (str): optional type of parser to be used
+            text_column (str): name of column that has the text of interest
+            stop_words (frozenset): optional set of stop words to filter out (NLTK's English stop words if None)
+            stream (bool): whether to read the file lazily in chunks, keeping memory flat for very large files
+            cache (ResultCache): optional cache of data results (the file is always processed if None)
+            ngrams (dict): optional settings of the n-grams counted alongside the words (see Nlp.count_ngrams)
+            sketch (dict): optional settings of approximate word counts (see Nlp.approximate_counts)
+            timings (dict): optional measurements of the stages (see nlp_telemetry.new_timings), filled in here
+        Returns:
+            results (dict): dictionary with data about the words in the file
+        """
+        if cache is None or not cache.enabled:
+            return Nlp._process_file(filename, parser, text_column, stop_words, stream, ngrams, sketch, timings)
+
+        if stop_words is None:
+            stop_words = Nlp._load_stop_words()
+
+        # the results only depend on the contents of the file, how it is parsed, which stop words are removed and how
+        # the words and n-grams are counted
+        ngram_settings = None if ngrams is None else sorted(ngrams.items())
+        sketch_settings = None if sketch is None else sorted(sketch.items())
+        key = ResultCache.key(filename, parser, text_column, Nlp._stop_word_fingerprint(stop_words), ngram_settings,
+                              sketch_settings)
+        results = cache.get(key)
+
+        if results is None:
+            results = Nlp._process_file(filename, parser, text_column, stop_words, stream, ngrams, sketch, timings)
+            cache.put(key, results)
+
+        elif timings is not None:
+            # none of the stages ran, since the file's results were restored
+            timings['cached'] = True
+            timings['words'] = results['wordcount'].total()
+
+        return results
+
+    @staticmethod
+    def _init_worker(stop_words, cache=None, ngrams=None, sketch=None):
+        """ Give a worker process of Nlp.load_texts the stop words, cache and counting settings shared by every file it
+        processes
+        Args:
+            stop_words (frozenset): set of stop words to filter out
+            cache (ResultCache): optional cache of data results
+            ngrams (dict): optional settings of the n-grams counted alongside the words (see Nlp.count_ngrams)
+            sketch (dict): optional settings of approximate word counts (see Nlp.approximate_counts)
+        Returns:
+            None (just stores the stop words, cache and counting settings in the worker)
+        """
+        global _WORKER_STOP_WORDS, _WORKER_CACHE, _WORKER_NGRAMS, _WORKER_SKETCH
+        _WORKER_STOP_WORDS = stop_words
+        _WORKER_CACHE = cache
+        _WORKER_NGRAMS = ngrams
+        _WORKER_SKETCH = sketch
+
+    @staticmethod
+    def _worker_settings(stop_words, cache=None, ngrams=None, sketch=None):
+        """ Gather the stop words, cache and counting settings shared by every file of a batch, for the files processed
+        in this process (worker processes get theirs once, through Nlp._init_worker)
+        Args:
+            stop_words (frozenset): set of stop words to filter out
+            cache (ResultCache): optional cache of data results
+            ngrams (dict): optional settings of the n-grams counted alongside the words (see Nlp.count_ngrams)
+            sketch (dict): optional settings of approximate word counts (see Nlp.approximate_counts)
+        Returns:
+            settings (dict): the 'stop_words', 'cache', 'ngrams' and 'sketch' of the batch
+        """
+        return {'stop_words': stop_words, 'cache': cache, 'ngrams': ngrams, 'sketch': sketch}
+
+    @staticmethod
+    def _worker_process_file(filename, parser, text_column, stream, settings=None):
+        """ Process a file inside a worker process, catching errors so that one bad file doesn't stop the whole batch
+        Args:
+            filename (str): name of the file of interest
+            parser (str): optional type of parser to be used
+            text_column (str): name of column that has the text of interest
+            stream (bool): whether to read the file lazily in chunks
+            settings (dict): optional settings of the batch (see Nlp._worker_settings), the ones given to the worker
+                             process by Nlp._init_worker if None
+        Returns:
+            results (dict): dictionary with data about the words in the file (None if the file could not be processed)
+            error (str): message describing why the file could not be processed (None if it was processed)
+            timings (dict): measurements of the stages that processed the file (see nlp_telemetry.new_timings)
+        """
+        timings = nlp_tel.new_timings()
+        if settings is None:
+            settings = Nlp._worker_settings(_WORKER_STOP_WORDS, _WORKER_CACHE, _WORKER_NGRAMS, _WORKER_SKETCH)
+
+        try:
+            return Nlp._cached_process_file(filename, parser, text_column, settings['stop_words'], stream,
+                                            settings['cache'], settings['ngrams'], settings['sketch'], timings), \
+                None, timings
+
+        except Exception as e:
+            return None, str(e), timings
+
+    @staticmethod
+    def _process_bytes(data, stop_words=None, ngrams=None, sketch=None, timings=None):
+        """ Filter out the stop words of a txt file that was already read into memory and compute the data results
+        about the words that are left
+        Args:
+            data (bytes): contents of the file
+            stop_words (frozenset): optional set of stop words to filter out (NLTK's English stop words if None)
+            ngrams (dict): optional settings of the n-grams counted alongside the words (see Nlp.count_ngrams)
+            sketch (dict): optional settings of approximate word counts (see Nlp.approximate_counts)
+            timings (dict): optional measurements of the stages (see nlp_telemetry.new_timings), filled in here
+        Returns:
+            results (dict): dictionary with data about the words in the file
+        """
+        start = time.perf_counter()
+        words = Nlp._split_words(data)
+
+        # clean the list of words, removing stopwords, then compute statistics/calculations regarding the words left
+        parsed = time.perf_counter()
+        clean_words = Nlp._filter_stopwords(words, stop_words)
+        filtered = time.perf_counter()
+        results = Nlp._data_results(clean_words, ngrams, sketch)
+
+        if timings is not None:
+            timings.update(parse=parsed - start, filter=filtered - parsed, stats=time.perf_counter() - filtered,
+                           tokens=len(words), words=results['wordcount'].total(), bytes=len(data))
+
+        return results
+
+    @staticmethod
+    def _worker_process_bytes(data, timings, settings=None):
+        """ Process the contents of a txt file inside a worker, reusing its data results from the cache when the file
+        was processed before with the same settings, and catching errors so that one bad file doesn't stop the batch
+        Args:
+            data (bytes): contents of the file
+            timings (dict): measurements of the stages so far (see nlp_telemetry.new_timings), filled in here
+            settings (dict): optional settings of the batch (see Nlp._worker_settings), the ones given to the worker
+                             process by Nlp._init_worker if None
+        Returns:
+            results (dict): dictionary with data about the words in the file (None if the file could not be processed)
+            error (str): message describing why the file could not be processed (None if it was processed)
+            timings (dict): measurements of the stages that processed the file
+        """
+        if settings is None:
+            settings = Nlp._worker_settings(_WORKER_STOP_WORDS, _WORKER_CACHE, _WORKER_NGRAMS, _WORKER_SKETCH)
+        stop_words, ngrams, sketch = settings['stop_words'], settings['ngrams'], settings['sketch']
+
+        try:
+            cache = settings['cache'] if settings['cache'] is not None and settings['cache'].enabled else None
+            if cache is None:
+                return Nlp._process_bytes(data, stop_words, ngrams, sketch, timings), None, timings
+
+            # the same key as the one Nlp.load_texts builds for the file, so both share their cached results
+            ngram_settings = None if ngrams is None else sorted(ngrams.items())
+            sketch_settings = None if sketch is None else sorted(sketch.items())
+            key = ResultCache.key_from_bytes(data, None, 'text', Nlp._stop_word_fingerprint(stop_words),
+                                             ngram_settings, sketch_settings)
+            results = cache.get(key)
+
+            if results is None:
+                results = Nlp._process_bytes(data, stop_words, ngrams, sketch, timings)
+                cache.put(key, results)
+            else:
+                timings.update(cached=True, words=results['wordcount'].total(), bytes=len(data))
+
+            return results, None, timings
+
+        except Exception as e:
+            return None, str(e), timings
+
+    def load_texts(self, files, labels=None, parser=None, text_column='text', workers=None, stream=False,
+                   use_cache=True):
+        """ Register several documents with the framework, processing the files in parallel
+        Args:
+            files (list): names of the files of interest (str)
+            labels (list): optional labels for the files (str), in the same order as the files
+            parser (str): optional type of parser to be used for every file
+            text_column (str): name of column that has the text of interest
+            workers (int): optional maximum number of worker processes (the number of CPUs if None, no pool if 1)
+            stream (bool): whether to read the files lazily in chunks, keeping memory flat for very large files
+            use_cache (bool): whether to restore and store the files' data results with the cache (if there is one)
+        Returns:
+            status (dict): maps the label of each file, in the order the files were given, to whether it was registered
+        """
+        # Ensuring the inputted parameters are valid based on their type
+        assert isinstance(files, list), 'Files must be inputted as a list'
+        assert all(isinstance(filename, str) for filename in files), 'File names must be inputted as strings'
+
+        if labels is None:
+            # defining the default label for each file
+            labels = files
+        else:
+            assert isinstance(labels, list), 'Labels must be inputted as a list'
+            assert all(isinstance(label, str) for label in labels), 'Labels for the text files must be strings'
+            assert len(labels) == len(files), 'There must be exactly one label per file'
+
+        # the status has one entry per label, so a label given twice would hide the outcome of one of its files
+        assert len(set(labels)) == len(labels), 'Every file must have a different label'
+
+        if workers is not None:
+            assert isinstance(workers, int) and workers > 0, 'The number of workers must be a positive integer'
+
+        # load the stop words once here so that every worker process receives the same set
+        stop_words = self.stop_words
+        cache = self.cache if use_cache else None
+
+        if workers == 1 or len(files) <= 1:
+            # process the files one by one in this process, handing the settings to each file rather than storing them
+            # in the globals meant for worker processes
+            settings = Nlp._worker_settings(stop_words, cache, self.ngrams, self.sketch)
+            outcomes = map(Nlp._worker_process_file, files, repeat(parser), repeat(text_column), repeat(stream),
+                           repeat(settings))
+            return self._register_outcomes(files, labels, outcomes, parser, text_column, stream)
+
+        # send the files to the workers in batches so that large corpora don't pay for one round trip per file
+        workers = min(workers or os.cpu_count() or 1, len(files))
+        chunksize = max(1, len(files) // (workers * 4))
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=Nlp._init_worker,
+                                 initargs=(stop_words, cache, self.ngrams, self.sketch)) as executor:
+            # map returns the results in the order the files were given, regardless of which worker finishes first
+            outcomes = executor.map(Nlp._worker_process_file, files, repeat(parser), repeat(text_column),
+                                    repeat(stream), chunksize=chunksize)
+            return self._register_outcomes(files, labels, outcomes, parser, text_column, stream)
+
+    def _register_outcomes(self, files, labels, outcomes, parser, text_column, stream):
+        """ Save the results of processing several files into the internal state, in the order the files were given
+        Args:
+            files (list): names of the files of interest (str)
+            labels (list): labels for the files (str)
+            outcomes (iterable): (results, error, timings) triple for each file, in the same order as the files
+            parser (str): optional type of parser that was used
+            text_column (str): name of column that has the text of interest
+            stream (bool): whether the files were read lazily in chunks
+        Returns:
+            status (dict): maps the label of each file to whether it was registered
+        """
+        status = {label: self._register_outcome(filename, label, outcome, parser, text_column, stream)
+                  for filename, label, outcome in zip(files, labels, outcomes)}
+
+        # logs a success message summarizing how many documents got registered
+        logger.info('%d of %d documents successfully registered', sum(status.values()), len(files))
+        return status
+
+    def _register_outcome(self, filename, label, outcome, parser, text_column, stream):
+        """ Save the results of processing one file of a batch into the internal state
+        Args:
+            filename (str): name of the file of interest
+            label (str): label for the file
+            outcome (tuple): (results, error, timings) triple of the file
+            parser (str): optional type of parser that was used
+            text_column (str): name of column that has the text of interest
+            stream (bool): whether the file was read lazily in chunks
+        Returns:
+            registered (bool): whether the file was registered
+        """
+        results, error, timings = outcome
+
+        try:
+            if error is not None:
+                raise ParserError(filename, label, parser, text_column, error)
+
+            # Save/integrate the data we extracted from the file into the internal state of the framework
+            start = time.perf_counter()
+            self._save_results(label, results)
+            self.sources[label] = {'filename': filename, 'parser': parser, 'text_column': text_column,
+                                   'stream': stream, 'append': False, 'offset': None}
+            self.stage_metrics.record(label, filename, timings, time.perf_counter() - start)
+
+        except Exception as e:
+            # warns that this file could not be registered, without stopping the rest of the batch
+            logger.warning('%s could not be registered: %s', filename, getattr(e, 'msg', '') or str(e))
+            return False
+
+        else:
+            return True
+
+    @staticmethod
+    def _read_bytes(filename):
+        """ Read the whole contents of a file
+        Args:
+            filename (str): name of the file of interest
+        Returns:
+            data (bytes): contents of the file
+        """
+        with open(filename, 'rb') as file:
+            return file.read()
+
+    async def aload_texts(self, files, labels=None, parser=None, text_column='text', concurrency=64, workers=None,
+                          timeout=None, use_cache=True):
+        """ Register many (small) documents with the framework, overlapping the reads of up to concurrency files while
+        worker processes tokenize the files already read, and registering each file as soon as it is processed
+        Args:
+            files (list or iterable): names of the files of interest (str), which may also be a lazy stream of names
+            labels (list): optional labels for the files (str), in the same order as the files
+            parser (str): optional type of parser to be used for every file (custom parsers read their files inside the
+                          worker processes)
+            text_column (str): name of column that has the text of interest
+            concurrency (int): maximum number of files being read or processed at once, which also bounds how many
+                               names are taken from files ahead of time and how many files are held in memory
+            workers (int): optional maximum number of worker processes (the number of CPUs if None, no pool if 1)
+            timeout (float): optional seconds after which a file is given up on, counted separately for its read and its
+                             processing, each from when it actually starts (not while it waits for a free worker)
+            use_cache (bool): whether to restore and store the files' data results with the cache (if there is one)
+        Returns:
+            status (dict): maps the label of each file, in the order the files were given, to whether it was registered
+
+        Files are registered in the order they finish, and every file must have a different label. Call it with
+        asyncio.run(nlp.aload_texts(files)) outside an event loop.
+        """
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        # Ensuring the inputted parameters are valid based on their type
+        assert isinstance(concurrency, int) and concurrency > 0, 'The concurrency must be a positive integer'
+        if labels is not None:
+            assert isinstance(files, list), 'Files must be inputted as a list when they are labeled'
+            assert isinstance(labels, list), 'Labels must be inputted as a list'
+            assert all(isinstance(label, str) for label in labels), 'Labels for the text files must be strings'
+            assert len(labels) == len(files), 'There must be exactly one label per file'
+            assert len(set(labels)) == len(labels), 'Every file must have a different label'
+        if workers is not None:
+            assert isinstance(workers, int) and workers > 0, 'The number of workers must be a positive integer'
+        if timeout is not None:
+            assert isinstance(timeout, (int, float)) and timeout > 0, 'The timeout must be a positive number of seconds'
+
+        # load the stop words once here so that every worker process receives the same set
+        stop_words = self.stop_words
+        cache = self.cache if use_cache else None
+        loop = asyncio.get_running_loop()
+
+        # the labels in the order the files were given, and whether each file got registered (in the order they finish)
+        order = []
+        seen = set()
+        status = {}
+
+        # a bounded queue between the names and the tasks: no more names are taken than can be worked on soon
+        queue = asyncio.Queue(maxsize=concurrency)
+
+        async def run(pool, slots, func, *args):
+            # wait for a free thread or worker first, so that the timeout only counts the time the job actually runs
+            await slots.acquire()
+            future = loop.run_in_executor(pool, func, *args)
+
+            def finished(job):
+                # the slot is only given back once the job ends, even if it was given up on, since a running job
+                # can't be interrupted (the outcome of a job given up on is read here so that it isn't reported)
+                slots.release()
+                if not job.cancelled():
+                    job.exception()
+
+            future.add_done_callback(finished)
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+
+        async def process(filename):
+            # read the file without blocking the event loop, then hand the CPU-bound work to a worker process
+            timings = nlp_tel.new_timings()
+            if parser is not None:
+                return await run(cpu_pool, cpu_slots, process_file, filename, parser, text_column, False)
+
+            start = time.perf_counter()
+            data = await run(io_pool, io_slots, Nlp._read_bytes, filename)
+            timings['read'] = time.perf_counter() - start
+            return await run(cpu_pool, cpu_slots, process_bytes, data, timings)
+
+        async def consume():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                filename, label = item
+
+                try:
+                    outcome = await process(filename)
+                except asyncio.TimeoutError:
+                    outcome = None, 'Not read or processed within {} seconds'.format(timeout), nlp_tel.new_timings()
+                except Exception as e:
+                    outcome = None, str(e), nlp_tel.new_timings()
+
+                # each file is registered as soon as it is done, while the other files are still being worked on
+                status[label] = self._register_outcome(filename, label, outcome, parser, text_column, False)
+
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            # tokenize the files one by one in a thread of this process, handing the settings to each job so that
+            # several calls running in the same event loop don't share them through the worker globals
+            settings = Nlp._worker_settings(stop_words, cache, self.ngrams, self.sketch)
+            process_file = functools.partial(Nlp._worker_process_file, settings=settings)
+            process_bytes = functools.partial(Nlp._worker_process_bytes, settings=settings)
+            cpu_pool = ThreadPoolExecutor(max_workers=1)
+        else:
+            process_file, process_bytes = Nlp._worker_process_file, Nlp._worker_process_bytes
+            cpu_pool = ProcessPoolExecutor(max_workers=workers, initializer=Nlp._init_worker,
+                                           initargs=(stop_words, cache, self.ngrams, self.sketch))
+        io_pool = ThreadPoolExecutor(max_workers=concurrency)
+
+        # no more jobs are handed to each pool than it has threads or workers to run them at once
+        cpu_slots = asyncio.Semaphore(workers)
+        io_slots = asyncio.Semaphore(concurrency)
+
+        tasks = [asyncio.ensure_future(consume()) for _ in range(concurrency)]
+
+        try:
+            # the names are only taken once there is room in the queue, so a stream of names is never read ahead
+            for position, filename in enumerate(files):
+                assert isinstance(filename, str), 'File names must be inputted as strings'
+                label = filename if labels is None else labels[position]
+                assert label not in seen, 'Every file must have a different label'
+                seen.add(label)
+                order.append(label)
+                await queue.put((filename, label))
+
+            for _ in tasks:
+                await queue.put(None)
+            await asyncio.gather(*tasks)
+
+        finally:
+            for task in tasks:
+                task.cancel()
+            io_pool.shutdown(wait=False)
+
+            # jobs that were given up on still hold their workers, so the pool is only closed once they end, waiting in
+            # another thread so that the event loop keeps running the other coroutines meanwhile
+            await asyncio.shield(loop.run_in_executor(None, functools.partial(cpu_pool.shutdown, wait=True,
+                                                                              cancel_futures=True)))
+
+        # logs a success message summarizing how many documents got registered
+        logger.info('%d of %d documents successfully registered', sum(status.values()), len(order))
+        return {label: status[label] for label in order}
+
+    @staticmethod
+    def _stop_word_source(stopfile=None, parser=None):
+        """ Describe where a set of stop words comes from, including when a custom stop file last changed
+        Args:
+            stopfile (str): optional txt file containing stop words, or common words, that will get filtered
+            parser (str): optional parser to be used
+        Returns:
+            source (tuple): hashable description of the stop word source
+        """
+        if stopfile is None:
+            return 'nltk', 'english'
+
+        # a stop file that gets edited or replaced is given a new source, so its stop words are loaded again
+        stat = os.stat(stopfile)
+        return stopfile, parser, stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _load_stop_words(stopfile=None, parser=None):
+        """ Load the stop word file and clean it
+        Citation: https://www.geeksforgeeks.org/removing-stop-words-nltk-python/
+        Args:
+            stopfile (str): optional txt file containing stop words, or common words, that will get filtered
+            parser (str): optional parser to be used
+        Returns:
+            stop_words (frozenset): set of stopwords based on NLTK library or user-inputted stop file
+        """
+        try:
+            if stopfile is not None:
+                # ensure that the custom stop file is inputted as a string and that its file type is valid
+                assert isinstance(stopfile, str), 'File must be inputted as a string'
+                assert stopfile[-3:] in ('csv', 'txt', 'son', 'xls', 'lsx', 'lsm'), 'File type unsupported. Must ' \
+                                                                                    'input a file of the following ' \
+                                                                                    'types: .csv, .txt, .json, .xls, ' \
+                                                                                    '.xlsx, .xlsm '
+
+            # reuse the stop words if they were already loaded from an unchanged source
+            source = Nlp._stop_word_source(stopfile, parser)
+            if source in _STOP_WORD_CACHE:
+                return _STOP_WORD_CACHE[source]
+
+            # retrieves a list of stopwords from the NLTK library if none is given
+            if stopfile is None:
+                from nltk.corpus import stopwords
+                stop_words = stopwords.words('english')
+
+            elif parser is None:
+                # clean the custom stopfile
+                stop_words = Nlp._default_parser(stopfile)
+
+            else:
+                # check that the parser is inputted as a string
+                assert isinstance(parser, str), 'Parser must be inputted as a string'
+
+                # clean the custom stopfile with the custom parser
+                import nlp_parsers as nlp_par
+                stop_words = nlp_par.custom_parser(stopfile, text_column='text', parser=parser)
+
+            # store the stop words as a frozen set so that checking whether a word is a stop word takes constant time
+            stop_words = frozenset(stop_words)
+            _STOP_WORD_CACHE[source] = stop_words
+
+        except Exception as e:
+            # throws an error message if the stop words cannot get filtered out
+            raise LoadStopWordError(stopfile, parser, str(e))
+
+        else:
+            # logs a success message if the stop words are loaded
+            logger.debug('Stop words successfully loaded')
+            return stop_words
+
+    def top_words(self, label=None, k=10):
+        """ List the k most frequent words of a registered document, or of the whole corpus
+        Args:
+            label (str): optional label of a registered document (every document combined if None)
+            k (int): number of words to list
+        Returns:
+            top (list): (word, count) pairs of the k most frequent words, most frequent first
+        """
+        if label is not None:
+            assert label in self.corpus, 'No document is registered as ' + str(label)
+            return top_words(self.data, label, k)
+
+        # add up the word counts of every document once, until a document is registered or removed
+        if self._corpus_count is None:
+            self._corpus_count = Counter()
+            for word_count in self.data['wordcount'].values():
+                self._corpus_count.update(dict(word_count.items()))
+
+        return self._corpus_count.most_common(k)
+
+    def top_words_union(self, k=10):
+        """ Combine the k most frequent words of every registered document
+        Args:
+            k (int): number of words considered from each document
+        Returns:
+            words (list): distinct words (str) that are among the k most frequent words of at least one document, in
+                          the order they are first found
+        """
+        words = {}
+        for label in self.data['wordcount']:
+            for word, _ in top_words(self.data, label, k):
+                words[word] = None
+
+        return list(words)
+
+    def document_term_matrix(self, labels=None):
+        """ Get the word counts of the registered documents as a sparse document-term matrix
+        Args:
+            labels (list): optional labels (str) of the documents making up the rows (every document if None)
+        Returns:
+            matrix (scipy.sparse.csr_matrix): one row per document and one column per word, holding word counts
+            labels (list): label (str) of the document in each row
+            words (list): word (str) in each column
+        """
+        import nlp_compact
+
+        word_counts = self.corpus.compact
+
+        if word_counts is None:
+            # encode the Counters of the documents into a temporary compact store
+            word_counts = nlp_compact.CompactWordCounts()
+            for label, document in self.corpus.items():
+                word_counts[label] = document.wordcount
+
+        if labels is None:
+            labels = list(word_counts)
+        else:
+            assert isinstance(labels, list), 'Labels must be inputted as a list'
+            assert all(label in word_counts for label in labels), 'Every label must belong to a registered document'
+
+        return word_counts.matrix(labels), labels, list(word_counts.vocab.words)
+
+    def tfidf(self, labels=None, sublinear=False):
+        """ Weight the word counts of the registered documents by how rare each word is across them (TF-IDF)
+        Args:
+            labels (list): optional labels (str) of the documents making up the rows (every document if None)
+            sublinear (bool): whether to dampen the word counts to 1 + log(count) before weighting them
+        Returns:
+            weights (scipy.sparse.csr_matrix): one row per document and one column per word, each row of length 1
+            labels (list): label (str) of the document in each row
+            words (list): word (str) in each column
+        """
+        key = (None if labels is None else tuple(labels), sublinear)
+
+        # reuse the weights until a document is registered or removed
+        if key not in self._tfidf:
+            import nlp_similarity as nlp_sim
+            counts, labels, words = self.document_term_matrix(labels)
+            weights, _ = nlp_sim.tfidf(counts, sublinear)
+            self._tfidf[key] = (weights, labels, words)
+
+        return self._tfidf[key]
+
+    def similarity(self, labels=None, sublinear=False):
+        """ Compute the cosine similarity of the TF-IDF weights of every pair of registered documents
+        Args:
+            labels (list): optional labels (str) of the documents to compare (every document if None)
+            sublinear (bool): whether to dampen the word counts to 1 + log(count) before weighting them
+        Returns:
+            similarity (pd.DataFrame): similarity (between 0 and 1) of the documents labeling each row and column
+
+        The result holds one value per pair of documents, so use Nlp.nearest_documents for large corpora.
+        """
+        import pandas as pd
+        import nlp_similarity as nlp_sim
+
+        weights, labels, _ = self.tfidf(labels, sublinear)
+        return pd.DataFrame(nlp_sim.cosine_similarity(weights), index=labels, columns=labels)
+
+    def nearest_documents(self, n=5, labels=None, sublinear=False, block_size=None):
+        """ Find the n registered documents most similar to each document, by the cosine similarity of their TF-IDF
+        weights, without computing every pair of similarities at once
+        Args:
+            n (int): number of similar documents listed for each document
+            labels (list): optional labels (str) of the documents to compare (every document if None)
+            sublinear (bool): whether to dampen the word counts to 1 + log(count) before weighting them
+            block_size (int): optional number of documents compared to the others at a time (chosen to bound memory
+                              if None)
+        Returns:
+            nearest (dict): maps the label of each document to (label, similarity) pairs of its n most similar other
+                            documents, most similar first
+        """
+        assert isinstance(n, int) and n > 0, 'The number of similar documents must be a positive integer'
+        if block_size is not None:
+            assert isinstance(block_size, int) and block_size > 0, 'The block size must be a positive integer'
+        import nlp_similarity as nlp_sim
+
+        weights, labels, _ = self.tfidf(labels, sublinear)
+        neighbors, scores = nlp_sim.nearest_neighbors(weights, n, block_size)
+
+        return {label: [(labels[other], score) for other, score in zip(row.tolist(), row_scores.tolist())]
+                for label, row, row_scores in zip(labels, neighbors, scores)}
+
+    def keywords(self, n=10, labels=None, sublinear=False):
+        """ List the most distinctive words of registered documents: the words with the largest TF-IDF weights, which
+        are frequent in the document but rare in the others
+        Args:
+            n (int): number of words listed for each document
+            labels (list): optional labels (str) of the documents of interest (every document if None)
+            sublinear (bool): whether to dampen the word counts to 1 + log(count) before weighting them
+        Returns:
+            keywords (dict): maps the label of each document to (word, weight) pairs of its n most distinctive words,
+                             most distinctive first
+        """
+        assert isinstance(n, int) and n > 0, 'The number of words must be a positive integer'
+        import nlp_similarity as nlp_sim
+
+        weights, labels, words = self.tfidf(labels, sublinear)
+
+        return {label: [(words[column], weight) for column, weight in top]
+                for label, top in zip(labels, nlp_sim.top_weights(weights, n))}
+
+    def collocations(self, label, n=10, measure='pmi', order=2, min_count=None):
+        """ List the n-grams of a registered document whose words go together most strongly (see Nlp.count_ngrams)
+        Args:
+            label (str): unique label of a registered document
+            n (int): number of n-grams to list
+            measure (str): 'pmi' for pointwise mutual information, or 'likelihood' for Dunning's log-likelihood ratio
+                           (bigrams only)
+            order (int): length of the n-grams (2 for bigrams, 3 for trigrams)
+            min_count (int): optional minimum count of the n-grams considered (PMI overrates n-grams that are seen only
+                             once or twice)
+        Returns:
+            collocations (list): (n-gram, score) pairs of the n highest scoring n-grams, highest first
+        """
+        import nlp_ngrams as nlp_ng
+
+        # Ensure the inputted parameters are valid based on their type
+        assert order in nlp_ng.NGRAM_KEYS, 'Only bigrams (2) and trigrams (3) are counted'
+        key = nlp_ng.NGRAM_KEYS[order]
+        assert label in self.corpus, 'No document is registered as ' + str(label)
+        assert key in self.corpus[label].counts, 'No ' + key + ' is registered for ' + str(label) + ', so call ' \
+                                                 'count_ngrams before loading the document'
+        assert isinstance(n, int) and n > 0, 'The number of n-grams must be a positive integer'
+
+        ngram_count = self.corpus[label].counts[key]
+        if min_count is not None:
+            ngram_count = {ngram: count for ngram, count in ngram_count.items() if count >= min_count}
+
+        return nlp_ng.score_collocations(ngram_count, self.corpus[label].wordcount, measure)[:n]
+
+    def load_visualization(self, name, vizfunc, *args, **kwargs):
+        """ Integrate visualization into internal state
+        Args:
+            name (str): name of visualization
+            vizfunc (function): name of function to execute the visualization
+            *args (tuple): unlimited number of defined parameters for the visualization
+            **kwargs (dict): unlimited number of undefined parameters for the visualization (parameter name = key,
+                             parameter value = value)
+        Returns:
+            None (just loads the visualization into the internal state)
+        """
+        # Ensure the inputted parameters are valid based on their type
+        assert isinstance(name, str), 'The name of the visualization must be a string'
+        assert (callable(vizfunc)), 'You must input a callable function to execute the visualization'
+
+        try:
+            # add the visualization into the internal state
+            self.viz[name] = (vizfunc, args, kwargs)
+
+        except Exception as e:
+            # throws an error message if the visualization cannot get added to the internal state
+            raise LoadVisualizationError(vizfunc, str(e))
+
+        else:
+            # logs a success message if the visualization is added to the internal state
+            logger.debug('%s is successfully integrated into the internal state', name)
+
+    def visualize(self, name=None):
+        """ Call the vizfunc to plot the visualization(s)
+        Args:
+            name (str): optional parameter for the name of a visualization
+        Returns:
+            None (just plots the specified visualization(s))
+        """
+        try:
+            # run all the visualizations
+            if name is None:
+                for _, v in self.viz.items():
+                    vizfunc, args, kwargs = v
+                    vizfunc(self.data, *args, **kwargs)
+
+            else:
+                # run only the named visualization
+                assert isinstance(name, str), 'The name of the visualization must be a string'
+                vizfunc, args, kwargs = self.viz[name]
+                vizfunc(self.data, *args, **kwargs)
+
+        except Exception as e:
+            # throws an error message if the visualization(s) cannot get plotted
+            raise VisualizeError(name, str(e))
+
+        else:
+            # logs a success message if the visualization gets plotted
+            logger.info('Visualization(s) successfully plotted')
+
+    @staticmethod
+    def _init_render_worker(data):
+        """ Give a worker process of Nlp.render the data shared by every visualization it renders
+        Args:
+            data (CorpusView): data about the registered texts
+        Returns:
+            None (just stores the data in the worker)
+        """
+        global _WORKER_DATA
+        _WORKER_DATA = data
+
+    @staticmethod
+    def _render_visualization(name, vizfunc, args, kwargs, outdir, formats):
+        """ Run a visualization without a display on the data given to the worker, saving the figures it shows instead
+        (run in a worker process)
+        Args:
+            name (str): name of the visualization
+            vizfunc (function): function that executes the visualization
+            args (tuple): defined parameters for the visualization
+            kwargs (dict): undefined parameters for the visualization
+            outdir (str): folder where the figures are saved
+            formats (tuple): file formats (str) of the saved figures, e.g., 'png', 'svg' or 'html'
+        Returns:
+            report (dict): wall time in seconds, saved files and error message (None if it succeeded) of the
+                           visualization
+        """
+        import matplotlib
+        matplotlib.use('Agg', force=True)
+        import matplotlib.pyplot as plt
+        plt.switch_backend('Agg')
+
+        files = []
+        shown = []
+
+        def paths(fmts):
+            # the first figure is named after the visualization, any others get numbered
+            stem = name if not shown else name + '-' + str(len(shown))
+            shown.append(stem)
+            return [(fmt, os.path.join(outdir, stem + '.' + fmt)) for fmt in fmts]
+
+        def save_matplotlib(*_, **__):
+            # save every open matplotlib figure instead of showing it (as an image, since it isn't interactive)
+            for number in plt.get_fignums():
+                figure = plt.figure(number)
+                for _, path in paths([fmt for fmt in formats if fmt != 'html'] or ['png']):
+                    figure.savefig(path)
+                    files.append(path)
+                plt.close(figure)
+
+        def save_plotly(figure, *_, **__):
+            # save a plotly figure as an interactive HTML page, or as an image when the kaleido package is installed
+            for fmt, path in paths(formats):
+                if fmt != 'html':
+                    try:
+                        figure.write_image(path)
+                        files.append(path)
+                        continue
+                    except Exception:
+                        # image export isn't available, so fall back to HTML
+                        path = path[:-len(fmt)] + 'html'
+                if path not in files:
+                    figure.write_html(path)
+                    files.append(path)
+
+        plt.show = save_matplotlib
+        try:
+            from plotly.basedatatypes import BaseFigure
+            BaseFigure.show = save_plotly
+        except ImportError:
+            pass
+
+        # the worker may be reused, so figures left open by an earlier visualization are never saved under this name
+        plt.close('all')
+
+        start = time.perf_counter()
+        try:
+            vizfunc(_WORKER_DATA, *args, **kwargs)
+
+            # also save any figures the visualization drew without showing them
+            save_matplotlib()
+
+        except Exception as e:
+            return {'seconds': time.perf_counter() - start, 'files': files, 'error': str(e) or type(e).__name__}
+
+        finally:
+            # a visualization that failed halfway leaves its figures open for the next one in this worker
+            plt.close('all')
+
+        return {'seconds': time.perf_counter() - start, 'files': files, 'error': None}
+
+    def render(self, outdir, name=None, formats=('png',), workers=None):
+        """ Render the visualization(s) without a display, running them in parallel worker processes and saving their
+        figures to files
+        Args:
+            outdir (str): folder where the figures are saved
+            name (str): optional parameter for the name of a visualization (every visualization if None)
+            formats (tuple): file formats (str) of the saved figures: 'png', 'svg' and/or 'html' (plotly figures are
+                             always saved as HTML unless the kaleido package is installed)
+            workers (int): optional maximum number of worker processes (the number of CPUs if None)
+        Returns:
+            report (dict): maps the name of each visualization to its wall time in seconds, saved files, and error
+                           message (None if it succeeded)
+        """
+        # Ensure the inputted parameters are valid based on their type
+        assert isinstance(outdir, str), 'The output folder must be a string'
+        assert isinstance(formats, (tuple, list)) and all(fmt in ('png', 'svg', 'html') for fmt in formats), \
+            'The formats must be a tuple containing "png", "svg" and/or "html"'
+        if workers is not None:
+            assert isinstance(workers, int) and workers > 0, 'The number of workers must be a positive integer'
+
+        try:
+            # pick the visualizations to render
+            if name is None:
+                names = list(self.viz)
+            else:
+                assert isinstance(name, str), 'The name of the visualization must be a string'
+                assert name in self.viz, 'No visualization is loaded as ' + name
+                names = [name]
+
+            os.makedirs(outdir, exist_ok=True)
+            report = {}
+
+            if names:
+                # the data is sent to each worker once, rather than with every visualization
+                with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(names)),
+                                         initializer=Nlp._init_render_worker, initargs=(self.data,)) as executor:
+                    # a visualization that fails is reported without stopping the others
+                    futures = {viz_name: executor.submit(Nlp._render_visualization, viz_name, *self.viz[viz_name],
+                                                         outdir, tuple(formats))
+                               for viz_name in names}
+                    for viz_name, future in futures.items():
+                        try:
+                            report[viz_name] = future.result()
+                        except Exception as e:
+                            report[viz_name] = {'seconds': None, 'files': [], 'error': str(e) or type(e).__name__}
+
+        except Exception as e:
+            # throws an error message if the visualization(s) cannot get rendered
+            raise VisualizeError(name, str(e))
+
+        else:
+            # summarize how each visualization went
+            for viz_name, viz_report in report.items():
+                if viz_report['error'] is None:
+                    logger.info('%s rendered in %.3f seconds', viz_name, viz_report['seconds'])
+                else:
+                    logger.warning('%s could not be rendered: %s', viz_name, viz_report['error'])
+            return report
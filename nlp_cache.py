@@ -0,0 +1,217 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+nlp_cache.py: A persistent, size-bounded on-disk cache of the data results of registered documents, keyed by the
+contents of each file and the settings used to process it
+"""
+# import necessary libraries
+import hashlib
+import os
+import pickle
+import tempfile
+
+# bumped whenever the layout of the cached data results changes, so that stale entries are never restored
+CACHE_VERSION = 3
+
+# file extension of the cache entries
+_ENTRY_SUFFIX = '.pkl'
+
+
+def _stable_setting(setting):
+    """ Describe a setting the same way in every process, so that it can be part of a cache key
+    Args:
+        setting (object): a setting used to process a file (e.g., a parser, which may be a custom function)
+    Returns:
+        setting (object): the setting, with functions replaced by their module and qualified name (their repr holds
+                          a memory address, which differs from one process to the next)
+    """
+    if isinstance(setting, (tuple, list)):
+        return type(setting)(_stable_setting(item) for item in setting)
+    if callable(setting):
+        return 'callable', getattr(setting, '__module__', None), getattr(setting, '__qualname__', repr(setting))
+    return setting
+
+
+class ResultCache:
+    """ Stores the data results of processed files on disk, evicting the least recently used entries once the cache
+    grows beyond its size limit
+    Attributes:
+        directory (str): folder where the cache entries are stored
+        max_bytes (int): maximum total size of the cache entries
+        enabled (bool): whether results are read from and written to the cache
+    """
+
+    def __init__(self, directory='.nlp_cache', max_bytes=256 * 1024 * 1024, enabled=True):
+        assert isinstance(directory, str), 'The cache directory must be specified as a string'
+        assert isinstance(max_bytes, int) and max_bytes > 0, 'The maximum size of the cache must be a positive integer'
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+        # running estimate of the size of the cache (computed on the first write)
+        self._size = None
+
+    @staticmethod
+    def key(filename, *settings):
+        """ Build the cache key of a file from its contents and the settings used to process it
+        Args:
+            filename (str): name of the file of interest
+            *settings (tuple): anything else that changes the data results (parser, text column, stop words, ...)
+        Returns:
+            key (str): hexadecimal digest identifying the file's data results
+        """
+        digest = hashlib.sha256(repr((CACHE_VERSION,) + _stable_setting(settings)).encode())
+
+        # hash the file in blocks so that large files are never held in memory
+        with open(filename, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def key_from_bytes(data, *settings):
+        """ Build the cache key of a file that was already read into memory (the same key as ResultCache.key)
+        Args:
+            data (bytes): contents of the file
+            *settings (tuple): anything else that changes the data results (parser, text column, stop words, ...)
+        Returns:
+            key (str): hexadecimal digest identifying the file's data results
+        """
+        digest = hashlib.sha256(repr((CACHE_VERSION,) + _stable_setting(settings)).encode())
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        """ Get the path of the entry for a key
+        Args:
+            key (str): cache key of a file
+        Returns:
+            path (str): location of the cache entry
+        """
+        return os.path.join(self.directory, key + _ENTRY_SUFFIX)
+
+    def get(self, key):
+        """ Restore the data results stored under a key
+        Args:
+            key (str): cache key of a file
+        Returns:
+            results (dict): the cached data results (None if the cache is disabled or has no entry for the key)
+        """
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+
+        try:
+            with open(path, 'rb') as entry:
+                results = pickle.load(entry)
+
+            # mark the entry as recently used so that it is evicted last
+            os.utime(path)
+
+        except (OSError, pickle.UnpicklingError, EOFError):
+            # a missing or unreadable entry is just a cache miss
+            return None
+
+        return results
+
+    def put(self, key, results):
+        """ Store the data results of a file under its key
+        Args:
+            key (str): cache key of a file
+            results (dict): the data results of the file
+        Returns:
+            None (just writes the cache entry)
+        """
+        if not self.enabled:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        # write to a temporary file first so that a reader never sees a half-written entry
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(handle, 'wb') as entry:
+            pickle.dump(results, entry, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # an entry that is overwritten no longer counts towards the size of the cache
+        if self._size is not None:
+            try:
+                self._size -= os.path.getsize(self._path(key))
+            except OSError:
+                pass
+        os.replace(temp_path, self._path(key))
+
+        # only scan the folder again once the cache may have outgrown its limit
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += os.path.getsize(self._path(key))
+
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _entries(self):
+        """ List the cache entries
+        Returns:
+            entries (list): (last used time, size, path) of every entry
+        """
+        entries = []
+
+        if not os.path.isdir(self.directory):
+            return entries
+
+        for name in os.listdir(self.directory):
+            if name.endswith(_ENTRY_SUFFIX):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # another process evicted the entry in the meantime
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        return entries
+
+    def size(self):
+        """ Get the total size of the cache entries
+        Returns:
+            size (int): number of bytes used by the cache entries
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """ Delete the least recently used entries until the cache fits in 90% of its size limit
+        Returns:
+            None (just deletes cache entries)
+        """
+        entries = sorted(self._entries())
+        size = sum(size for _, size, _ in entries)
+
+        for _, entry_size, path in entries:
+            if size <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= entry_size
+
+        self._size = size
+
+    def clear(self):
+        """ Delete every cache entry
+        Returns:
+            None (just empties the cache)
+        """
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+        self._size = 0
@@ -0,0 +1,242 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+nlp_compact.py: Compact storage of word counts, where every word is stored once in a shared vocabulary and each
+document only keeps integer ids and counts (viewable together as a sparse document-term matrix)
+"""
+# import necessary libraries
+import heapq
+import sys
+from collections.abc import Mapping, MutableMapping
+import numpy as np
+
+
+class Vocabulary:
+    """ Interns the words of every registered document and gives each one an integer id
+    Attributes:
+        ids (dict): maps each word (str) to its integer id
+        words (list): the words (str), indexed by their ids
+        doc_freq (list): number of documents using each word, indexed by their ids (0 once a word is no longer used)
+        unused (int): number of words that no document uses anymore
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.words = []
+        self.doc_freq = []
+        self.unused = 0
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        return word in self.ids
+
+    def add(self, word):
+        """ Get the id of a word used by one more document, giving it a new id if it hasn't been seen before
+        Args:
+            word (str): word of interest
+        Returns:
+            word_id (int): integer id of the word
+        """
+        word_id = self.ids.get(word)
+
+        if word_id is None:
+            # keep a single copy of the word's string, no matter how many documents use it
+            word = sys.intern(word)
+            word_id = len(self.words)
+            self.ids[word] = word_id
+            self.words.append(word)
+            self.doc_freq.append(1)
+        else:
+            if self.doc_freq[word_id] == 0:
+                self.unused -= 1
+            self.doc_freq[word_id] += 1
+
+        return word_id
+
+    def release(self, word_ids):
+        """ Record that a document no longer uses its words
+        Args:
+            word_ids (np.ndarray): ids of the distinct words of the document
+        Returns:
+            unused (int): number of words of the vocabulary that no document uses anymore
+        """
+        doc_freq = self.doc_freq
+        for word_id in word_ids.tolist():
+            doc_freq[word_id] -= 1
+            if doc_freq[word_id] == 0:
+                self.unused += 1
+        return self.unused
+
+
+class DocumentCounts(Mapping):
+    """ Read-only, Counter-like view of the word counts of one document stored as integer ids into a vocabulary
+    Attributes:
+        vocab (Vocabulary): vocabulary shared by every document
+        ids (np.ndarray): sorted ids of the distinct words in the document
+        counts (np.ndarray): frequency of each word in ids
+    """
+
+    def __init__(self, vocab, ids, counts):
+        self.vocab = vocab
+        self.ids = ids
+        self.counts = counts
+
+    def _position(self, word):
+        """ Find where a word is stored in the id and count arrays
+        Args:
+            word (str): word of interest
+        Returns:
+            position (int): index of the word in the arrays (None if the document doesn't contain the word)
+        """
+        word_id = self.vocab.ids.get(word)
+        if word_id is None:
+            return None
+
+        # the ids are sorted, so the word can be found with a binary search
+        position = int(np.searchsorted(self.ids, word_id))
+        if position < len(self.ids) and self.ids[position] == word_id:
+            return position
+        return None
+
+    def __getitem__(self, word):
+        # like a Counter, a word that isn't in the document has a count of 0
+        position = self._position(word)
+        return 0 if position is None else int(self.counts[position])
+
+    def __contains__(self, word):
+        return self._position(word) is not None
+
+    def __iter__(self):
+        words = self.vocab.words
+        return (words[word_id] for word_id in self.ids.tolist())
+
+    def __len__(self):
+        return len(self.ids)
+
+    def get(self, word, default=None):
+        position = self._position(word)
+        return default if position is None else int(self.counts[position])
+
+    def items(self):
+        words = self.vocab.words
+        return [(words[word_id], count) for word_id, count in zip(self.ids.tolist(), self.counts.tolist())]
+
+    def values(self):
+        return self.counts.tolist()
+
+    def total(self):
+        """ Get the number of words in the document
+        Returns:
+            total (int): sum of the counts of every word
+        """
+        return int(self.counts.sum())
+
+    def most_common(self, n=None):
+        """ List the n most common words and their counts from the most common to the least, like Counter.most_common
+        Args:
+            n (int): optional number of words to list (every word if None)
+        Returns:
+            most_common (list): (word, count) pairs
+        """
+        if n is None:
+            return sorted(self.items(), key=lambda item: item[1], reverse=True)
+        return heapq.nlargest(n, self.items(), key=lambda item: item[1])
+
+
+class CompactWordCounts(MutableMapping):
+    """ Drop-in replacement for data['wordcount'] that maps each label to a DocumentCounts view instead of a Counter
+    Attributes:
+        vocab (Vocabulary): vocabulary shared by every document
+        docs (dict): maps the label (str) of each document to its DocumentCounts
+    """
+
+    def __init__(self):
+        self.vocab = Vocabulary()
+        self.docs = {}
+
+    def __setitem__(self, label, word_count):
+        if label in self.docs:
+            del self[label]
+
+        # intern the words of the document and store their counts in id order
+        add = self.vocab.add
+        ids = np.fromiter((add(word) for word in word_count.keys()), dtype=np.int32, count=len(word_count))
+        counts = np.fromiter(word_count.values(), dtype=np.int64, count=len(word_count))
+        order = np.argsort(ids, kind='stable')
+        self.docs[label] = DocumentCounts(self.vocab, ids[order], counts[order])
+
+    def __getitem__(self, label):
+        return self.docs[label]
+
+    def __delitem__(self, label):
+        doc = self.docs.pop(label)
+        unused = self.vocab.release(doc.ids)
+
+        # the removed document keeps working wherever it is still referenced, with a vocabulary of its own words
+        own = Vocabulary()
+        own.words = [self.vocab.words[word_id] for word_id in doc.ids.tolist()]
+        own.ids = {word: word_id for word_id, word in enumerate(own.words)}
+        own.doc_freq = [1] * len(own.words)
+        doc.vocab, doc.ids = own, np.arange(len(own.words), dtype=np.int32)
+
+        # words left behind by unloaded documents are dropped once they make up half the vocabulary
+        if unused * 2 > len(self.vocab):
+            self.compact()
+
+    def __iter__(self):
+        return iter(self.docs)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def compact(self):
+        """ Drop the words that no registered document uses anymore from the vocabulary, renumbering the other words
+        (in the same order) in the vocabulary and in every document
+        Returns:
+            None (just updates the vocabulary and the documents)
+        """
+        if self.vocab.unused == 0:
+            return
+
+        doc_freq = np.asarray(self.vocab.doc_freq, dtype=np.int64)
+        used = doc_freq > 0
+
+        # the new id of each word that is still used (the ids of the documents stay sorted)
+        new_ids = (np.cumsum(used) - 1).astype(np.int32)
+        for doc in self.docs.values():
+            doc.ids = new_ids[doc.ids]
+
+        self.vocab.words = [word for word, keep in zip(self.vocab.words, used.tolist()) if keep]
+        self.vocab.ids = {word: word_id for word_id, word in enumerate(self.vocab.words)}
+        self.vocab.doc_freq = doc_freq[used].tolist()
+        self.vocab.unused = 0
+
+    def matrix(self, labels=None):
+        """ Build the sparse document-term matrix of the registered documents
+        Args:
+            labels (list): optional labels (str) of the documents making up the rows (every document if None)
+        Returns:
+            matrix (scipy.sparse.csr_matrix): one row per document and one column per vocabulary id, holding counts
+        """
+        from scipy.sparse import csr_matrix
+
+        # only the words of the registered documents become columns
+        self.compact()
+
+        if labels is None:
+            labels = list(self.docs)
+
+        docs = [self.docs[label] for label in labels]
+
+        # the arrays of each document are already in id order, so they become the rows of the matrix as they are
+        indptr = np.zeros(len(docs) + 1, dtype=np.int64)
+        np.cumsum([len(doc.ids) for doc in docs], out=indptr[1:])
+        indices = np.concatenate([doc.ids for doc in docs]) if docs else np.zeros(0, dtype=np.int32)
+        counts = np.concatenate([doc.counts for doc in docs]) if docs else np.zeros(0, dtype=np.int64)
+
+        return csr_matrix((counts, indices, indptr), shape=(len(docs), len(self.vocab)))
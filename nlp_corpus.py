@@ -0,0 +1,300 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+nlp_corpus.py: Object model of the registered texts: each Document holds its own counts and statistics, and a Corpus
+indexes the documents by label, with a read-only view of the old data[statistic][label] layout for visualizations
+"""
+# import necessary libraries
+from collections.abc import Mapping
+from types import MappingProxyType
+
+# what data[name] gives for a name that nothing was counted or computed for (like the empty dict of a defaultdict)
+_EMPTY = MappingProxyType({})
+
+
+class Document:
+    """ A registered document: the counts extracted from its file and the statistics computed from them so far
+    Attributes:
+        label (str): unique label of the document
+        counts (dict): maps the name of each kind of counts ('wordcount', plus 'bigramcount' and/or 'trigramcount' if
+                       n-grams are counted) to the counts of the document
+        stats (dict): maps the name of each statistic computed since the document was registered to its value
+    """
+    __slots__ = ('label', 'counts', 'stats')
+
+    def __init__(self, label, counts):
+        # the document is checked once here, so nothing that reads it afterwards has to check it again
+        assert isinstance(label, str), 'Label for the text file must be a string'
+        assert isinstance(counts, dict), 'The data extracted from this file must be stored in a dictionary'
+        assert 'wordcount' in counts, 'The data extracted from this file must include its word counts'
+        assert len(counts['wordcount']) > 0, 'There are no words left in the file once its stop words are filtered out'
+
+        self.label = label
+        self.counts = dict(counts)
+        self.stats = {}
+
+    @property
+    def wordcount(self):
+        """ The word counts of the document
+        Returns:
+            word_count (dict): contains the words in the document (key) and their frequencies (value)
+        """
+        return self.counts['wordcount']
+
+    def __repr__(self):
+        return 'Document({!r}, {} distinct words)'.format(self.label, len(self.counts['wordcount']))
+
+
+class Corpus(Mapping):
+    """ The registered documents, indexed by label and kept in the order they were registered
+    Attributes:
+        docs (dict): maps the label (str) of each document to its Document
+        metrics (dict): maps the name of each registered statistic to the function that computes it and the name of
+                        the counts or statistic it is computed from
+        compact (CompactWordCounts): optional store holding the word counts of every document as integer ids into a
+                                     shared vocabulary (None if each document keeps its own Counter)
+        kinds (dict): maps the name of each kind of counts held by a document to the number of documents holding it
+        view (CorpusView): read-only view of the documents in the data[statistic][label] layout
+    """
+
+    def __init__(self, compact=False):
+        self.docs = {}
+        self.metrics = {}
+        self.kinds = {}
+        self.view = CorpusView(self)
+
+        if compact:
+            import nlp_compact
+            self.compact = nlp_compact.CompactWordCounts()
+        else:
+            self.compact = None
+
+    def __getitem__(self, label):
+        return self.docs[label]
+
+    def __contains__(self, label):
+        return label in self.docs
+
+    def __iter__(self):
+        return iter(self.docs)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, document, position=None):
+        """ Register a document, replacing (and moving to the end) any document registered under the same label
+        Args:
+            document (Document): the document
+            position (int): optional place of the document among the registered documents (the end if None)
+        Returns:
+            None (just updates the documents)
+        """
+        self.remove(document.label)
+
+        if self.compact is not None:
+            # every word is stored once, and the document's word counts become a read-only Counter-like view
+            self.compact[document.label] = document.counts['wordcount']
+            document.counts['wordcount'] = self.compact[document.label]
+
+        self.docs[document.label] = document
+        for kind in document.counts:
+            self.kinds[kind] = self.kinds.get(kind, 0) + 1
+
+        if position is not None and position < len(self.docs) - 1:
+            # move the document back from the end to its place, in the compact store as well
+            labels = list(self.docs)
+            labels.insert(position, labels.pop())
+            self.docs = {label: self.docs[label] for label in labels}
+            if self.compact is not None:
+                self.compact.docs = {label: self.compact.docs[label] for label in labels}
+
+    def remove(self, label):
+        """ Forget a document, if one is registered under the label
+        Args:
+            label (str): label of the document
+        Returns:
+            None (just updates the documents)
+        """
+        document = self.docs.pop(label, None)
+        if document is None:
+            return
+
+        for kind in document.counts:
+            self.kinds[kind] -= 1
+            if not self.kinds[kind]:
+                del self.kinds[kind]
+
+        if self.compact is not None:
+            del self.compact[label]
+
+    def register_metric(self, name, func, source='wordcount'):
+        """ Declare a statistic computed for a document the first time it is accessed (see Nlp.register_metric)
+        Args:
+            name (str): name of the statistic
+            func (function): computes the statistic of one document from its source value
+            source (str): name of the counts or statistic the statistic is computed from
+        Returns:
+            None (just updates the statistics)
+        """
+        self.metrics[name] = (func, source)
+
+        # values computed by a replaced statistic, or from one, are computed again when they are next accessed
+        stale = {name}
+        for other in self.metrics:
+            if self.depends_on(other, stale):
+                stale.add(other)
+        for document in self.docs.values():
+            for stat in stale:
+                document.stats.pop(stat, None)
+
+    def depends_on(self, name, names):
+        """ Check whether a statistic is computed, directly or through other statistics, from any of the given ones
+        Args:
+            name (str): name of the statistic
+            names (set): names of the statistics of interest
+        Returns:
+            depends (bool): whether the statistic depends on any of them
+        """
+        while name in self.metrics:
+            name = self.metrics[name][1]
+            if name in names:
+                return True
+        return False
+
+    def statistic(self, label, name):
+        """ Get a statistic of a document, computing it the first time it is needed
+        Args:
+            label (str): label of the document
+            name (str): name of the statistic
+        Returns:
+            value (object): the statistic of the document
+        """
+        document = self.docs[label]
+        stats = document.stats
+
+        if name not in stats:
+            func, source = self.metrics[name]
+            value = document.counts[source] if source in document.counts else self.statistic(label, source)
+            stats[name] = func(value)
+
+        return stats[name]
+
+    def store_statistics(self, name, values):
+        """ Store statistics of several documents that were computed elsewhere (e.g., for several documents at once),
+        so that they aren't computed again
+        Args:
+            name (str): name of the statistic
+            values (dict): maps the label of each document to its statistic
+        Returns:
+            None (just stores the statistics with their documents)
+        """
+        for label, value in values.items():
+            self.docs[label].stats[name] = value
+
+
+class CountsView(Mapping):
+    """ Read-only view mapping the label of each document to one kind of its counts (data['wordcount'])
+    Attributes:
+        corpus (Corpus): the registered documents
+        key (str): name of the counts
+    """
+
+    def __init__(self, corpus, key):
+        self.corpus = corpus
+        self.key = key
+
+    def __getitem__(self, label):
+        return self.corpus.docs[label].counts[self.key]
+
+    def __contains__(self, label):
+        return label in self.corpus.docs and self.key in self.corpus.docs[label].counts
+
+    def __iter__(self):
+        if self.corpus.kinds.get(self.key, 0) == len(self.corpus.docs):
+            return iter(self.corpus.docs)
+        return (label for label, document in self.corpus.docs.items() if self.key in document.counts)
+
+    def __len__(self):
+        return self.corpus.kinds.get(self.key, 0)
+
+    @property
+    def vocab(self):
+        """ The vocabulary shared by the word counts of every document, if they are stored compactly
+        Returns:
+            vocab (Vocabulary): the shared vocabulary (None if each document keeps its own Counter)
+        """
+        if self.key == 'wordcount' and self.corpus.compact is not None:
+            return self.corpus.compact.vocab
+        return None
+
+
+class StatisticView(Mapping):
+    """ Read-only view mapping the label of each document to one of its statistics (e.g., data['avgwordlength']), each
+    computed the first time it is accessed
+    Attributes:
+        corpus (Corpus): the registered documents
+        name (str): name of the statistic
+    """
+
+    def __init__(self, corpus, name):
+        self.corpus = corpus
+        self.name = name
+
+    def __getitem__(self, label):
+        return self.corpus.statistic(label, self.name)
+
+    def __contains__(self, label):
+        return label in self.corpus.docs
+
+    def __iter__(self):
+        return iter(self.corpus.docs)
+
+    def __len__(self):
+        return len(self.corpus.docs)
+
+    @property
+    def memo(self):
+        """ The statistics that were already computed
+        Returns:
+            memo (dict): maps the label of each document whose statistic was computed to the statistic
+        """
+        return {label: document.stats[self.name] for label, document in self.corpus.docs.items()
+                if self.name in document.stats}
+
+
+class CorpusView(Mapping):
+    """ Read-only view of a corpus in the layout that visualization functions receive: data[name][label] is the counts
+    or statistic called name of the document labeled label
+    Attributes:
+        corpus (Corpus): the registered documents
+
+    The view replaces the defaultdict(dict) that used to hold the data, so visualizations should check for a Mapping
+    rather than a defaultdict. Like the defaultdict, it gives an empty mapping for a name that nothing was counted or
+    computed for (without adding the name), and such a name isn't in the view.
+    """
+
+    def __init__(self, corpus):
+        self.corpus = corpus
+
+    def __getitem__(self, name):
+        if name in self.corpus.metrics:
+            return StatisticView(self.corpus, name)
+        if name == 'wordcount' or name in self.corpus.kinds:
+            return CountsView(self.corpus, name)
+        return _EMPTY
+
+    def __contains__(self, name):
+        return name in self.corpus.metrics or name == 'wordcount' or name in self.corpus.kinds
+
+    def __iter__(self):
+        # the kinds of counts come first (word counts, then any n-gram counts), then the statistics
+        names = {'wordcount': None}
+        names.update(dict.fromkeys(self.corpus.kinds))
+        names.update(dict.fromkeys(self.corpus.metrics))
+        return iter(names)
+
+    def __len__(self):
+        return sum(1 for _ in self)
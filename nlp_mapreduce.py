@@ -0,0 +1,149 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+nlp_mapreduce.py: Local driver that builds a framework from many files by splitting them into shards, registering each
+shard as a separate partial (saved as a snapshot) in parallel, then merging the partials pairwise into one framework
+"""
+# import necessary libraries
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import os
+import shutil
+import tempfile
+from nlp import Nlp
+from nlp_telemetry import logger
+
+
+def shard(items, shards):
+    """ Split a list into contiguous shards of nearly equal sizes, keeping its order
+    Args:
+        items (list): the items (e.g., names of files)
+        shards (int): number of shards (fewer are returned if there are fewer items)
+    Returns:
+        shards (list): the shards (lists), which hold every item once, in order, when put back together
+    """
+    assert isinstance(shards, int) and shards > 0, 'The number of shards must be a positive integer'
+
+    shards = min(shards, len(items)) or 1
+    size, extra = divmod(len(items), shards)
+    bounds = [i * size + min(i, extra) for i in range(shards + 1)]
+    return [items[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def build_partial(files, labels, path, settings):
+    """ Register a shard of files with a new framework and save its documents as a snapshot (the map step, which only
+    needs the files, so it can run in any process or on any machine that can read them)
+    Args:
+        files (list): names of the files of the shard (str)
+        labels (list): labels for the files (str), in the same order as the files
+        path (str): folder where the snapshot of the partial is saved
+        settings (dict): 'stopfile', 'stop_parser', 'parser', 'text_column', 'ngrams' and 'cache_dir' the partial is
+                         built with (see build_corpus)
+    Returns:
+        path (str): folder of the snapshot
+        status (dict): maps the label of each file of the shard to whether it was registered
+    """
+    nlp = Nlp(settings['stopfile'], settings['stop_parser'], cache_dir=settings['cache_dir'])
+    if settings['ngrams'] is not None:
+        nlp.count_ngrams(**settings['ngrams'])
+
+    # the shard is already one of several processes, so its files are processed one by one
+    status = nlp.load_texts(files, labels, settings['parser'], settings['text_column'], workers=1)
+    nlp.save(path)
+    return path, status
+
+
+def merge_partials(paths, path, on_collision='error'):
+    """ Merge the snapshots of several partials into one snapshot (the reduce step)
+    Args:
+        paths (list): folders of the snapshots (str), in the order their documents go in
+        path (str): folder where the merged snapshot is saved
+        on_collision (str): what to do with documents registered in several partials (see Nlp.merge)
+    Returns:
+        path (str): folder of the merged snapshot
+    """
+    Nlp.reduce(paths, on_collision).save(path)
+    return path
+
+
+def build_corpus(files, labels=None, shards=None, workers=None, stopfile=None, stop_parser=None, parser=None,
+                 text_column='text', ngrams=None, cache_dir=None, on_collision='error', fan_in=2, workdir=None,
+                 executor=None):
+    """ Build a framework from many files: the files are split into shards, every shard is registered and saved as a
+    snapshot in parallel, and the snapshots are merged in rounds of fan_in at a time (a tree of merges) until one is
+    left
+    Args:
+        files (list): names of the files of interest (str)
+        labels (list): optional labels for the files (str), in the same order as the files
+        shards (int): optional number of shards (the number of workers if None)
+        workers (int): optional number of worker processes (the number of CPUs if None)
+        stopfile (str): optional txt file containing stop words, or common words, that will get filtered
+        stop_parser (str): optional parser to be used for the stop file
+        parser (str): optional type of parser to be used for every file
+        text_column (str): name of column that has the text of interest
+        ngrams (dict): optional 'orders', 'min_count' and 'max_entries' of the n-grams to count (see Nlp.count_ngrams)
+        cache_dir (str): optional folder of a cache shared by the partials
+        on_collision (str): what to do with documents registered in several shards (see Nlp.merge)
+        fan_in (int): number of snapshots merged by each reduce task
+        workdir (str): optional folder for the snapshots of the partials (a temporary folder, removed afterwards, if
+                       None; otherwise the snapshots are kept there and the returned framework is memory-mapped from the
+                       final one)
+        executor (Executor): optional concurrent.futures executor that runs the map and reduce tasks, e.g., one whose
+                             workers run on other machines sharing workdir (a pool of local processes if None)
+    Returns:
+        nlp (Nlp): framework holding the documents of every registered file, in the order the files were given
+        status (dict): maps the label of each file, in the order the files were given, to whether it was registered
+    """
+    # Ensuring the inputted parameters are valid based on their type
+    assert isinstance(files, list) and files, 'Files must be inputted as a non-empty list'
+    labels = files if labels is None else labels
+    assert isinstance(labels, list) and len(labels) == len(files), 'There must be exactly one label per file'
+    assert len(set(labels)) == len(labels), 'Every file must have a different label'
+    assert isinstance(fan_in, int) and fan_in >= 2, 'Each reduce task must merge at least 2 snapshots'
+    if workers is not None:
+        assert isinstance(workers, int) and workers > 0, 'The number of workers must be a positive integer'
+
+    workers = workers or os.cpu_count() or 1
+    settings = {'stopfile': stopfile, 'stop_parser': stop_parser, 'parser': parser, 'text_column': text_column,
+                'ngrams': ngrams, 'cache_dir': cache_dir}
+
+    # the snapshots go in a folder of their own, which is removed once the final snapshot is read into memory
+    directory = tempfile.mkdtemp(prefix='nlp-partials-') if workdir is None else workdir
+    os.makedirs(directory, exist_ok=True)
+    pool = executor if executor is not None else ProcessPoolExecutor(max_workers=workers)
+
+    try:
+        # map: register each shard of files as a partial
+        file_shards = shard(files, shards or workers)
+        label_shards = shard(labels, len(file_shards))
+        paths = [os.path.join(directory, 'partial-0-{}'.format(i)) for i in range(len(file_shards))]
+
+        status = {}
+        built = []
+        for path, shard_status in pool.map(build_partial, file_shards, label_shards, paths, repeat(settings)):
+            status.update(shard_status)
+            built.append(path)
+        logger.info('%d shard(s) built, %d of %d documents registered', len(built), sum(status.values()), len(files))
+
+        # reduce: merge the partials fan_in at a time, each round in parallel, until one snapshot is left
+        level = 1
+        while len(built) > 1:
+            groups = [built[i:i + fan_in] for i in range(0, len(built), fan_in)]
+            paths = [os.path.join(directory, 'partial-{}-{}'.format(level, i)) for i in range(len(groups))]
+            built = list(pool.map(merge_partials, groups, paths, repeat(on_collision)))
+            logger.info('Merge round %d: %d snapshot(s) left', level, len(built))
+            level += 1
+
+        # a temporary snapshot is read into memory before it is removed
+        nlp = Nlp.open(built[0], mmap=workdir is not None, cache_dir=cache_dir)
+
+    finally:
+        if executor is None:
+            pool.shutdown()
+        if workdir is None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    return nlp, status
@@ -0,0 +1,90 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+nlp_metrics.py: Derived statistics about registered texts that are only computed when they are first used (see
+nlp_corpus.Corpus.statistic)
+"""
+# import necessary libraries
+from operator import itemgetter
+import heapq
+
+# number of most frequent words of each document kept in its top words index
+TOP_WORDS_INDEX_SIZE = 100
+
+
+def length_histogram(word_count):
+    """ Summarizes the lengths of the words in a document without listing the length of every single word
+    Args:
+        word_count (dict): contains the words in a file (key) and their frequencies (value)
+    Returns:
+        word_length_hist (dict): maps each word length (int) to how many words have that length, shortest first
+    """
+    # approximate word counts (see nlp_sketch) keep their exact histogram, since they don't list every word
+    if getattr(word_count, 'lengths', None) is not None:
+        return dict(sorted(word_count.lengths.items()))
+
+    # count how many words have each length, visiting every unique word once
+    word_length_hist = {}
+    for word, count in word_count.items():
+        word_length_hist[len(word)] = word_length_hist.get(len(word), 0) + count
+
+    return dict(sorted(word_length_hist.items()))
+
+
+def hist_total(word_length_hist):
+    """ Counts the words summarized by a word length histogram
+    Args:
+        word_length_hist (dict): maps each word length (int) to how many words have that length
+    Returns:
+        num_words (int): number of words
+    """
+    return sum(word_length_hist.values())
+
+
+def hist_mean(word_length_hist):
+    """ Computes the average word length from a word length histogram
+    Args:
+        word_length_hist (dict): maps each word length (int) to how many words have that length
+    Returns:
+        avg_wl (float): average word length
+    """
+    return sum(length * count for length, count in word_length_hist.items()) / hist_total(word_length_hist)
+
+
+def hist_variance(word_length_hist):
+    """ Computes the variance of the word lengths from a word length histogram
+    Args:
+        word_length_hist (dict): maps each word length (int) to how many words have that length
+    Returns:
+        wl_var (float): variance of the word lengths
+    """
+    # accumulate the sums needed for the mean and variance (kept as integers, so no precision is lost)
+    num_words = hist_total(word_length_hist)
+    length_sum = sum(length * count for length, count in word_length_hist.items())
+    squared_sum = sum(length * length * count for length, count in word_length_hist.items())
+
+    return max(squared_sum / num_words - (length_sum / num_words) ** 2, 0.0)
+
+
+def top_words_index(word_count):
+    """ Selects the most frequent words of a document with a heap instead of sorting its whole vocabulary
+    Args:
+        word_count (dict): contains the words in a file (key) and their frequencies (value)
+    Returns:
+        top (list): (word, count) pairs of the TOP_WORDS_INDEX_SIZE most frequent words, most frequent first
+    """
+    return heapq.nlargest(TOP_WORDS_INDEX_SIZE, word_count.items(), key=itemgetter(1))
+
+
+def sentiment(word_count):
+    """ Computes the VADER sentiment scores of a document from its word counts
+    Args:
+        word_count (dict): contains the words in a file (key) and their frequencies (value)
+    Returns:
+        scores (dict): the 'neg', 'neu', 'pos' and 'compound' scores of the document
+    """
+    import nlp_sentiment
+    return nlp_sentiment.score_counts(word_count)
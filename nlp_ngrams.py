@@ -0,0 +1,184 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+nlp_ngrams.py: Memory-bounded counting of the n-grams (runs of consecutive words) of registered texts, and scoring of
+their collocations
+"""
+# import necessary libraries
+from collections import Counter, deque
+
+# key of the n-gram counts of each supported order in the data results of a document
+NGRAM_KEYS = {2: 'bigramcount', 3: 'trigramcount'}
+
+
+class NgramCounter:
+    """ Counts the bigrams and/or trigrams of a text while its words are being counted, evicting the rarest n-grams
+    whenever a table grows too large
+    Attributes:
+        orders (tuple): lengths (int) of the n-grams that are counted (2 for bigrams, 3 for trigrams)
+        min_count (int): minimum count of the n-grams that are kept once the whole text is counted
+        max_entries (int): optional maximum number of distinct n-grams of each order held at once (no limit if None)
+        tables (dict): maps each order to a Counter of its n-grams (the words of an n-gram joined by spaces)
+        floors (dict): maps each order to the largest count of an n-gram that has been evicted (0 if none was), which
+                       bounds how much any count kept may be below its true count
+    """
+
+    def __init__(self, orders=(2,), min_count=1, max_entries=None):
+        assert all(order in NGRAM_KEYS for order in orders), 'Only bigrams (2) and trigrams (3) can be counted'
+        assert isinstance(min_count, int) and min_count > 0, 'The minimum count of an n-gram must be a positive integer'
+        if max_entries is not None:
+            assert isinstance(max_entries, int) and max_entries > 1, 'The maximum number of n-grams must be an ' \
+                                                                     'integer greater than 1'
+
+        self.orders = tuple(sorted(set(orders)))
+        self.min_count = min_count
+        self.max_entries = max_entries
+        self.tables = {order: Counter() for order in self.orders}
+        self.floors = {order: 0 for order in self.orders}
+
+    def consume(self, words):
+        """ Count the n-grams of a stream of words while passing the words on unchanged
+        Args:
+            words (iterable): words (str) of the text in order
+        Returns:
+            words (iterator): the same words, yielded as they are counted
+        """
+        window = deque(maxlen=max(self.orders, default=1))
+        max_entries = self.max_entries
+
+        for word in words:
+            window.append(word)
+
+            for order in self.orders:
+                if len(window) >= order:
+                    table = self.tables[order]
+                    table[' '.join(list(window)[-order:])] += 1
+
+                    # evict the rarest n-grams once the table outgrows its limit
+                    if max_entries is not None and len(table) > max_entries:
+                        self.prune(order)
+
+            yield word
+
+    def update(self, order, counts):
+        """ Add n-gram counts that were counted elsewhere (e.g., from a chunk of a table)
+        Args:
+            order (int): length of the n-grams
+            counts (dict): maps each n-gram (str) to its count
+        Returns:
+            None (just updates the table of the order)
+        """
+        table = self.tables[order]
+        table.update(counts)
+
+        if self.max_entries is not None and len(table) > self.max_entries:
+            self.prune(order)
+
+    def prune(self, order):
+        """ Evict the rarest n-grams of an order until the table holds at most half of its maximum number of entries,
+        so that tables are pruned only once in a while
+        Args:
+            order (int): length of the n-grams
+        Returns:
+            None (just updates the table of the order)
+        """
+        table = self.tables[order]
+        target = self.max_entries // 2
+
+        # find the smallest count that n-grams need to exceed for few enough of them to be left
+        counts_of_counts = Counter(table.values())
+        remaining = len(table)
+        floor = 0
+        for count in sorted(counts_of_counts):
+            if remaining <= target:
+                break
+            remaining -= counts_of_counts[count]
+            floor = count
+
+        self.tables[order] = Counter({ngram: count for ngram, count in table.items() if count > floor})
+        self.floors[order] = max(self.floors[order], floor)
+
+    def results(self):
+        """ Get the n-gram counts of the text
+        Returns:
+            results (dict): maps the data key of each order ('bigramcount', 'trigramcount') to a Counter of the n-grams
+                            counted at least min_count times
+        """
+        return {NGRAM_KEYS[order]: Counter({ngram: count for ngram, count in table.items() if count >= self.min_count})
+                for order, table in self.tables.items()}
+
+
+def frame_ngrams(words, order):
+    """ Build the n-grams of the words of a table, where each n-gram only joins words from the same cell
+    Args:
+        words (pd.Series): the words of the table in order, indexed by the row of the cell they come from
+        order (int): length of the n-grams
+    Returns:
+        ngrams (pd.Series): the n-grams (str), indexed by the row they come from
+    """
+    import numpy as np
+
+    index = words.index.to_numpy()
+    values = words.reset_index(drop=True)
+    length = len(values) - order + 1
+    if length <= 0:
+        return words.iloc[:0]
+
+    # line every word up with the words after it (by position, since the rows of a cell share an index label),
+    # keeping only the runs that stay inside one cell
+    ngrams = values[:length]
+    same_cell = np.ones(length, dtype=bool)
+    for offset in range(1, order):
+        ngrams = ngrams + ' ' + values[offset:offset + length].reset_index(drop=True)
+        same_cell &= index[:length] == index[offset:offset + length]
+
+    ngrams = ngrams[same_cell]
+    ngrams.index = index[:length][same_cell]
+    return ngrams
+
+
+def score_collocations(ngram_count, word_count, measure='pmi'):
+    """ Score how strongly the words of each n-gram are associated with each other
+    Args:
+        ngram_count (dict): maps each n-gram (words joined by spaces) to its count in the text
+        word_count (dict): contains the words in the text (key) and their frequencies (value)
+        measure (str): 'pmi' for pointwise mutual information (in bits), or 'likelihood' for Dunning's log-likelihood
+                       ratio (bigrams only)
+    Returns:
+        scores (list): (n-gram, score) pairs, highest score first
+    """
+    assert measure in ('pmi', 'likelihood'), 'The collocation measure must be "pmi" or "likelihood"'
+    if not ngram_count:
+        return []
+    import numpy as np
+
+    ngrams = list(ngram_count)
+    parts = [ngram.split(' ') for ngram in ngrams]
+    order = len(parts[0])
+    assert measure == 'pmi' or order == 2, 'The likelihood ratio is only defined for bigrams'
+
+    # counts of the n-grams, of their words, and of every word in the text
+    joint = np.fromiter(ngram_count.values(), dtype=np.float64, count=len(ngrams))
+    singles = np.array([[word_count[word] for word in words] for words in parts], dtype=np.float64)
+    total = float(sum(word_count.values()))
+
+    if measure == 'pmi':
+        # how much more often the words occur together than they would by chance
+        scores = np.log2(joint) + (order - 1) * np.log2(total) - np.log2(singles).sum(axis=1)
+
+    else:
+        # compare how often each combination of the two words (being there or not) occurs to how often it would occur
+        # by chance, over a 2x2 table of counts
+        first, second = singles[:, 0], singles[:, 1]
+        observed = np.stack([joint, first - joint, second - joint, total - first - second + joint])
+        expected = np.stack([first * second, first * (total - second), (total - first) * second,
+                             (total - first) * (total - second)]) / total
+        with np.errstate(divide='ignore', invalid='ignore'):
+            terms = np.where(observed > 0, observed * np.log(observed / expected), 0.0)
+        scores = 2 * terms.sum(axis=0)
+
+    order_of_scores = np.argsort(-scores, kind='stable')
+    return [(ngrams[i], float(scores[i])) for i in order_of_scores.tolist()]
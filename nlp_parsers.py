@@ -7,7 +7,95 @@ Reusable NLP Library - HW3
 nlp_parsers.py: JSON, CSV, Excel, and optional custom parsers to store the contents of a file into a list of its words
 """
 # import necessary libraries
+from collections import Counter, defaultdict
 import pandas as pd
+import nlp_ngrams as nlp_ng
+import nlp_sketch as nlp_sk
+
+
+# number of rows read at a time when a tabular file is streamed
+DEFAULT_CHUNKSIZE = 100000
+
+# matches a word the way the default txt parser cleans it: it must start with a letter, and anything after its last
+# letter (e.g., trailing punctuation) is dropped
+WORD_PATTERN = r'^([^\W\d_](?:.*[^\W\d_])?)'
+
+
+def _read_columns(filename, columns, parser, chunksize=None):
+    """ Reads only the columns of interest from a JSON, CSV, or Excel file, optionally a chunk of rows at a time
+    Args:
+        filename (str): name of the file of interest
+        columns (list): names of the columns of interest (str)
+        parser (str): type of parser to be used ("JSONL" reads a JSON file with one record per line)
+        chunksize (int): optional number of rows read at a time (every row is read at once if None)
+    Returns:
+        dfs (iterator): stream of Pandas dataframes holding the columns of interest, one per chunk of rows
+    """
+    lines = isinstance(parser, str) and parser.lower() == 'jsonl'
+
+    # read in JSON file into a dataframe (JSON Lines files can be read a chunk of records at a time)
+    if filename.endswith('.json'):
+        if lines and chunksize is not None:
+            with pd.read_json(filename, lines=True, chunksize=chunksize) as reader:
+                for df in reader:
+                    yield df[columns]
+        else:
+            yield pd.read_json(filename, lines=lines)[columns]
+
+    # read in only the columns of interest from a CSV file into a dataframe
+    elif filename.endswith('.csv'):
+        if chunksize is not None:
+            with pd.read_csv(filename, usecols=columns, chunksize=chunksize) as reader:
+                yield from reader
+        else:
+            yield pd.read_csv(filename, usecols=columns)
+
+    # read in only the columns of interest from an Excel file into a dataframe
+    else:
+        yield pd.read_excel(filename, usecols=columns)
+
+
+def stream_custom_parser(filename, text_column, parser, chunksize=DEFAULT_CHUNKSIZE):
+    """ Reads in a file a chunk of rows at a time and lazily yields only the words of interest
+    Args:
+        filename (str): name of the file of interest
+        text_column (str): name of column of interest from the file (which contains the texts)
+        parser (str): type of custom parser to be used
+        chunksize (int): number of rows read at a time (CSV and JSON Lines files only, others are read at once)
+    Returns:
+        words (iterator): stream of words (str) from the file without whitespace characters
+
+    Only the column of interest is read, and the words of a chunk are handed on before the next chunk is read, so very
+    wide or very long files never have to fit in memory. A custom parser is applied to one chunk of words at a time.
+    """
+    assert isinstance(filename, str), 'File name must be specified as a string'
+    assert filename[-3:] in ('csv', 'txt', 'son', 'xls', 'lsx', 'lsm'), 'File type unsupported'
+    assert isinstance(text_column, str), 'The column of the new dataframe which contains the texts must be specified ' \
+                                         'as a string'
+    if chunksize is not None:
+        assert isinstance(chunksize, int) and chunksize > 0, 'The number of rows read at a time must be a positive ' \
+                                                             'integer'
+
+    for df in _read_columns(filename, [text_column], parser, chunksize):
+        # turn the column of texts into a list, skipping empty cells
+        words_list = list(df[text_column].dropna())
+
+        # parse a JSON, CSV, or Excel file with an appropriate default parser
+        if isinstance(parser, str) and parser.lower() in ['json', 'jsonl', 'csv', 'excel']:
+            for word in words_list:
+                # remove leading and trailing white-spaces
+                yield word.strip()
+        else:
+            # If a user wants to use a custom parser, make sure they input a string indicating a callable function
+            assert (callable(parser)), "The name of your parser must be a callable function. Don't forget to import " \
+                                       "it if necessary"
+            # parse a JSON, CSV, or Excel file with a custom parser
+            clean_words_list = parser(words_list)
+            # Ensures the custom parser returns a list of words
+            assert isinstance(clean_words_list, list), 'The custom parser must return a list of words'
+            assert all(isinstance(clean_word, str) for clean_word in clean_words_list), 'The custom parser must ' \
+                                                                                        'return a list of words'
+            yield from clean_words_list
 
 
 def custom_parser(filename, text_column, parser):
@@ -21,50 +109,98 @@ def custom_parser(filename, text_column, parser):
 
     These parsers are for non-txt files only.
 
-    The default parsers contained in this function include "CSV" for CSV files, "JSON" for JSON files, and "Excel" for
-    Excel files. Any others with different names are assumed to be custom and must be imported.
+    The default parsers contained in this function include "CSV" for CSV files, "JSON" for JSON files, "JSONL" for JSON
+    files with one record per line, and "Excel" for Excel files. Any others with different names are assumed to be
+    custom and must be imported.
     """
-    assert isinstance(filename, str), 'File name must be specified as a string'
-    assert filename[-3:] in ('csv', 'txt', 'son', 'xls', 'lsx', 'lsm'), 'File type unsupported'
-    assert isinstance(text_column, str), 'The column of the new dataframe which contains the texts must be specified ' \
-                                         'as a string'
+    # read the whole file at once, keeping only the column of interest
+    return list(stream_custom_parser(filename, text_column, parser, chunksize=None))
 
-    # initialize empty list
-    clean_words_list = []
 
-    # read in JSON file into a dataframe
-    if filename[-3:] == 'json':
-        df = pd.read_json(filename)
+def vectorized_word_counts(filename, text_column, parser, stop_words=frozenset(), group_column=None,
+                           chunksize=None, ngrams=None, sketch=None):
+    """ Tokenizes the text column of a JSON, CSV, or Excel file with vectorized Pandas string operations and counts the
+    words (and optionally the n-grams) of each document
+    Args:
+        filename (str): name of the file of interest
+        text_column (str): name of column of interest from the file (which contains the texts)
+        parser (str): type of parser to be used ("CSV", "JSON", "JSONL", or "Excel")
+        stop_words (frozenset): words that are not counted
+        group_column (str): optional column whose values split the rows into separate documents (the whole file is one
+                            document if None)
+        chunksize (int): optional number of rows read at a time (CSV and JSON Lines files only)
+        ngrams (dict): optional settings of the n-gram counting (the 'orders', 'min_count' and 'max_entries' of an
+                       nlp_ngrams.NgramCounter), with no n-grams counted if None
+        sketch (dict): optional settings of approximate word counts (the 'epsilon', 'delta' and 'capacity' of an
+                       nlp_sketch.ApproximateCounts), with the words counted exactly if None
+    Returns:
+        results (dict): maps each value of the group column (or None if there is no group column) to the counts of its
+                        rows: a Counter (or ApproximateCounts) of its words under 'wordcount', and of its n-grams
+                        under 'bigramcount' and/or
+                        'trigramcount'
 
-    # read in CSV file into a dataframe
-    elif filename[-3:] == 'csv':
-        df = pd.read_csv(filename)
+    The texts are split into words on spaces and line breaks, lower cased and stripped of surrounding whitespace and
+    trailing punctuation just like the default txt parser does, and words that don't start with a letter are dropped.
+    An n-gram joins consecutive words that are left from the same cell.
+    """
+    assert isinstance(filename, str), 'File name must be specified as a string'
+    assert filename[-3:] in ('csv', 'son', 'xls', 'lsx', 'lsm'), 'File type unsupported'
+    assert isinstance(text_column, str), 'The column which contains the texts must be specified as a string'
+    if group_column is not None:
+        assert isinstance(group_column, str), 'The column that splits the rows into documents must be specified as a ' \
+                                              'string'
 
-    # read in Excel file into a dataframe
+    columns = [text_column] if group_column is None else [text_column, group_column]
+    if sketch is None:
+        word_counts = defaultdict(Counter)
     else:
-        df = pd.read_excel(filename)
+        # approximate counts take in each chunk's counts, so they never grow beyond their fixed size
+        word_counts = defaultdict(lambda: nlp_sk.ApproximateCounts(**sketch))
+    ngram_counters = defaultdict(lambda: nlp_ng.NgramCounter(**ngrams))
+    orders = ngram_counters.default_factory().orders if ngrams is not None else ()
 
-    # get the column that has the texts
-    df_text = df[text_column]
+    for df in _read_columns(filename, columns, parser, chunksize):
+        # split every text into lower case pieces, then give each piece its own row
+        pieces = df[text_column].dropna().astype(str).str.lower().str.split(r'[ \n]', regex=True)
+        groups = df.loc[pieces.index, group_column] if group_column is not None else None
+        tokens = pd.DataFrame({'word': pieces, 'group': groups}).explode('word')
 
-    # turn the column of texts into a list
-    words_list = list(df_text)
+        # clean the pieces into words, then drop the non-words and the stop words
+        tokens['word'] = tokens['word'].str.strip().str.extract(WORD_PATTERN, expand=False)
+        tokens = tokens.dropna(subset=['word'])
+        tokens = tokens[~tokens['word'].isin(stop_words)]
 
-    # parse a JSON, CSV, or Excel file with an appropriate default parser
-    if parser.lower() in ['json', 'csv', 'excel']:
-        for word in words_list:
-            # remove leading and trailing white-spaces
-            word = word.strip()
-            clean_words_list.append(word)
-    else:
-        # If a user wants to use a custom parser, make sure they input a string indicating a callable function
-        assert (callable(parser)), "The name of your parser must be a callable function. Don't forget to import it " \
-                                   "if necessary"
-        # parse a JSON, CSV, or Excel file with a custom parser
-        clean_words_list = parser(words_list)
-        # Ensures the custom parser returns a list of words
-        assert isinstance(clean_words_list, list), 'The custom parser must return a list of words'
-        assert all(isinstance(clean_word, str) for clean_word in clean_words_list), 'The custom parser must return a ' \
-                                                                                    'list of words '
-
-    return clean_words_list
+        # count the words of each document in this chunk and add them to the counts of the previous chunks
+        if group_column is None:
+            chunk_counts = {None: tokens['word'].value_counts(sort=False).to_dict()}
+        else:
+            chunk_counts = defaultdict(dict)
+            for (group, word), count in tokens.groupby(['group', 'word'], sort=False).size().items():
+                chunk_counts[group][word] = int(count)
+
+        for group, counts in chunk_counts.items():
+            if sketch is None:
+                word_counts[group].update(counts)
+            else:
+                word_counts[group].add(counts)
+
+        for order in orders:
+            # build the n-grams of the chunk, then count them the same way as the words
+            grams = nlp_ng.frame_ngrams(tokens['word'], order)
+            if group_column is None:
+                ngram_counters[None].update(order, grams.value_counts(sort=False).to_dict())
+            else:
+                frame = pd.DataFrame({'ngram': grams.to_numpy(), 'group': df.loc[grams.index, group_column].to_numpy()})
+                chunk_counts = defaultdict(dict)
+                for (group, ngram), count in frame.groupby(['group', 'ngram'], sort=False).size().items():
+                    chunk_counts[group][ngram] = int(count)
+                for group, counts in chunk_counts.items():
+                    ngram_counters[group].update(order, counts)
+
+    results = {}
+    for group, word_count in word_counts.items():
+        results[group] = {'wordcount': word_count}
+        if ngrams is not None:
+            results[group].update(ngram_counters[group].results())
+
+    return results
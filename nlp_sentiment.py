@@ -0,0 +1,189 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+nlp_sentiment.py: Lexicon-based (VADER) sentiment scoring computed straight from the word counts of registered texts
+"""
+# sentiment intensity analyzer shared by every scoring call, built (and NLTK imported) the first time it is needed
+_ANALYZER = None
+
+# valence of every word that has been looked up so far (None for words that VADER skips)
+_VALENCES = {}
+
+
+def _analyzer():
+    """ Gets the shared sentiment intensity analyzer, loading the VADER lexicon only once
+    Returns:
+        sia (SentimentIntensityAnalyzer): the shared analyzer
+    """
+    global _ANALYZER
+    if _ANALYZER is None:
+        from nltk.sentiment import SentimentIntensityAnalyzer
+        _ANALYZER = SentimentIntensityAnalyzer()
+    return _ANALYZER
+
+
+def word_valence(word):
+    """ Looks up the sentiment valence of a single word the way VADER scores a word without any context
+    Args:
+        word (str): word of interest
+    Returns:
+        valence (float): the word's valence (0 for neutral words, None for one-letter words, which VADER skips)
+    """
+    if word in _VALENCES:
+        return _VALENCES[word]
+
+    sia = _analyzer()
+    boosters = sia.constants.BOOSTER_DICT if hasattr(sia, 'constants') else {}
+
+    if len(word) < 2:
+        valence = None
+    elif word.lower() in boosters:
+        # boosters only strengthen the words around them, so on their own they count as neutral
+        valence = 0.0
+    else:
+        valence = float(sia.lexicon.get(word.lower(), 0.0))
+
+    _VALENCES[word] = valence
+    return valence
+
+
+def score_counts(word_count):
+    """ Computes the VADER sentiment scores of a text from its word counts, looking up each distinct word only once
+    Args:
+        word_count (dict): contains the words in a file (key) and their frequencies (value)
+    Returns:
+        scores (dict): the 'neg', 'neu', 'pos' and 'compound' scores of the text, like
+                       SentimentIntensityAnalyzer.polarity_scores
+
+    Every occurrence of a word gets the word's lexicon valence, weighted by its count. Effects that depend on word order
+    (boosters and negations changing the word after them, "but" clauses, capitalization, punctuation) are not applied,
+    since the order of the words isn't kept once they are counted.
+    """
+    valence_sum = 0.0
+    pos_sum = 0.0
+    neg_sum = 0.0
+    neu_count = 0
+
+    for word, count in word_count.items():
+        valence = word_valence(word)
+        if valence is None:
+            continue
+
+        # same sums as VADER's score_valence, with each word counted as many times as it occurs
+        valence_sum += valence * count
+        if valence > 0:
+            pos_sum += (valence + 1) * count
+        elif valence < 0:
+            neg_sum += (valence - 1) * count
+        else:
+            neu_count += count
+
+    return _scores(valence_sum, pos_sum, neg_sum, neu_count)
+
+
+def _scores(valence_sum, pos_sum, neg_sum, neu_count):
+    """ Turns the sums of a text's valences into its sentiment scores, as VADER's score_valence does
+    Args:
+        valence_sum (float): sum of the valences of every word
+        pos_sum (float): sum of (valence + 1) over the positive words
+        neg_sum (float): sum of (valence - 1) over the negative words
+        neu_count (int): number of neutral words
+    Returns:
+        scores (dict): the 'neg', 'neu', 'pos' and 'compound' scores of the text
+    """
+    total = pos_sum + abs(neg_sum) + neu_count
+    if total == 0:
+        return {'neg': 0.0, 'neu': 0.0, 'pos': 0.0, 'compound': 0.0}
+
+    # normalize the sum of the valences to be between -1 and 1
+    compound = valence_sum / (valence_sum * valence_sum + 15) ** 0.5
+    compound = max(-1.0, min(1.0, compound))
+
+    return {
+        'neg': round(abs(neg_sum / total), 3),
+        'neu': round(abs(neu_count / total), 3),
+        'pos': round(abs(pos_sum / total), 3),
+        'compound': round(compound, 4)
+    }
+
+
+def score_corpus(word_counts):
+    """ Computes the sentiment scores of several texts at once
+    Args:
+        word_counts (dict): maps the label of each text to its word counts
+    Returns:
+        scores (dict): maps the label of each text to its sentiment scores
+
+    Word counts stored compactly (see nlp_compact) are scored with array operations, looking up the valence of each
+    word of the shared vocabulary only once.
+    """
+    vocab = getattr(word_counts, 'vocab', None)
+    if vocab is None:
+        return {label: score_counts(word_count) for label, word_count in word_counts.items()}
+
+    import numpy as np
+
+    # valence of every word in the vocabulary, with the words that VADER skips marked as missing
+    valences = np.array([word_valence(word) for word in vocab.words], dtype=float)
+    skipped = np.isnan(valences)
+    valences[skipped] = 0.0
+
+    scores = {}
+    for label, doc in word_counts.items():
+        doc_valences = valences[doc.ids]
+        counts = np.where(skipped[doc.ids], 0, doc.counts)
+
+        scores[label] = _scores(float(doc_valences @ counts),
+                                float(((doc_valences + 1) * counts)[doc_valences > 0].sum()),
+                                float(((doc_valences - 1) * counts)[doc_valences < 0].sum()),
+                                int(counts[doc_valences == 0].sum()))
+
+    return scores
+
+
+def cached_scores(data, labels=None):
+    """ Gets the sentiment scores of registered texts, scoring each text only once and storing its scores in the data
+    so that every visualization can share them
+    Args:
+        data (dict): data extracted from the files as a dictionary attribute--> raw data (the scores are only stored if
+                     it has a 'sentiment' entry)
+        labels (list): optional labels (str) of the texts of interest (every registered text if None)
+    Returns:
+        scores (dict): maps the label of each text of interest to its sentiment scores
+    """
+    word_counts = data['wordcount']
+    if labels is None:
+        labels = list(word_counts)
+
+    if 'sentiment' not in data:
+        # there is nowhere to keep the scores (and the data isn't changed), so the texts are just scored
+        if len(labels) == len(word_counts):
+            return score_corpus(word_counts)
+        return {label: score_counts(word_counts[label]) for label in labels}
+
+    sentiment = data['sentiment']
+
+    # score the texts that haven't been scored since they were registered (sentiment registered as a statistic of the
+    # framework knows about every text, so only its memo tells which texts were already scored, and the scores are
+    # stored with the documents of the framework, since its data is read-only)
+    corpus = getattr(data, 'corpus', None)
+    if hasattr(sentiment, 'memo'):
+        scored = sentiment.memo
+
+        def store(values):
+            corpus.store_statistics('sentiment', values)
+    else:
+        scored = sentiment
+        store = sentiment.update
+
+    missing = [label for label in labels if label not in scored]
+    if missing:
+        if len(missing) == len(word_counts):
+            store(score_corpus(word_counts))
+        else:
+            store({label: score_counts(word_counts[label]) for label in missing})
+
+    return {label: sentiment[label] for label in labels}
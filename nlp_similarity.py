@@ -0,0 +1,119 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+nlp_similarity.py: TF-IDF weighting, cosine similarity, nearest neighbours and distinctive keywords of registered
+documents, computed with sparse matrix operations on the document-term matrix
+"""
+# import necessary libraries
+import numpy as np
+
+# largest number of similarity scores held in memory at once when finding nearest neighbours block by block
+BLOCK_ENTRIES = 1 << 24
+
+
+def tfidf(counts, sublinear=False):
+    """ Weight the word counts of every document by how rare each word is across the documents
+    Args:
+        counts (scipy.sparse.csr_matrix): document-term matrix holding word counts (one row per document)
+        sublinear (bool): whether to dampen the term frequencies to 1 + log(count)
+    Returns:
+        weights (scipy.sparse.csr_matrix): TF-IDF weights of each document, scaled so that every row has a length of 1
+        idf (np.ndarray): inverse document frequency of each word (column)
+    """
+    num_docs = counts.shape[0]
+
+    # number of documents each word appears in, and the smoothed inverse of it (as in scikit-learn)
+    doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log((1 + num_docs) / (1 + doc_freq)) + 1
+
+    # weight the stored entries directly, so the sparse structure of the matrix is reused as it is
+    weights = counts.astype(np.float64, copy=True)
+    if sublinear:
+        weights.data = 1 + np.log(weights.data)
+    weights.data *= idf[weights.indices]
+
+    # scale every row to unit length so that dot products between rows are cosine similarities
+    rows = np.repeat(np.arange(num_docs), np.diff(weights.indptr))
+    lengths = np.sqrt(np.bincount(rows, weights=weights.data ** 2, minlength=num_docs))
+    weights.data /= lengths[rows]
+
+    return weights, idf
+
+
+def cosine_similarity(weights):
+    """ Compute the cosine similarity of every pair of documents
+    Args:
+        weights (scipy.sparse.csr_matrix): rows of unit length, e.g., from tfidf
+    Returns:
+        similarity (np.ndarray): dense matrix with the similarity of documents i and j in row i, column j
+    """
+    return (weights @ weights.T).toarray()
+
+
+def nearest_neighbors(weights, n=5, block_size=None):
+    """ Find the n most similar other documents of every document, comparing one block of documents to all of them at a
+    time so that the full matrix of similarities is never held in memory
+    Args:
+        weights (scipy.sparse.csr_matrix): rows of unit length, e.g., from tfidf
+        n (int): number of neighbours of each document
+        block_size (int): optional number of documents compared at a time (chosen from BLOCK_ENTRIES if None)
+    Returns:
+        neighbors (np.ndarray): row indices of the neighbours of each document, most similar first
+        scores (np.ndarray): cosine similarity of each document to each of its neighbours
+    """
+    num_docs = weights.shape[0]
+    n = min(n, num_docs - 1)
+
+    if block_size is None:
+        block_size = max(1, BLOCK_ENTRIES // max(num_docs, 1))
+
+    neighbors = np.zeros((num_docs, max(n, 0)), dtype=np.int64)
+    scores = np.zeros((num_docs, max(n, 0)))
+    if n <= 0:
+        return neighbors, scores
+
+    transposed = weights.T.tocsc()
+    for start in range(0, num_docs, block_size):
+        stop = min(start + block_size, num_docs)
+        rows = np.arange(stop - start)
+
+        # similarities of the documents in the block to every document, leaving each document out of its own results
+        block = (weights[start:stop] @ transposed).toarray()
+        block[rows, rows + start] = -np.inf
+
+        # pick the n largest similarities of each row without sorting the whole row, then sort just those
+        top = np.argpartition(block, -n, axis=1)[:, -n:]
+        top_scores = block[rows[:, None], top]
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+
+        neighbors[start:stop] = top[rows[:, None], order]
+        scores[start:stop] = top_scores[rows[:, None], order]
+
+    return neighbors, scores
+
+
+def top_weights(weights, n=10):
+    """ Find the n largest entries of every row of a sparse matrix, e.g., the most distinctive words of each document
+    Args:
+        weights (scipy.sparse.csr_matrix): matrix of interest
+        n (int): number of entries per row
+    Returns:
+        top (list): for each row, (column, weight) pairs of its n largest entries, largest first
+    """
+    lengths = np.diff(weights.indptr)
+    rows = np.repeat(np.arange(weights.shape[0]), lengths)
+
+    # sort the entries of every row by weight at once, then keep the first n of each row
+    order = np.lexsort((-weights.data, rows))
+    rank = np.arange(len(order)) - np.repeat(weights.indptr[:-1], lengths)
+    keep = order[rank < n]
+
+    columns = weights.indices[keep].tolist()
+    values = weights.data[keep].tolist()
+    bounds = np.concatenate(([0], np.cumsum(np.minimum(lengths, n)))).tolist()
+
+    return [list(zip(columns[bounds[row]:bounds[row + 1]], values[bounds[row]:bounds[row + 1]]))
+            for row in range(weights.shape[0])]
@@ -0,0 +1,321 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+nlp_sketch.py: Approximate, fixed-size word counts of registered texts: a Count-Min Sketch answers how often any word
+occurs, and a Space-Saving table keeps the most frequent words (the heavy hitters)
+"""
+# import necessary libraries
+from collections import Counter
+from collections.abc import Mapping
+from itertools import chain
+import hashlib
+import heapq
+import math
+import numpy as np
+
+# number of distinct words counted exactly before they are added to the sketch, which bounds the memory used while a
+# text is being read
+BUFFER_SIZE = 1 << 16
+
+
+def _hashes(words):
+    """ Hash words the same way in every process, so that sketches built by different workers can be merged
+    Args:
+        words (list): words of interest (str)
+    Returns:
+        first (np.ndarray): first 32-bit hash of each word
+        second (np.ndarray): second 32-bit hash of each word (always odd)
+    """
+    digests = b''.join(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest() for word in words)
+    halves = np.frombuffer(digests, dtype='<u4').reshape(len(words), 2).astype(np.int64)
+    return halves[:, 0], halves[:, 1] | 1
+
+
+class CountMinSketch:
+    """ Table of counters that estimates the frequency of any word in a fixed amount of memory, never underestimating it
+    Attributes:
+        width (int): number of counters per row
+        depth (int): number of rows, each of which hashes the words differently
+        table (np.ndarray): the counters
+        total (int): number of words counted
+    """
+
+    def __init__(self, width, depth):
+        assert isinstance(width, int) and width > 0, 'The width of the sketch must be a positive integer'
+        assert isinstance(depth, int) and depth > 0, 'The depth of the sketch must be a positive integer'
+
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    @classmethod
+    def from_error(cls, epsilon, delta):
+        """ Build a sketch whose estimates exceed the true counts by at most epsilon times the number of words counted,
+        except with probability delta
+        Args:
+            epsilon (float): error allowed per word, as a share of the number of words counted
+            delta (float): probability of an estimate exceeding that error
+        Returns:
+            sketch (CountMinSketch): an empty sketch of the matching size
+        """
+        assert 0 < epsilon < 1 and 0 < delta < 1, 'The error and its probability must be between 0 and 1'
+        return cls(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)))
+
+    def _columns(self, words):
+        """ Find the counter of each word in each row
+        Args:
+            words (list): words of interest (str)
+        Returns:
+            columns (np.ndarray): column of each word (one row per row of the table, one column per word)
+        """
+        first, second = _hashes(words)
+
+        # derive the hash of every row from two hashes (Kirsch and Mitzenmacher's double hashing)
+        rows = np.arange(self.depth, dtype=np.int64)[:, None]
+        return (first[None, :] + rows * second[None, :]) % self.width
+
+    def add(self, counts):
+        """ Count words
+        Args:
+            counts (dict): maps each word (str) to how many more times it occurred
+        Returns:
+            None (just updates the counters)
+        """
+        if not counts:
+            return
+
+        columns = self._columns(list(counts))
+        values = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+        for row in range(self.depth):
+            np.add.at(self.table[row], columns[row], values)
+        self.total += int(values.sum())
+
+    def estimate(self, words):
+        """ Estimate how often words occurred
+        Args:
+            words (list): words of interest (str)
+        Returns:
+            estimates (np.ndarray): estimated count of each word (never below its true count)
+        """
+        if not words:
+            return np.zeros(0, dtype=np.int64)
+
+        columns = self._columns(words)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def error(self):
+        """ Get the most an estimate exceeds the true count by, except with a probability of e ** -depth
+        Returns:
+            error (float): e / width times the number of words counted
+        """
+        return math.e / self.width * self.total
+
+    def merge(self, other):
+        """ Combine two sketches of the same size, as if their words had been counted by one sketch
+        Args:
+            other (CountMinSketch): sketch of the same width and depth
+        Returns:
+            merged (CountMinSketch): a new sketch counting the words of both
+        """
+        assert (self.width, self.depth) == (other.width, other.depth), 'Only sketches of the same size can be merged'
+
+        merged = CountMinSketch(self.width, self.depth)
+        merged.table = self.table + other.table
+        merged.total = self.total + other.total
+        return merged
+
+
+class SpaceSaving:
+    """ Keeps the counts of at most a fixed number of words, so that the most frequent words of a text are always kept
+    Attributes:
+        capacity (int): maximum number of words kept
+        counts (dict): maps each word kept (str) to a count that is at least its true count
+        errors (dict): maps each word kept (str) to how much its count may exceed its true count
+        floor (int): the most that a word that isn't kept may occur
+    """
+
+    def __init__(self, capacity):
+        assert isinstance(capacity, int) and capacity > 0, 'The number of heavy hitters must be a positive integer'
+
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.floor = 0
+
+    def merge(self, other):
+        """ Combine two tables, as if their words had been counted by one table (Agarwal et al.'s mergeable summaries)
+        Args:
+            other (SpaceSaving or dict): another table, or exact counts of words (str)
+        Returns:
+            merged (SpaceSaving): a new table of this table's capacity
+        """
+        if not isinstance(other, SpaceSaving):
+            exact = SpaceSaving(max(len(other), 1))
+            exact.counts = dict(other)
+            exact.errors = dict.fromkeys(other, 0)
+            other = exact
+
+        # a word missing from a table may have occurred as often as that table's floor
+        counts = {}
+        errors = {}
+        for word in chain(self.counts, (word for word in other.counts if word not in self.counts)):
+            counts[word] = self.counts.get(word, self.floor) + other.counts.get(word, other.floor)
+            errors[word] = self.errors.get(word, self.floor) + other.errors.get(word, other.floor)
+
+        merged = SpaceSaving(self.capacity)
+        merged.floor = self.floor + other.floor
+
+        # keep the words with the largest counts, and raise the floor to the largest count that is dropped
+        if len(counts) > self.capacity:
+            kept = heapq.nlargest(self.capacity + 1, counts.items(), key=lambda item: item[1])
+            merged.floor = max(merged.floor, kept.pop()[1])
+            counts = dict(kept)
+
+        merged.counts = counts
+        merged.errors = {word: errors[word] for word in counts}
+        return merged
+
+
+class ApproximateCounts(Mapping):
+    """ Read-only, Counter-like word counts of one document held in a fixed amount of memory: any word's count is
+    estimated by a Count-Min Sketch, and only the heavy hitters are listed when iterating
+    Attributes:
+        sketch (CountMinSketch): estimates the count of any word
+        heavy (SpaceSaving): the most frequent words and their counts
+        lengths (dict): exact word length histogram, mapping each word length (int) to how many words have that length
+    """
+
+    def __init__(self, epsilon=0.001, delta=0.01, capacity=1000):
+        self.sketch = CountMinSketch.from_error(epsilon, delta)
+        self.heavy = SpaceSaving(capacity)
+        self.lengths = {}
+
+    @classmethod
+    def from_words(cls, words, epsilon=0.001, delta=0.01, capacity=1000):
+        """ Count a stream of words, holding at most BUFFER_SIZE distinct words in memory at once
+        Args:
+            words (iterable): words of the text (str)
+            epsilon (float): error allowed per word, as a share of the number of words
+            delta (float): probability of a word's count exceeding that error
+            capacity (int): number of heavy hitters kept
+        Returns:
+            counts (ApproximateCounts): approximate counts of the words
+        """
+        counts = cls(epsilon, delta, capacity)
+        buffer = Counter()
+
+        for word in words:
+            buffer[word] += 1
+            if len(buffer) >= BUFFER_SIZE:
+                counts.add(buffer)
+                buffer = Counter()
+
+        counts.add(buffer)
+        return counts
+
+    def add(self, counts):
+        """ Count words
+        Args:
+            counts (dict): maps each word (str) to how many more times it occurred
+        Returns:
+            None (just updates the sketch, the heavy hitters and the word lengths)
+        """
+        self.sketch.add(counts)
+        self.heavy = self.heavy.merge(counts)
+        for word, count in counts.items():
+            self.lengths[len(word)] = self.lengths.get(len(word), 0) + count
+
+    def __getitem__(self, word):
+        # a word's count is at most both its sketch estimate and its heavy hitter count (or the heavy hitter floor)
+        return int(min(self.sketch.estimate([word])[0], self.heavy.counts.get(word, self.heavy.floor)))
+
+    def __contains__(self, word):
+        return word in self.heavy.counts
+
+    def __iter__(self):
+        return iter(self.heavy.counts)
+
+    def __len__(self):
+        return len(self.heavy.counts)
+
+    def items(self):
+        words = list(self.heavy.counts)
+        estimates = np.minimum(self.sketch.estimate(words), list(self.heavy.counts.values())).tolist()
+        return list(zip(words, estimates))
+
+    def values(self):
+        return [count for _, count in self.items()]
+
+    def total(self):
+        """ Get the number of words in the document (exact)
+        Returns:
+            total (int): number of words counted
+        """
+        return self.sketch.total
+
+    def most_common(self, n=None):
+        """ List the n most common heavy hitters and their estimated counts, like Counter.most_common
+        Args:
+            n (int): optional number of words to list (every heavy hitter if None)
+        Returns:
+            most_common (list): (word, count) pairs, most common first
+        """
+        if n is None:
+            return sorted(self.items(), key=lambda item: item[1], reverse=True)
+        return heapq.nlargest(n, self.items(), key=lambda item: item[1])
+
+    def bounds(self, word):
+        """ Bound the true count of a word
+        Args:
+            word (str): word of interest
+        Returns:
+            lower (int): the word occurred at least this often (for certain if it's a heavy hitter, otherwise except
+                         with the sketch's probability of error)
+            upper (int): the word occurred at most this often (for certain)
+        """
+        upper = self[word]
+        if word in self.heavy.counts:
+            lower = self.heavy.counts[word] - self.heavy.errors[word]
+        else:
+            lower = self.sketch.estimate([word])[0] - self.sketch.error()
+
+        return max(int(math.ceil(lower)), 0), upper
+
+    def error_bounds(self):
+        """ Describe how far the counts may be from the true counts
+        Returns:
+            bounds (dict): 'point': the most any count exceeds the true count by, except with probability
+                           'confidence' of that being wrong; 'heavy_hitters': the most a heavy hitter count exceeds
+                           the true count by (for certain), and the most that a word missing from the heavy hitters
+                           may occur
+        """
+        return {
+            'point': self.sketch.error(),
+            'confidence': 1 - math.exp(-self.sketch.depth),
+            'heavy_hitters': self.heavy.floor
+        }
+
+    def merge(self, other):
+        """ Combine the counts of two texts counted with the same settings, e.g., by different worker processes
+        Args:
+            other (ApproximateCounts or dict): approximate counts, or exact counts of words (str)
+        Returns:
+            merged (ApproximateCounts): a new set of counts covering the words of both
+        """
+        merged = ApproximateCounts.__new__(ApproximateCounts)
+
+        if isinstance(other, ApproximateCounts):
+            merged.sketch = self.sketch.merge(other.sketch)
+            merged.heavy = self.heavy.merge(other.heavy)
+            merged.lengths = dict(Counter(self.lengths) + Counter(other.lengths))
+        else:
+            merged.sketch = self.sketch.merge(CountMinSketch(self.sketch.width, self.sketch.depth))
+            merged.heavy = self.heavy
+            merged.lengths = dict(self.lengths)
+            merged.add(other)
+
+        return merged
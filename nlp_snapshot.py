@@ -0,0 +1,212 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+nlp_snapshot.py: Binary snapshots of the registered documents: a vocabulary table and the counts of every document as
+NumPy arrays (one sparse document-term matrix per kind of counts), which are memory-mapped when a snapshot is reopened
+so that only the documents that are used get read from disk
+"""
+# import necessary libraries
+import json
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from nlp_compact import CompactWordCounts, DocumentCounts
+
+# bumped whenever the layout of a snapshot changes, so that a snapshot is never misread
+SNAPSHOT_VERSION = 1
+
+# file describing the snapshot: its documents, the kinds of counts saved for them and how they were built
+MANIFEST = 'manifest.json'
+
+
+class MappedVocabulary:
+    """ Read-only vocabulary of a snapshot, stored as the UTF-8 bytes of every word laid end to end and decoded the
+    first time a word is needed
+    Attributes:
+        blob (np.ndarray): bytes (uint8) of the words, one after the other
+        offsets (np.ndarray): where each word starts in blob, followed by the length of blob
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+        self._words = None
+        self._ids = None
+
+    @property
+    def words(self):
+        """ The words, indexed by their ids
+        Returns:
+            words (list): the words (str)
+        """
+        if self._words is None:
+            data = self.blob.tobytes()
+            bounds = self.offsets.tolist()
+            self._words = [data[start:end].decode('utf-8') for start, end in zip(bounds, bounds[1:])]
+        return self._words
+
+    @property
+    def ids(self):
+        """ The id of every word
+        Returns:
+            ids (dict): maps each word (str) to its integer id
+        """
+        if self._ids is None:
+            self._ids = {word: word_id for word_id, word in enumerate(self.words)}
+        return self._ids
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __contains__(self, word):
+        return word in self.ids
+
+
+def _save_words(directory, name, words):
+    """ Write a vocabulary as a byte table and the offsets of its words
+    Args:
+        directory (str): folder of the snapshot
+        name (str): prefix of the files
+        words (list): the words (str), indexed by their ids
+    Returns:
+        None (just writes the files)
+    """
+    encoded = [word.encode('utf-8') for word in words]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(word) for word in encoded], out=offsets[1:])
+
+    np.save(os.path.join(directory, name + '.words.npy'), np.frombuffer(b''.join(encoded), dtype=np.uint8))
+    np.save(os.path.join(directory, name + '.offsets.npy'), offsets)
+
+
+def _load_array(directory, filename, mmap=True):
+    """ Read an array of a snapshot
+    Args:
+        directory (str): folder of the snapshot
+        filename (str): name of the .npy file
+        mmap (bool): whether to memory-map the array instead of reading it into memory
+    Returns:
+        array (np.ndarray): the array (read-only if memory-mapped)
+    """
+    path = os.path.join(directory, filename)
+
+    try:
+        return np.load(path, mmap_mode='r' if mmap else None)
+    except ValueError:
+        # empty arrays can't be memory-mapped
+        return np.load(path)
+
+
+def save(nlp, path):
+    """ Write the registered documents of a framework to a snapshot folder, replacing any snapshot already there
+    Args:
+        nlp (Nlp): the framework
+        path (str): folder of the snapshot
+    Returns:
+        None (just writes the snapshot)
+    """
+    assert isinstance(path, str), 'The snapshot folder must be specified as a string'
+    assert not os.path.exists(path) or os.path.exists(os.path.join(path, MANIFEST)) or not os.listdir(path), \
+        'The snapshot folder must be empty or hold an older snapshot'
+    assert nlp.sketch is None and all(not hasattr(document.wordcount, 'bounds') for document in nlp.corpus.values()), \
+        'Approximate word counts cannot be saved in a snapshot'
+
+    # labels of the documents holding each kind of counts, in the order the documents were registered
+    kinds = {}
+    for label, document in nlp.corpus.items():
+        for kind in document.counts:
+            kinds.setdefault(kind, []).append(label)
+
+    # write the snapshot next to its folder, then move it into place, so a failed save never leaves half a snapshot
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.snapshot-', dir=parent)
+
+    try:
+        for kind, labels in kinds.items():
+            # the counts of each kind become one sparse matrix, with a row per document and a column per vocabulary id
+            if kind == 'wordcount' and nlp.corpus.compact is not None:
+                store = nlp.corpus.compact
+            else:
+                store = CompactWordCounts()
+                for label in labels:
+                    store[label] = nlp.corpus[label].counts[kind]
+
+            matrix = store.matrix(labels)
+            _save_words(staging, kind, store.vocab.words)
+            np.save(os.path.join(staging, kind + '.indptr.npy'), matrix.indptr.astype(np.int64))
+            np.save(os.path.join(staging, kind + '.indices.npy'), matrix.indices.astype(np.int32))
+            np.save(os.path.join(staging, kind + '.counts.npy'), matrix.data.astype(np.int64))
+
+        # how the documents were built, so that the snapshot can be extended or rebuilt the same way
+        stop_words = nlp.stop_words
+        manifest = {
+            'version': SNAPSHOT_VERSION,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'labels': list(nlp.corpus),
+            'counts': kinds,
+            'stop_words': {'stopfile': nlp.stopfile, 'parser': nlp.stop_parser, 'count': len(stop_words),
+                           'fingerprint': type(nlp)._stop_word_fingerprint(stop_words)},
+            'ngrams': nlp.ngrams,
+            'compact': nlp.compact,
+            'sources': nlp.sources
+        }
+        with open(os.path.join(staging, MANIFEST), 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.rename(staging, path)
+
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def read_manifest(path):
+    """ Read the description of a snapshot
+    Args:
+        path (str): folder of the snapshot
+    Returns:
+        manifest (dict): the documents of the snapshot, the kinds of counts saved for them, and the stop word, parser
+                         and counting settings they were built with
+    """
+    assert isinstance(path, str), 'The snapshot folder must be specified as a string'
+
+    with open(os.path.join(path, MANIFEST)) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    assert manifest.get('version') == SNAPSHOT_VERSION, 'The snapshot was written by an incompatible version'
+    return manifest
+
+
+def documents(path, manifest, mmap=True):
+    """ Reopen the counts of every document of a snapshot without reading them into memory
+    Args:
+        path (str): folder of the snapshot
+        manifest (dict): description of the snapshot (see read_manifest)
+        mmap (bool): whether to memory-map the arrays (False to read them into memory at once)
+    Returns:
+        counts (dict): maps the label of each document, in the order they were registered, to its counts (each kind of
+                       counts a read-only, Counter-like DocumentCounts view into the arrays)
+    """
+    counts = {label: {} for label in manifest['labels']}
+
+    for kind, labels in manifest['counts'].items():
+        vocab = MappedVocabulary(_load_array(path, kind + '.words.npy', mmap),
+                                 _load_array(path, kind + '.offsets.npy', mmap))
+        indptr = _load_array(path, kind + '.indptr.npy', mmap=False).tolist()
+        indices = _load_array(path, kind + '.indices.npy', mmap)
+        values = _load_array(path, kind + '.counts.npy', mmap)
+
+        # each document only views its own rows of the arrays, which are paged in once the document is used
+        for row, label in enumerate(labels):
+            start, end = indptr[row], indptr[row + 1]
+            counts[label][kind] = DocumentCounts(vocab, indices[start:end], values[start:end])
+
+    return counts
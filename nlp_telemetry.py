@@ -0,0 +1,145 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+nlp_telemetry.py: Logging and per-stage measurements (timings, tokens and bytes read) of the documents registered with
+the framework
+"""
+# import necessary libraries
+import json
+import logging
+import time
+
+# logger shared by the modules of the framework (silent unless its verbosity is raised, apart from warnings)
+logger = logging.getLogger('nlp')
+
+# handler that writes the framework's messages to the console once the verbosity is raised
+_HANDLER = None
+
+# stages of registering a document, in the order they happen (files are only read as a stage of their own by
+# Nlp.aload_texts, the other loaders read them while they are parsed)
+STAGES = ('read', 'parse', 'filter', 'stats', 'save')
+
+
+def set_verbosity(level='INFO'):
+    """ Choose which messages of the framework are shown on the console
+    Args:
+        level (str or int): 'DEBUG' for every step of every document, 'INFO' for one message per document or batch,
+                            'WARNING' for problems only, or None for nothing but problems (the default)
+    Returns:
+        None (just configures the logger of the framework)
+    """
+    global _HANDLER
+
+    if level is None:
+        level = logging.WARNING
+
+    if _HANDLER is None:
+        _HANDLER = logging.StreamHandler()
+        _HANDLER.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(_HANDLER)
+
+    logger.setLevel(level)
+
+
+class StageMetrics:
+    """ Measurements of how long each stage of registering documents takes and how much it processes
+    Attributes:
+        records (list): one dict per registered file, with its 'label', 'filename', the seconds spent on each of the
+                        STAGES (None for stages that were skipped or that ran interleaved with another one), 'seconds'
+                        in total, 'tokens' read, 'words' kept after filtering, 'bytes' read, whether the results came
+                        from the cache ('cached'), and the 'time' it was registered
+        hooks (list): functions called with each new record, e.g., to feed the measurements to a monitoring system
+    """
+
+    def __init__(self):
+        self.records = []
+        self.hooks = []
+
+    def add_hook(self, hook):
+        """ Register a function that is called with every new record
+        Args:
+            hook (function): takes a record (dict)
+        Returns:
+            None (just stores the hook)
+        """
+        assert callable(hook), 'The hook must be a callable function'
+        self.hooks.append(hook)
+
+    def record(self, label, filename, timings, save=None):
+        """ Store the measurements of a registered file
+        Args:
+            label (str): label of the document (None if the file was split into several documents)
+            filename (str): name of the file
+            timings (dict): measurements taken while the file was processed (see new_timings)
+            save (float): optional seconds spent saving the results into the framework
+        Returns:
+            record (dict): the stored record
+        """
+        record = {'label': label, 'filename': filename}
+        record.update(timings)
+        record['save'] = save
+        record['seconds'] = sum(record[stage] or 0 for stage in STAGES)
+        record['time'] = time.time()
+        self.records.append(record)
+
+        for hook in self.hooks:
+            try:
+                hook(record)
+            except Exception as e:
+                # a broken hook must not stop documents from being registered
+                logger.warning('Metrics hook %r failed: %s', hook, e)
+
+        return record
+
+    def summary(self):
+        """ Add up the measurements of every record
+        Returns:
+            summary (dict): the 'files', 'cached' files, 'tokens', 'words' and 'bytes' processed, the 'seconds' spent
+                            on each stage and in total, and the 'tokens_per_sec' of the files whose tokens were counted
+        """
+        summary = {'files': len(self.records), 'cached': sum(bool(record['cached']) for record in self.records)}
+
+        for field in ('tokens', 'words', 'bytes'):
+            summary[field] = sum(record[field] or 0 for record in self.records)
+        summary['seconds'] = {stage: sum(record[stage] or 0 for record in self.records) for stage in STAGES}
+        summary['seconds']['total'] = sum(record['seconds'] for record in self.records)
+
+        # streamed and cached files don't count their tokens, so they are left out of the throughput
+        counted = sum(record['seconds'] for record in self.records if record['tokens'] is not None)
+        summary['tokens_per_sec'] = summary['tokens'] / counted if counted > 0 else None
+        return summary
+
+    def to_json(self, path=None):
+        """ Export the records and their summary as JSON
+        Args:
+            path (str): optional file where the JSON is written
+        Returns:
+            text (str): the JSON text
+        """
+        text = json.dumps({'summary': self.summary(), 'records': self.records}, indent=2, default=str)
+
+        if path is not None:
+            with open(path, 'w') as output:
+                output.write(text)
+
+        return text
+
+    def clear(self):
+        """ Forget every record (the hooks are kept)
+        Returns:
+            None (just empties the records)
+        """
+        self.records = []
+
+
+def new_timings():
+    """ Start the measurements of a file that is about to be processed
+    Returns:
+        timings (dict): the seconds spent on each stage before saving, the 'tokens', 'words' and 'bytes' processed,
+                        and whether the results came from the cache ('cached'), all filled in while processing
+    """
+    return {'read': None, 'parse': None, 'filter': None, 'stats': None, 'tokens': None, 'words': None, 'bytes': None,
+            'cached': False}
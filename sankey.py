@@ -6,130 +6,119 @@ Reusable NLP Library - HW3
 
 sankey.py: A reusable library for Sankey visualization
 """
-# import necessary libraries
-import plotly.graph_objects as go
+# import necessary libraries (plotly is only imported once a diagram is drawn)
 import pandas as pd
+import numpy as np
 
 
-def _code_mapping(df, src, targ):
-    """ Assigns specific values within columns of a dataframe to integers that can be linked via a Sankey chart
+def sankey_links(df, *cols, vals=None, threshold=None):
+    """ Builds the links and nodes of a Sankey diagram without drawing it, so that large diagrams can be prepared (and
+    stored) ahead of time
     Args:
         df (pd.DataFrame): input Pandas dataframe
-        src (str): input name of column containing the source values of the Sankey diagram
-        targ (str): input name of column containing the target values of the Sankey diagram
+        *cols (tuple): names of columns (str) with the values in df for the Sankey diagram layers, from left to right
+        vals (series): optional thickness contributed by each row of df (each row counts as 1 if None)
+        threshold (int): optional value that a link must exceed to be shown on the diagram
 
     Returns:
-        df (pd.DataFrame): an updated version of the inputted dataframe in which each value is mapped to one integer
-        labels (list of str): labels used for the bars of the Sankey diagram
+        links (dict): 'source' and 'target' (np.ndarray of node indices), 'value' (np.ndarray of link thicknesses),
+                      'labels' (list of str, the label of each node) and 'layers' (np.ndarray, the layer of each node)
+
+    Each layer has its own nodes, so a value that appears in two layers is shown as two separate nodes.
     """
-    # Checking that the inputted parameters are of a valid type
+    # Checking that the inputted parameters are of a valid type and/or value
     assert isinstance(df, pd.DataFrame), 'The inputted dataframe must be a Pandas dataframe'
-    assert isinstance(src, str), 'The name of the column containing the source values of the Sankey diagram must be ' \
-                                 'inputted as a string'
-    assert isinstance(targ, str), 'The name of the column containing the target values of the Sankey diagram must be ' \
-                                  'inputted as a string'
+    assert all(isinstance(col, str) for col in cols), 'The columns used for the Sankey diagram must be specified as ' \
+                                                      'strings'
+    assert len(cols) >= 2, 'You must specify at least 2 columns to generate the Sankey diagram with'
+    if threshold is not None:
+        assert isinstance(threshold, int), 'The minimum number of instances that a combination of values must have ' \
+                                           'to be shown on the diagram must be entered as an integer'
 
-    # Get distinct labels
-    data_types_dict = {src: str, targ: str}
-    df = df.astype(data_types_dict)
-    labels = sorted(list(set(list(df[src]) + list(df[targ]))))
+    # thickness contributed by each row, lined up with the rows by position
+    if vals is None:
+        weights = np.ones(len(df), dtype=np.int64)
+    else:
+        weights = np.asarray(vals)
+        assert len(weights) == len(df), 'There must be exactly one thickness per row of the dataframe'
+        assert np.issubdtype(weights.dtype, np.number), 'The thickness of the bars must be specified as numbers'
 
-    # Get integer codes
-    codes = list(range(len(labels)))
+    # stack the links between every pair of neighbouring layers with a single concatenation
+    links = pd.concat([pd.DataFrame({'layer': layer, 'src': df[cols[layer]].to_numpy(),
+                                     'targ': df[cols[layer + 1]].to_numpy(), 'value': weights})
+                       for layer in range(len(cols) - 1)], ignore_index=True)
 
-    # Create label to code mapping
-    lc_map = dict(zip(labels, codes))
+    # add up repeated links, then drop the links at or below the threshold before any node gets encoded
+    links = links.groupby(['layer', 'src', 'targ'], sort=False)['value'].sum().reset_index()
+    if threshold is not None:
+        links = links[links['value'] > threshold]
 
-    # Substitute names for codes in dataframe
-    df = df.replace({src: lc_map, targ: lc_map})
+    # give every (layer, value) pair its own node index, in the order the nodes are first linked
+    layers = links['layer'].to_numpy()
+    codes, nodes = pd.factorize(pd.MultiIndex.from_arrays([np.concatenate([layers, layers + 1]),
+                                                           np.concatenate([links['src'].to_numpy(),
+                                                                           links['targ'].to_numpy()])]))
 
-    return df, labels
+    return {
+        'source': codes[:len(links)],
+        'target': codes[len(links):],
+        'value': links['value'].to_numpy(),
+        'labels': [str(label) for label in nodes.get_level_values(1)],
+        'layers': np.asarray(nodes.get_level_values(0))
+    }
 
 
-def _prepare_sankey_data(df, src, targ, threshold=None):
-    """ Adjusts a dataframe so that it is suited for making a Sankey diagram with
+def draw_sankey(links, **kwargs):
+    """ Draws a Sankey diagram from links prepared by sankey_links
     Args:
-        df (pd.DataFrame): input Pandas dataframe
-        src (str): input name of column containing the source values of the Sankey diagram
-        targ (str): input name of column containing the target values of the Sankey diagram
-        threshold (int): minimum number of instances that a combination of values must have to be shown on the diagram
+        links (dict): links and nodes of the diagram, as returned by sankey_links
+        **kwargs (dict): additional parameters (strings linked to float) to personalize the Sankey chart further
 
     Returns:
-        df (pd.DataFrame): updated version of the inputted Pandas dataframe, which contains no rows where the count
-                           for rows with a certain combination of values is below a threshold (if specified)
+        Nothing, just generates and presents a Sankey diagram
     """
-    # Checking that the inputted parameters are of a valid type
-    assert isinstance(df, pd.DataFrame), 'The inputted dataframe must be a Pandas dataframe'
-    assert isinstance(src, str), 'The name of the column containing the source values of the Sankey diagram must be ' \
-                                 'inputted as a string'
-    assert isinstance(targ, str), 'The name of the column containing the target values of the Sankey diagram must be ' \
-                                  'inputted as a string'
-    assert isinstance(threshold, int), 'The minimum number of instances that a combination of values must have to be ' \
-                                       'shown on the diagram must be entered as an integer'
+    import plotly.graph_objects as go
 
-    # Aggregation: counts the number of artists grouped by both the source value and target value
-    df = df.groupby([src, targ]).size().reset_index(name="Counts")
-
-    # filters out rows where the count is below a certain threshold
-    if threshold is not None:
-        df = df[df['Counts'] > threshold]
-        df = df.astype(str)
+    # Prepares the aesthetics of the Sankey diagram (e.g. links, labels, optional padding, other specifics in kwargs)
+    link = {'source': links['source'], 'target': links['target'], 'value': links['value']}
+    pad = kwargs.get('pad', 50)
+    width = kwargs.get('width', 800)
+    height = kwargs.get('height', 800)
 
-    return df
+    # Prepares the nodes and generates the Sankey chart
+    node = {'label': links['labels'], 'pad': pad}
+    sk = go.Sankey(link=link, node=node)
+    fig = go.Figure(sk)
+    fig.update_layout(
+        autosize=False,
+        width=width,
+        height=height)
+    fig.show()
 
 
-def make_sankey(df, threshold, *cols, vals=None, **kwargs):
+def make_sankey(df, threshold, *cols, vals=None, render=True, **kwargs):
     """ Create a Sankey diagram linking src values to target values with thickness vals
     Args:
         df (pd.DataFrame): input Pandas dataframe
-        threshold (int): minimum number of instances needed for a combination of values to be shown on the diagram
+        threshold (int): value that a link must exceed to be shown on the diagram (the number of rows linking its two
+                         values, or the sum of their vals)
         *cols (tuple): names of columns (str) with the values in df for the Sankey diagram layers. The columns are shown
                        from left to right based on the order they are inputted (1st inputted column = left-most layer)
         vals (series): series for thickness of each bar on the Sankey diagram
+        render (bool): whether to draw the diagram (False to only prepare its links)
         **kwargs (dict): additional parameters (strings linked to float) to personalize the Sankey chart further
 
     Returns:
-        Nothing, just generates and presents a Sankey diagram
+        links (dict): links and nodes of the diagram (see sankey_links), which draw_sankey can draw again later
     """
     # Checking that the inputted parameters are of a valid type and/or value
-    assert isinstance(df, pd.DataFrame), 'The inputted dataframe must be a Pandas dataframe'
     assert isinstance(threshold, int), 'The minimum number of instances that a combination of values must have to be ' \
                                        'shown on the diagram must be entered as an integer'
-    assert all(isinstance(col, str) for col in cols), 'The columns used for the Sankey diagram must be specified as ' \
-                                                      'strings'
-    assert len(cols) >= 2, 'You must specify at least 2 columns to generate the Sankey diagram with'
-
-    # Stacks all the data indicated by the inputted columns into one dataframe
-    sankey_data = df[[cols[0], cols[1]]]
-    sankey_data.columns = ['src', 'targ']
-
-    for i in range(1, (len(cols) - 1)):
-        stacked = df[[cols[i], cols[i + 1]]]
-        stacked.columns = ['src', 'targ']
-        sankey_data = pd.concat([sankey_data, stacked], axis=0)
 
-    # Removes any rows where the value associated with a combination of items is below a threshold (if specified)
-    sankey_data = _prepare_sankey_data(sankey_data, 'src', 'targ', threshold=threshold)
+    # Stacks, aggregates and encodes the links between the layers, removing the links below the threshold
+    links = sankey_links(df, *cols, vals=vals, threshold=threshold)
 
-    # Assigns values to be used on the Sankey chart between two nodes if they aren't given
-    if vals is None:
-        vals = sankey_data['Counts']
-    else:
-        assert vals.dtype == 'int64', 'The thickness of the bars must be specified as integers'
+    if render:
+        draw_sankey(links, **kwargs)
 
-    # Prepares the aesthetics of the Sankey diagram (e.g. links, labels, optional padding, other specifics in kwargs)
-    sankey_data, labels = _code_mapping(sankey_data, 'src', 'targ')
-    link = {'source': sankey_data['src'], 'target': sankey_data['targ'], 'value': vals}
-    pad = kwargs.get('pad', 50)
-    width = kwargs.get('width', 800)
-    height = kwargs.get('height', 800)
-
-    # Prepares the nodes and generates the Sankey chart
-    node = {'label': labels, 'pad': pad}
-    sk = go.Sankey(link=link, node=node)
-    fig = go.Figure(sk)
-    fig.update_layout(
-        autosize=False,
-        width=width,
-        height=height)
-    fig.show()
+    return links
@@ -9,21 +9,34 @@ user-defined functions from the visualization library (taylorviz)
 """
 
 # import necessary libraries
+import argparse
 from nlp import Nlp
+import nlp_telemetry as nlp_tel
 from exception import LoadStopWordError
-import nltk
 import taylorviz as tviz
 
 
 def main():
-    # download a package needed for sentiment analysis
+    # optionally render the visualizations to files instead of displaying them (e.g., on a server without a display)
+    arg_parser = argparse.ArgumentParser(description='Visualize the songwriting style of Taylor Swift')
+    arg_parser.add_argument('--output-dir', help='folder where the visualizations are saved instead of displayed')
+    arg_parser.add_argument('--verbose', action='store_true', help='report each document as it gets registered')
+    arg_parser.add_argument('--metrics', help='JSON file where the timings of registering each document are saved')
+    args = arg_parser.parse_args()
+
+    # the framework only reports problems unless asked for more
+    if args.verbose:
+        nlp_tel.set_verbosity('INFO')
+
+    # download a package needed for sentiment analysis (NLTK is only imported once the arguments are valid)
+    import nltk
     nltk.download('vader_lexicon')
 
     # download a package needed for removing the stop words from a file
     nltk.download('stopwords')
 
-    # initialize framework
-    ts = Nlp()
+    # initialize framework, caching the results of each file so that re-runs skip files that haven't changed
+    ts = Nlp(cache_dir='.nlp_cache')
 
     # create a list of the files getting registered, a list of their labels, a list of the visualization functions
     # used to illustrate word data about them, and a list of labels for the visualizations
@@ -41,14 +54,17 @@ def main():
                          'Purples']
 
     try:
-        # register some text files
-        for i in range(len(files)):
-            ts.load_text(files[i], file_labels[i])
+        # register some text files, processing them in parallel
+        ts.load_texts(files, file_labels)
 
     except LoadStopWordError as pe:
         # indicates whether there was an issue with registering the files
         print(str(pe))
 
+    if args.metrics is not None:
+        # save how long each stage of registering the files took
+        ts.stage_metrics.to_json(args.metrics)
+
     # load all the visualization functions that don't require parameters
     for i in range(len(vis_funcs)):
         ts.load_visualization(name=vis_names[i], vizfunc=vis_funcs[i])
@@ -59,8 +75,12 @@ def main():
     # makes sentiment analysis bar subplots (positive vs. neutral vs. negative scores) for each of the files passed in
     ts.load_visualization('sentimentbar', tviz.sentiment_analysis_bars, 5, 2)
 
-    # display all the loaded visualizations
-    ts.visualize()
+    if args.output_dir is None:
+        # display all the loaded visualizations
+        ts.visualize()
+    else:
+        # render all the loaded visualizations in parallel and save them
+        ts.render(args.output_dir, formats=('png', 'html'))
 
 
 if __name__ == '__main__':
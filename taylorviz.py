@@ -7,13 +7,23 @@ Reusable NLP Library - HW3
 taylorviz.py: different visualization functions to illustrate findings about registered texts
 """
 # import necessary libraries
-from collections import defaultdict
-import matplotlib.pyplot as plt
-import sankey as sk
-import pandas as pd
-from nltk.sentiment import SentimentIntensityAnalyzer
-import numpy as np
-from wordcloud import WordCloud
+from collections import OrderedDict, defaultdict
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+import hashlib
+import heapq
+import os
+import re
+from nlp import top_words
+
+# matplotlib, plotly (through sankey), wordcloud, pandas, NumPy and NLTK (through nlp_sentiment) are only imported by
+# the visualizations that use them, so importing this module doesn't load every plotting library
+
+# word cloud images that were already drawn, keyed by the frequencies and options they were drawn with, from the
+# least to the most recently used
+_WORD_CLOUD_CACHE = OrderedDict()
+_WORD_CLOUD_CACHE_SIZE = 256
 
 
 def convert_file_to_string(word_count, max_words=None):
@@ -34,9 +44,7 @@ def convert_file_to_string(word_count, max_words=None):
         # making sure that the maximum word specification is inputted as an integer
         assert isinstance(max_words, int), 'The number of words considered from each file for analysis must be an ' \
                                            'integer'
-        word_count = {word: count for word, count in sorted(word_count.items(), key=lambda item: item[1],
-                                                            reverse=True)}
-        word_count = dict(word_count.items()[:max_words])
+        word_count = dict(heapq.nlargest(max_words, word_count.items(), key=itemgetter(1)))
 
     for word, count in word_count.items():
         # Extract each word in the word count dictionary and repeat them in the returned string based on their
@@ -48,17 +56,40 @@ def convert_file_to_string(word_count, max_words=None):
     return words
 
 
-def wordcount_sankey(data, word_list=None, k=5):
+def _words_of_interest(data, text, max_words=None):
+    """ Gets the word counts of a registered file, restricted to its most frequent words if max_words is given
+    Args:
+        data (dict): data extracted from the file as a dictionary attribute--> raw data
+        text (str): label of the file of interest
+        max_words (int): optional number of words considered from the file for analysis, based on their frequencies
+    Returns:
+        word_count (dict): contains the words of interest (key) and their frequencies (value)
+    """
+    if max_words is None:
+        return data['wordcount'][text]
+
+    # making sure that the maximum word specification is inputted as an integer
+    assert isinstance(max_words, int), 'The number of words considered from each file for analysis must be an integer'
+    return dict(top_words(data, text, max_words))
+
+
+def wordcount_sankey(data, word_list=None, k=5, key='wordcount', render=True):
     """ Maps each text to words on a Sankey diagram, where the thickness of the line is the word's frequency in the text
     Args:
         data (dict): data extracted from the file as a dictionary attribute--> raw data
         word_list (list): optional list containing a set of words (str) to be shown on the diagram
         k (int): the union of the k most common words across each file
+        key (str): data key of the counts shown on the diagram ('bigramcount' or 'trigramcount' to map each text to
+                   n-grams instead of words, see Nlp.count_ngrams)
+        render (bool): whether to draw the diagram (False to only prepare its links)
     Returns:
-        None (just generates a Sankey diagram!)
+        links (dict): links and nodes of the Sankey diagram (see sankey.sankey_links), drawn unless render is False
     """
+    import pandas as pd
+    import sankey as sk
+
     # Ensuring the inputted parameters are of a valid type
-    assert isinstance(data, defaultdict), 'The data extracted from this file must be stored in a dictionary'
+    assert isinstance(data, Mapping), 'The data extracted from this file must be stored in a dictionary'
 
     if k is not None:
         # Ensuring that k is an integer and not inputted with a word list
@@ -77,47 +108,187 @@ def wordcount_sankey(data, word_list=None, k=5):
                           'many words you want to consider across each file'
 
     # obtain the word count dictionary of a file
-    word_count_dict = data['wordcount']
+    assert key in data, 'No ' + key + ' has been counted for the texts'
+    word_count_dict = data[key]
 
     # initialize empty lists
     texts = []
     all_words = []
     all_counts = []
 
-    for text, word_count in word_count_dict.items():
-        # Sorts the word counts in descending order by counts
-        word_count = {word: count for word, count in sorted(word_count.items(), key=lambda item: item[1],
-                                                            reverse=True)}
-        # get a list of only the keys (words from each file)
-        words = list(word_count.keys())
+    if k is not None:
+        # get only the top k words from each file and add them to the words to be shown on the diagram
+        word_list = [word for text in word_count_dict for word, _ in top_words(data, text, k, key)]
 
-        if k is not None:
-            # get only the top k words from a file and add them to a list of words to be shown on the diagram
-            word_list += [word for word in words[:k]]
+    # the words without repeats, kept in the order they were listed so that the diagram is the same on every run
+    word_set = dict.fromkeys(word_list)
 
     for text, word_count in word_count_dict.items():
-        # Sorts the word count dictionary in descending order by counts
-        word_count = {word: count for word, count in sorted(word_count.items(), key=lambda item: item[1],
-                                                            reverse=True)}
-
-        for word, count in word_count.items():
-            if word in word_list:
-                # extracts the word, its count in a file, and the name of its file of origin and adds them to lists if
-                # the word is in word_list or part of the k most popular words across each file
-                all_words.append(word)
-                all_counts.append(count)
-                texts += [text]
+        # the words of each file go from most to least frequent (ties keep the order of the word list)
+        for word in sorted((word for word in word_set if word in word_count), key=word_count.__getitem__,
+                           reverse=True):
+            # extracts the word, its count in a file, and the name of its file of origin and adds them to lists if
+            # the word is in word_list or part of the k most popular words across each file
+            all_words.append(word)
+            all_counts.append(word_count[word])
+            texts += [text]
 
     # use all_words, all_counts, and texts to create a dataframe containing word count information about the texts
     word_count = list(zip(all_words, all_counts, texts))
     df_word_counts = pd.DataFrame(word_count, columns=['Word', 'Counts', 'Text'])
 
     # use the new dataframe to create a Sankey diagram
-    sk.make_sankey(df_word_counts, 0, 'Text', 'Word', vals=df_word_counts['Counts'])
+    return sk.make_sankey(df_word_counts, 0, 'Text', 'Word', vals=df_word_counts['Counts'], render=render)
+
+
+def _cloud_frequencies(word_count, normalize_plurals=True):
+    """ Prepares the word counts of a file for a word cloud the way WordCloud prepares the words of a text (mirroring
+    WordCloud.process_text with collocations off, which tests/test_word_clouds.py checks against the installed version)
+    Args:
+        word_count (dict): contains the words in a file (key) and their frequencies (value)
+        normalize_plurals (boolean): whether a word ending in 's' is merged into its singular form when both appear
+    Returns:
+        frequencies (dict): contains the words to draw (key) and their frequencies (value)
+    """
+    from wordcloud import STOPWORDS
+
+    stopwords = {word.lower() for word in STOPWORDS}
+    frequencies = defaultdict(int)
+
+    for word, count in word_count.items():
+        # split the word the way WordCloud splits a text, removing 's, numbers and WordCloud's own stop words
+        for token in re.findall(r"\w[\w']*", word):
+            if token.lower().endswith("'s"):
+                token = token[:-2]
+            if token and not token.isdigit() and token.lower() not in stopwords:
+                frequencies[token] += count
+
+    if normalize_plurals:
+        # merge plurals into the singular count (except for words ending in 'ss')
+        for token in list(frequencies):
+            if token.endswith('s') and not token.endswith('ss') and token[:-1] in frequencies:
+                frequencies[token[:-1]] += frequencies.pop(token)
+
+    return dict(frequencies)
+
+
+def _render_word_cloud(frequencies, options):
+    """ Lays out and draws one word cloud (run in a worker process when several clouds are drawn at once)
+    Args:
+        frequencies (dict): contains the words to draw (key) and their frequencies (value)
+        options (dict): keyword arguments for WordCloud
+    Returns:
+        image (np.ndarray): the drawn word cloud as an RGB image array
+    """
+    from wordcloud import WordCloud
+
+    return WordCloud(**options).generate_from_frequencies(frequencies).to_array()
+
+
+def _word_cloud_key(frequencies, options):
+    """ Builds the cache key of a word cloud from the frequencies and options it is drawn with
+    Args:
+        frequencies (dict): contains the words to draw (key) and their frequencies (value)
+        options (dict): keyword arguments for WordCloud
+    Returns:
+        key (str): hexadecimal digest identifying the word cloud
+    """
+    return hashlib.sha256(repr((sorted(frequencies.items()), sorted(options.items()))).encode()).hexdigest()
+
+
+def _cached_cloud(key):
+    """ Gets a word cloud that was already drawn in this session, marking it as the most recently used
+    Args:
+        key (str): cache key of the word cloud (see _word_cloud_key)
+    Returns:
+        image (np.ndarray): the drawn word cloud (None if it isn't in the cache)
+    """
+    image = _WORD_CLOUD_CACHE.get(key)
+    if image is not None:
+        _WORD_CLOUD_CACHE.move_to_end(key)
+    return image
+
+
+def _remember_cloud(key, image):
+    """ Keeps a drawn word cloud in the cache, forgetting the least recently used cloud once the cache is full
+    Args:
+        key (str): cache key of the word cloud (see _word_cloud_key)
+        image (np.ndarray): the drawn word cloud
+    Returns:
+        None (just updates the cache)
+    """
+    _WORD_CLOUD_CACHE[key] = image
+    _WORD_CLOUD_CACHE.move_to_end(key)
+    while len(_WORD_CLOUD_CACHE) > _WORD_CLOUD_CACHE_SIZE:
+        _WORD_CLOUD_CACHE.popitem(last=False)
+
+
+def word_cloud_images(data, colormaps=None, workers=None, cache_dir=None, max_words=None, **options):
+    """ Draws a word cloud image for each registered file from its word frequencies, laying out the clouds in parallel
+    and reusing clouds that were already drawn with the same frequencies and options
+    Args:
+        data (dict): data extracted from the file as a dictionary attribute--> raw data
+        colormaps (list of strings): optional list of color schemes for the words of each cloud ('viridis' if None)
+        workers (int): optional maximum number of worker processes (the number of CPUs if None, no pool if 1)
+        cache_dir (str): optional folder where drawn clouds are also saved, so they are reused across runs
+        max_words (int): optional number of words considered from each file, based on their frequencies
+        **options (dict): keyword arguments for WordCloud (e.g., background_color, min_font_size, normalize_plurals)
+    Returns:
+        images (dict): maps the label of each file to its word cloud as an RGB image array
+    """
+    import numpy as np
+
+    texts = list(data['wordcount'])
+    if colormaps is None:
+        colormaps = ['viridis'] * len(texts)
+
+    images = {}
+    jobs = {}
+
+    for text, colormap in zip(texts, colormaps):
+        cloud_options = dict(options, colormap=colormap)
+        frequencies = _cloud_frequencies(_words_of_interest(data, text, max_words),
+                                         cloud_options.get('normalize_plurals', True))
+        key = _word_cloud_key(frequencies, cloud_options)
+        path = os.path.join(cache_dir, key + '.npy') if cache_dir is not None else None
+
+        # reuse a cloud that was already drawn in this session or saved by an earlier run
+        cached = _cached_cloud(key)
+        if cached is not None:
+            images[text] = cached
+        elif path is not None and os.path.exists(path):
+            images[text] = np.load(path)
+            _remember_cloud(key, images[text])
+        else:
+            jobs[text] = (key, path, frequencies, cloud_options)
+
+    if jobs:
+        args = ([job[2] for job in jobs.values()], [job[3] for job in jobs.values()])
+
+        # lay out the remaining clouds, in parallel when there is more than one
+        if workers == 1 or len(jobs) == 1:
+            rendered = list(map(_render_word_cloud, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(jobs))) as executor:
+                rendered = list(executor.map(_render_word_cloud, *args))
+
+        for (text, (key, path, _, _)), image in zip(jobs.items(), rendered):
+            # remember the newly drawn clouds, forgetting the least recently used ones once the cache is full
+            _remember_cloud(key, image)
+
+            if path is not None:
+                os.makedirs(cache_dir, exist_ok=True)
+                np.save(path, image)
+
+            images[text] = image
+
+    # keep the files in the order they were registered
+    return {text: images[text] for text in texts}
 
 
 def make_word_clouds(data, colormaps=None, background_color='black', min_font_size=4, normalize_plurals=True,
-                     collocations=False, subplot_rows=4, subplot_columns=3, max_words=None):
+                     collocations=False, subplot_rows=4, subplot_columns=3, max_words=None, workers=None,
+                     cache_dir=None):
     """ Creates a word cloud that shows the words in a text, with words that appear more frequently appearing larger
         Args:
             data (dict): data extracted from the file as a dictionary attribute--> raw data
@@ -125,13 +296,19 @@ def make_word_clouds(data, colormaps=None, background_color='black', min_font_si
             background_color (string): the color of the word cloud's background
             min_font_size (int): The minimum font size used for the words
             normalize_plurals (boolean): A boolean value indicating whether the trailing 's' in words should be removed
-            collocations (boolean): A boolean value indicating whether bigrams are considered
+            collocations (boolean): A boolean value indicating whether bigrams are considered (the words are then
+                                    compiled back into a string, since bigrams can't be found from word counts)
             subplot_rows (int): the number of rows in the sub-plot
             subplot_columns (int): the number of columns in the sub-plot
             max_words (int): The maximum number of words represented on the word cloud
+            workers (int): optional maximum number of processes laying out the clouds (the number of CPUs if None)
+            cache_dir (str): optional folder where drawn clouds are saved, so unchanged clouds are reused across runs
         Returns:
             None (just generates word clouds)
         """
+    import matplotlib.pyplot as plt
+    from wordcloud import WordCloud
+
     # Assertion statements for the input parameters
     if colormaps is not None:
         assert isinstance(colormaps, list), 'The color schemes of the word cloud must be entered in a list'
@@ -145,38 +322,32 @@ def make_word_clouds(data, colormaps=None, background_color='black', min_font_si
     assert isinstance(subplot_rows, int), 'The number of rows for the subplot must be an integer'
     assert isinstance(subplot_columns, int), 'The number of columns for the subplot must be an integer'
 
-    # initialize empty lists
-    texts = []
-    word_strings = []
-
-    # obtain the word count dictionary of a file
-    word_count_dict = data['wordcount']
-
-    # grab the words from each file and compile them into one string per file
-    for text, word_count in word_count_dict.items():
-        words = convert_file_to_string(word_count, max_words=max_words)
-
-        # store the names of the files and their word strings into lists
-        texts.append(text)
-        word_strings.append(words)
+    if collocations:
+        # grab the words from each file and compile them into one string per file, so WordCloud can find bigrams
+        images = {}
+        for i, text in enumerate(data['wordcount']):
+            colormap = colormaps[i] if colormaps is not None else 'viridis'
+            words = convert_file_to_string(_words_of_interest(data, text, max_words))
+            images[text] = WordCloud(background_color=background_color, colormap=colormap,
+                                     min_font_size=min_font_size, normalize_plurals=normalize_plurals,
+                                     collocations=True).generate(words).to_array()
+    else:
+        # draw the word clouds straight from the word frequencies of each file
+        images = word_cloud_images(data, colormaps, workers=workers, cache_dir=cache_dir, max_words=max_words,
+                                   background_color=background_color, min_font_size=min_font_size,
+                                   normalize_plurals=normalize_plurals)
 
     # initializes the word cloud figure
     plt.figure()
 
-    # defines the default colormaps based on the number of registered texts
-    if colormaps is None:
-        colormaps = ['viridis'] * len(texts)
-
-    for i in range(len(texts)):
-        # generate a word cloud subplot for each file
+    for i, (text, image) in enumerate(images.items()):
+        # show a word cloud subplot for each file
         plt.subplot(subplot_rows, subplot_columns, i + 1)
-        wordcloud = WordCloud(background_color=background_color, colormap=colormaps[i], min_font_size=min_font_size,
-                              normalize_plurals=normalize_plurals, collocations=collocations).generate(word_strings[i])
-        plt.imshow(wordcloud, interpolation='bilinear')
+        plt.imshow(image, interpolation='bilinear')
         plt.axis('off')
 
         # Each subplot is labeled based on the text they are representing
-        plt.gca().title.set_text('Word Cloud For "' + texts[i] + '"')
+        plt.gca().title.set_text('Word Cloud For "' + text + '"')
 
     # Gives the plot an overarching title
     plt.suptitle('Overall Word Counts')
@@ -191,6 +362,23 @@ def make_word_clouds(data, colormaps=None, background_color='black', min_font_si
     plt.show()
 
 
+def _sentiment_scores(data, max_words=None):
+    """ Gets the sentiment scores of each registered file, computed from its word counts
+    Args:
+        data (dict): data extracted from the file as a dictionary attribute--> raw data
+        max_words (int): optional number of words considered from each file for analysis, based on their frequencies
+    Returns:
+        sentiment_dict (dict): maps the label of each file to its 'neg', 'neu', 'pos' and 'compound' scores
+    """
+    import nlp_sentiment
+
+    # the scores of whole files are computed once and shared by every visualization
+    if max_words is None:
+        return nlp_sentiment.cached_scores(data)
+
+    return {text: nlp_sentiment.score_counts(_words_of_interest(data, text, max_words)) for text in data['wordcount']}
+
+
 def sentiment_scatter(data, max_words=None):
     """ Scatter plot with x being the positive score of a file and y being the file's negative score
     Args:
@@ -199,8 +387,11 @@ def sentiment_scatter(data, max_words=None):
     Returns:
         None (just generates a scatter plot)
     """
+    import matplotlib.pyplot as plt
+    import numpy as np
+
     # Ensuring the data types of the inputted parameters are valid
-    assert isinstance(data, defaultdict), 'The data extracted from this file must be stored in a dictionary'
+    assert isinstance(data, Mapping), 'The data extracted from this file must be stored in a dictionary'
 
     # if max_words is given, restrict the analysis to consider only the max_words number of words in each file
     if max_words is not None:
@@ -213,19 +404,10 @@ def sentiment_scatter(data, max_words=None):
     positive_distributions = []
     negative_distributions = []
 
-    # obtain the word count dictionary of a file
-    word_count_dict = data['wordcount']
-
-    # initialize a sentiment intensity analyzer
-    sia = SentimentIntensityAnalyzer()
+    # calculate the sentiment scores (negative vs. neutral vs. positive) for each file
+    sentiment_dict = _sentiment_scores(data, max_words)
 
-    # grab the words from each file and compile them into one string per file
-    for text, word_count in word_count_dict.items():
-        words = convert_file_to_string(word_count, max_words=max_words)
-
-        # calculate the sentiment scores (negative vs. neutral vs. positive) for each file and store them in a
-        # dictionary
-        sentiment_distribution = sia.polarity_scores(words)
+    for text, sentiment_distribution in sentiment_dict.items():
         pos_score = sentiment_distribution['pos']
         neg_score = sentiment_distribution['neg']
 
@@ -267,8 +449,10 @@ def sentiment_analysis_bars(data, subplot_rows=5, subplot_columns=2, max_words=N
     Returns:
         None (just generates bar charts!)
     """
+    import matplotlib.pyplot as plt
+
     # Checking whether the types of the inputted parameters are valid
-    assert isinstance(data, defaultdict), 'The data extracted from this file must be stored in a dictionary'
+    assert isinstance(data, Mapping), 'The data extracted from this file must be stored in a dictionary'
     assert isinstance(subplot_rows, int), 'The number of rows for the subplot must be an integer'
     assert isinstance(subplot_columns, int), 'The number of columns for the subplot must be an integer'
 
@@ -276,20 +460,10 @@ def sentiment_analysis_bars(data, subplot_rows=5, subplot_columns=2, max_words=N
     texts = []
     sentiment_distributions = []
 
-    # obtain the word count dictionary of a file
-    word_count_dict = data['wordcount']
-
-    # initialize a sentiment intensity analyzer
-    sia = SentimentIntensityAnalyzer()
-
-    # grab the words from each file and compile them into one string per file
-    for text, word_count in word_count_dict.items():
-        words = convert_file_to_string(word_count, max_words=max_words)
-
-        # calculate the sentiment distributions (negative vs. neutral vs. positive) for each file and store them in a
-        # dictionary
-        sentiment_distribution = sia.polarity_scores(words)
+    # calculate the sentiment distributions (negative vs. neutral vs. positive) for each file
+    sentiment_dict = _sentiment_scores(data, max_words)
 
+    for text, sentiment_distribution in sentiment_dict.items():
         # store the names of the files as well as their sentiment distribution dictionaries
         texts.append(text)
         sentiment_distributions.append(sentiment_distribution)
@@ -328,6 +502,67 @@ def sentiment_analysis_bars(data, subplot_rows=5, subplot_columns=2, max_words=N
     plt.show()
 
 
+def _histogram_percentile(hist, q):
+    """ Computes a percentile of the values summarized by a histogram, interpolating linearly like np.percentile
+    Args:
+        hist (dict): maps each value (int) to how many times it occurs, smallest value first
+        q (float): percentile of interest, between 0 and 100
+    Returns:
+        percentile (float): the value below which q percent of the values fall
+    """
+    # position of the percentile among the sorted values, and the indices of the values on either side of it
+    num_values = sum(hist.values())
+    position = (num_values - 1) * q / 100
+    lower_index = int(position)
+    upper_index = min(lower_index + 1, num_values - 1)
+
+    # walk through the bins until the values at the two neighboring positions are found
+    lower = upper = None
+    seen = 0
+    for value, count in hist.items():
+        seen += count
+        if lower is None and lower_index < seen:
+            lower = value
+        if upper_index < seen:
+            upper = value
+            break
+
+    return lower + (position - lower_index) * (upper - lower)
+
+
+def _histogram_box_stats(hist, label=None, whis=1.5):
+    """ Computes the statistics drawn by a boxplot (quartiles, whiskers, outliers) from a histogram of word lengths
+    Args:
+        hist (dict): maps each word length (int) to how many words have that length, shortest first
+        label (str): optional label for the box
+        whis (float): whiskers reach the furthest lengths within whis times the interquartile range of the box
+    Returns:
+        stats (dict): box statistics in the format used by matplotlib's Axes.bxp
+    """
+    # make sure the histogram is sorted by length
+    hist = {length: count for length, count in sorted(hist.items()) if count > 0}
+
+    q1 = _histogram_percentile(hist, 25)
+    med = _histogram_percentile(hist, 50)
+    q3 = _histogram_percentile(hist, 75)
+    iqr = q3 - q1
+
+    # the whiskers end at the most extreme lengths that aren't outliers
+    inliers = [length for length in hist if q1 - whis * iqr <= length <= q3 + whis * iqr]
+    fliers = [length for length in hist if length < q1 - whis * iqr or length > q3 + whis * iqr]
+
+    return {
+        'label': label,
+        'q1': q1,
+        'med': med,
+        'q3': q3,
+        'whislo': min(inliers, default=q1),
+        'whishi': max(inliers, default=q3),
+        'fliers': fliers,
+        'mean': sum(length * count for length, count in hist.items()) / sum(hist.values())
+    }
+
+
 def avgwlength_boxplot(data):
     """ Creates a boxplot summarizing the word length distributions of each registered file
     Citation:
@@ -337,11 +572,13 @@ def avgwlength_boxplot(data):
     Returns:
         None (just generates a boxplot in one visualization representing all the files)
     """
+    import matplotlib.pyplot as plt
+
     # Making sure the type of the inputted parameter is valid
-    assert isinstance(data, defaultdict), 'The data extracted from this file must be stored in a dictionary'
+    assert isinstance(data, Mapping), 'The data extracted from this file must be stored in a dictionary'
 
-    # obtain the word length dictionary
-    word_length_dict = data['wordlengthlist']
+    # obtain the word length histogram dictionary
+    word_length_dict = data['wordlengthhist']
 
     # set the figure size
     plt.rcParams['figure.figsize'] = [7.50, 3.50]
@@ -351,7 +588,7 @@ def avgwlength_boxplot(data):
     fig, ax = plt.subplots()
 
     # plot the box plots summarizing the distribution of the word lengths with labels indicating the song they represent
-    ax.boxplot(word_length_dict.values())
+    ax.bxp([_histogram_box_stats(hist, label) for label, hist in word_length_dict.items()])
     ax.set_xticklabels(word_length_dict.keys(), rotation=90, fontsize=5)
     plt.xlabel('Name of Song')
     plt.ylabel('Word Length Distributions')
@@ -368,8 +605,10 @@ def avgwlength_bar(data):
     Returns:
         None (just generates a bar chart)
     """
+    import matplotlib.pyplot as plt
+
     # Ensuring that the inputted parameters are of the correct type
-    assert isinstance(data, defaultdict), 'The data extracted from this file must be stored in a dictionary'
+    assert isinstance(data, Mapping), 'The data extracted from this file must be stored in a dictionary'
 
     # obtain the average word length dictionary
     avg_wordl_dict = data['avgwordlength']
@@ -400,23 +639,25 @@ def total_wordl_boxplot(data):
     Returns:
         None (just generates a boxplot)
     """
-    # Checking the inputted parameter is of the correct type
-    assert isinstance(data, defaultdict), 'The data extracted from this file must be stored in a dictionary'
+    import matplotlib.pyplot as plt
 
-    # obtain the word length list dictionary
-    word_length_dict = data['wordlengthlist']
+    # Checking the inputted parameter is of the correct type
+    assert isinstance(data, Mapping), 'The data extracted from this file must be stored in a dictionary'
 
-    # get just the word lengths
-    total_wl_list = list(word_length_dict.values())
+    # obtain the word length histogram dictionary
+    word_length_dict = data['wordlengthhist']
 
-    # turn the 2D list into a 1D list for plotting purposes
-    total_wl_list = [item for sublist in total_wl_list for item in sublist]
+    # add up the histograms of all the files
+    total_wl_hist = defaultdict(int)
+    for hist in word_length_dict.values():
+        for length, count in hist.items():
+            total_wl_hist[length] += count
 
     # set the figure size
     plt.figure(figsize=(10, 7))
 
     # create the box plot, set the axes and title
-    plt.boxplot(total_wl_list)
+    plt.gca().bxp([_histogram_box_stats(total_wl_hist)])
     plt.ylabel('Word Length')
     plt.title('Word Length Distribution for All Files Combined')
 
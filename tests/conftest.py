@@ -0,0 +1,13 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+conftest.py: Makes the modules of the framework importable from the tests, wherever pytest is started
+"""
+# import necessary libraries
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
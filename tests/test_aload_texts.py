@@ -0,0 +1,75 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+test_aload_texts.py: Tests of the asyncio loader (Nlp.aload_texts)
+"""
+# import necessary libraries
+import asyncio
+import time
+from nlp import Nlp
+
+
+def test_timeout_ignores_time_waiting_for_a_worker(tmp_path, monkeypatch):
+    # every file takes a fifth of the timeout to process, but the last files wait for the one worker thread for far
+    # longer than the timeout
+    process_bytes = Nlp._process_bytes
+
+    def slow_process_bytes(*args, **kwargs):
+        time.sleep(0.2)
+        return process_bytes(*args, **kwargs)
+
+    monkeypatch.setattr(Nlp, '_process_bytes', staticmethod(slow_process_bytes))
+
+    files = []
+    for i in range(20):
+        path = tmp_path / 'song{}.txt'.format(i)
+        path.write_text('lyric{} word chorus'.format(i))
+        files.append(str(path))
+
+    nlp = Nlp()
+    status = asyncio.run(nlp.aload_texts(files, concurrency=20, workers=1, timeout=1, use_cache=False))
+
+    assert list(status) == files
+    assert all(status.values())
+    assert len(nlp.corpus) == 20
+
+
+def test_concurrent_calls_keep_their_own_stop_words(tmp_path):
+    files = []
+    for i in range(4):
+        path = tmp_path / 'song{}.txt'.format(i)
+        path.write_text('love story baby')
+        files.append(str(path))
+    (tmp_path / 'love.txt').write_text('love')
+    (tmp_path / 'story.txt').write_text('story')
+
+    # two frameworks with different stop words load files in the same event loop at the same time
+    first = Nlp(str(tmp_path / 'love.txt'))
+    second = Nlp(str(tmp_path / 'story.txt'))
+
+    async def load_both():
+        await asyncio.gather(first.aload_texts(files, concurrency=1, workers=1, use_cache=False),
+                             second.aload_texts(files, concurrency=1, workers=1, use_cache=False))
+
+    asyncio.run(load_both())
+
+    assert all(first.data['wordcount'][f] == {'story': 1, 'baby': 1} for f in files)
+    assert all(second.data['wordcount'][f] == {'love': 1, 'baby': 1} for f in files)
+
+
+def test_results_match_load_texts(tmp_path):
+    files = []
+    for i in range(5):
+        path = tmp_path / 'song{}.txt'.format(i)
+        path.write_text('Love story, baby just say yes\nlove {} story'.format(i))
+        files.append(str(path))
+
+    expected = Nlp()
+    expected.load_texts(files, workers=1, use_cache=False)
+    nlp = Nlp()
+    asyncio.run(nlp.aload_texts(files, concurrency=2, workers=1, use_cache=False))
+
+    assert all(nlp.data['wordcount'][f] == expected.data['wordcount'][f] for f in files)
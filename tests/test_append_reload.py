@@ -0,0 +1,88 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+test_append_reload.py: Tests of appending to growing files and of registering documents again from their files
+(Nlp.load_text with append, and Nlp.reload_text)
+"""
+# import necessary libraries
+import os
+import pytest
+from exception import ReloadTextError
+from nlp import Nlp
+
+
+def test_append_only_reads_new_lines(tmp_path):
+    log = tmp_path / 'log.txt'
+    log.write_text('love story\n')
+    nlp = Nlp()
+    nlp.load_text(str(log), 'log', append=True)
+
+    with open(log, 'a') as output:
+        output.write('love song\nunfinished')
+    nlp.load_text(str(log), 'log', append=True)
+
+    # the last line is still being written, so it is left for the next read
+    assert dict(nlp.data['wordcount']['log']) == {'love': 2, 'story': 1, 'song': 1}
+
+
+def test_truncated_file_is_read_from_the_start(tmp_path):
+    log = tmp_path / 'log.txt'
+    log.write_text('love story\nlove song\n')
+    nlp = Nlp()
+    nlp.load_text(str(log), 'log', append=True)
+
+    log.write_text('gray\n')
+    nlp.load_text(str(log), 'log', append=True)
+
+    assert dict(nlp.data['wordcount']['log']) == {'gray': 1}
+
+
+@pytest.mark.parametrize('in_place', [False, True])
+def test_replaced_longer_file_is_read_from_the_start(tmp_path, in_place):
+    log = tmp_path / 'log.txt'
+    log.write_text('love story\n')
+    nlp = Nlp()
+    nlp.load_text(str(log), 'log', append=True)
+
+    # a rotated log that is already longer than what was read before
+    if in_place:
+        log.write_text('paris paris paris\nmidnight rain\n')
+    else:
+        rotated = tmp_path / 'rotated.txt'
+        rotated.write_text('paris paris paris\nmidnight rain\n')
+        os.replace(rotated, log)
+    nlp.load_text(str(log), 'log', append=True)
+
+    assert dict(nlp.data['wordcount']['log']) == {'paris': 3, 'midnight': 1, 'rain': 1}
+
+
+def test_failed_reload_keeps_the_document(tmp_path):
+    nlp = Nlp()
+    for name in ('red', 'lover', 'folklore'):
+        song = tmp_path / (name + '.txt')
+        song.write_text(name + ' love story')
+        nlp.load_text(str(song), name, use_cache=False)
+    source = dict(nlp.sources['lover'])
+    os.remove(tmp_path / 'lover.txt')
+
+    with pytest.raises(ReloadTextError):
+        nlp.reload_text('lover')
+
+    assert list(nlp.corpus) == ['red', 'lover', 'folklore']
+    assert dict(nlp.data['wordcount']['lover']) == {'lover': 1, 'love': 1, 'story': 1}
+    assert nlp.sources['lover'] == source
+
+
+def test_reload_picks_up_changes(tmp_path):
+    song = tmp_path / 'red.txt'
+    song.write_text('love story')
+    nlp = Nlp()
+    nlp.load_text(str(song), 'red', use_cache=False)
+
+    song.write_text('all too well')
+    nlp.reload_text('red')
+
+    assert dict(nlp.data['wordcount']['red']) == {'well': 1}
@@ -0,0 +1,43 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+test_cache.py: Tests of the on-disk cache of data results (nlp_cache.ResultCache)
+"""
+# import necessary libraries
+import os
+import subprocess
+import sys
+from nlp_cache import ResultCache
+
+# script printing the cache key of a file parsed with a custom parser function
+_PARSER_KEY = '''
+import sys
+from nlp_cache import ResultCache
+from nlp_parsers import custom_parser
+print(ResultCache.key(sys.argv[1], custom_parser, 'text'))
+'''
+
+
+def test_overwritten_entry_keeps_size_exact(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache'))
+    cache.put('a', {'wordcount': {'love': 1}})
+    cache.put('b', {'wordcount': {'story': 2}})
+
+    for _ in range(5):
+        cache.put('a', {'wordcount': {'love': 1}})
+
+    assert cache._size == cache.size()
+
+
+def test_callable_setting_key_is_stable_across_processes(tmp_path):
+    song = tmp_path / 'song.txt'
+    song.write_text('love story')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    keys = {subprocess.run([sys.executable, '-c', _PARSER_KEY, str(song)], cwd=root, capture_output=True, text=True,
+                           check=True).stdout for _ in range(2)}
+
+    assert len(keys) == 1
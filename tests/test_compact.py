@@ -0,0 +1,55 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+test_compact.py: Tests of the compact storage of word counts (nlp_compact.CompactWordCounts)
+"""
+# import necessary libraries
+from collections import Counter
+from nlp_compact import CompactWordCounts
+
+
+def test_unloaded_words_leave_the_matrix():
+    word_counts = CompactWordCounts()
+    word_counts['red'] = Counter(love=3, gray=1, mine=2)
+    word_counts['lover'] = Counter(mine=5, paris=2)
+    word_counts['folklore'] = Counter(cardigan=4, love=1)
+    held = word_counts['red']
+
+    del word_counts['red']
+    matrix = word_counts.matrix()
+
+    assert sorted(word_counts.vocab.words) == ['cardigan', 'love', 'mine', 'paris']
+    assert matrix.shape == (2, 4)
+    assert dict(word_counts['lover'].items()) == {'mine': 5, 'paris': 2}
+    assert dict(word_counts['folklore'].items()) == {'cardigan': 4, 'love': 1}
+
+    # a view of the unloaded document that is still held elsewhere keeps its words
+    assert dict(held.items()) == {'love': 3, 'gray': 1, 'mine': 2}
+
+
+def test_replaced_document_releases_its_words():
+    word_counts = CompactWordCounts()
+    word_counts['red'] = Counter(love=3, gray=1)
+    word_counts['red'] = Counter(story=2)
+
+    assert word_counts.matrix().shape == (1, 1)
+    assert word_counts.vocab.words == ['story']
+
+
+def test_unused_words_are_counted_as_documents_come_and_go():
+    word_counts = CompactWordCounts()
+    word_counts['red'] = Counter(love=3, gray=1)
+    word_counts['lover'] = Counter(love=1, paris=2)
+    word_counts['folklore'] = Counter(cardigan=1)
+    word_counts['evermore'] = Counter(willow=1)
+
+    del word_counts['red']
+    assert word_counts.vocab.unused == 1
+
+    # a word that is used again is no longer counted as unused
+    word_counts['reputation'] = Counter(gray=2)
+    assert word_counts.vocab.unused == 0
+    assert word_counts.matrix().shape == (4, 5)
@@ -0,0 +1,52 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+test_corpus.py: Tests of the registered documents and of their read-only data view (nlp_corpus)
+"""
+# import necessary libraries
+from collections import Counter
+from collections.abc import Mapping
+import pytest
+from nlp_corpus import Corpus, Document
+
+
+def _corpus():
+    corpus = Corpus()
+    corpus.add(Document('red', {'wordcount': Counter(love=3, story=1), 'bigramcount': Counter({'love story': 1})}))
+    corpus.add(Document('lover', {'wordcount': Counter(paris=2)}))
+    corpus.register_metric('numwords', lambda word_count: sum(word_count.values()))
+    return corpus
+
+
+def test_unknown_names_give_an_empty_mapping():
+    data = _corpus().view
+
+    assert isinstance(data, Mapping)
+    assert dict(data['missing']) == {}
+    assert 'missing' not in data
+    assert list(data) == ['wordcount', 'bigramcount', 'numwords']
+
+
+def test_counts_view_counts_the_documents_holding_each_kind():
+    corpus = _corpus()
+
+    assert len(corpus.view['wordcount']) == 2
+    assert len(corpus.view['bigramcount']) == 1
+    assert list(corpus.view['bigramcount']) == ['red']
+
+    corpus.remove('red')
+    assert 'bigramcount' not in corpus.view
+    assert len(corpus.view['wordcount']) == 1
+
+
+def test_statistics_are_stored_through_the_corpus():
+    corpus = _corpus()
+    corpus.store_statistics('numwords', {'red': 100})
+
+    assert corpus.view['numwords']['red'] == 100
+    assert corpus.view['numwords']['lover'] == 2
+    with pytest.raises(AttributeError):
+        corpus.view['numwords'].update({'red': 1})
@@ -0,0 +1,42 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+test_load_texts.py: Tests of registering several documents at once (Nlp.load_texts and Nlp.aload_texts)
+"""
+# import necessary libraries
+import asyncio
+import pytest
+from nlp import Nlp
+
+
+def _songs(tmp_path, count):
+    files = []
+    for i in range(count):
+        song = tmp_path / 'song{}.txt'.format(i)
+        song.write_text('love story number {}'.format(i))
+        files.append(str(song))
+    return files
+
+
+def test_duplicate_labels_are_rejected(tmp_path):
+    files = _songs(tmp_path, 2)
+    nlp = Nlp()
+
+    with pytest.raises(AssertionError):
+        nlp.load_texts(files, labels=['song', 'song'], workers=1, use_cache=False)
+    with pytest.raises(AssertionError):
+        asyncio.run(nlp.aload_texts(files, labels=['song', 'song'], workers=1, use_cache=False))
+    with pytest.raises(AssertionError):
+        asyncio.run(nlp.aload_texts(iter(files + files[:1]), workers=1, use_cache=False))
+
+
+def test_status_follows_the_given_order(tmp_path):
+    files = _songs(tmp_path, 3)
+    nlp = Nlp()
+
+    status = nlp.load_texts(files + [str(tmp_path / 'missing.txt')], workers=1, use_cache=False)
+
+    assert list(status.values()) == [True, True, True, False]
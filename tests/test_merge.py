@@ -0,0 +1,84 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+test_merge.py: Tests of combining frameworks (Nlp.merge and Nlp.reduce) and of building one from shards of files
+(nlp_mapreduce.build_corpus)
+"""
+# import necessary libraries
+import pytest
+from exception import MergeError
+from nlp import Nlp
+import nlp_mapreduce
+
+
+def _framework(tmp_path, texts, stopfile=None):
+    nlp = Nlp(stopfile)
+    for label, text in texts.items():
+        song = tmp_path / '{}{}.txt'.format(label, len(list(tmp_path.iterdir())))
+        song.write_text(text)
+        nlp.load_text(str(song), label, use_cache=False)
+    return nlp
+
+
+def test_sum_adds_up_the_counts_and_keeps_the_statistics_exact(tmp_path):
+    nlp = _framework(tmp_path, {'song': 'love story baby', 'other': 'shake it off'})
+    numwords = nlp.data['numwords']['song']
+    avgwordlength = nlp.data['avgwordlength']['song']
+
+    nlp.merge(_framework(tmp_path, {'song': 'love story baby'}), on_collision='sum')
+
+    assert nlp.data['wordcount']['song'] == {'love': 2, 'story': 2, 'baby': 2}
+    assert nlp.data['numwords']['song'] == 2 * numwords
+    assert nlp.data['avgwordlength']['song'] == avgwordlength
+    assert list(nlp.corpus) == ['other', 'song']
+
+
+@pytest.mark.parametrize('on_collision, expected', [('keep', {'love': 1, 'story': 1}), ('replace', {'shake': 1})])
+def test_keep_and_replace_take_one_of_the_documents(tmp_path, on_collision, expected):
+    nlp = _framework(tmp_path, {'song': 'love story'})
+    nlp.merge(_framework(tmp_path, {'song': 'shake', 'other': 'baby'}), on_collision=on_collision)
+
+    assert nlp.data['wordcount']['song'] == expected
+    assert nlp.data['wordcount']['other'] == {'baby': 1}
+
+
+def test_error_refuses_collisions_and_leaves_the_framework_unchanged(tmp_path):
+    nlp = _framework(tmp_path, {'song': 'love story'})
+
+    with pytest.raises(MergeError):
+        nlp.merge(_framework(tmp_path, {'other': 'baby', 'song': 'shake'}))
+
+    assert list(nlp.corpus) == ['song']
+    assert nlp.data['wordcount']['song'] == {'love': 1, 'story': 1}
+
+
+def test_stop_words_are_compared_by_their_words(tmp_path):
+    for name, words in [('stop.txt', 'love'), ('copy.txt', 'love'), ('other.txt', 'story')]:
+        (tmp_path / name).write_text(words)
+    nlp = _framework(tmp_path, {'song': 'love story'}, str(tmp_path / 'stop.txt'))
+
+    # a copy of the stop file at another path holds the same stop words
+    nlp.merge(_framework(tmp_path, {'copy': 'love story'}, str(tmp_path / 'copy.txt')))
+    with pytest.raises(MergeError):
+        nlp.merge(_framework(tmp_path, {'other': 'love story'}, str(tmp_path / 'other.txt')))
+
+    assert list(nlp.corpus) == ['song', 'copy']
+
+
+def test_build_corpus_matches_load_texts(tmp_path):
+    files = []
+    for i in range(5):
+        song = tmp_path / 'song{}.txt'.format(i)
+        song.write_text('Love story, baby just say yes\nlove {} story'.format(i))
+        files.append(str(song))
+
+    expected = Nlp()
+    expected.load_texts(files, workers=1, use_cache=False)
+    nlp, status = nlp_mapreduce.build_corpus(files, shards=2, workers=2)
+
+    assert list(status) == files and all(status.values())
+    assert list(nlp.corpus) == files
+    assert all(dict(nlp.data['wordcount'][f].items()) == expected.data['wordcount'][f] for f in files)
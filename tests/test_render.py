@@ -0,0 +1,63 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+test_render.py: Tests of rendering the visualizations without a display (Nlp.render)
+"""
+# import necessary libraries
+import os
+from nlp import Nlp
+
+
+def failing_plot(data):
+    # draws a figure, then fails before showing it
+    import matplotlib.pyplot as plt
+    plt.figure()
+    plt.plot([1, 2, 3])
+    raise ValueError('broken visualization')
+
+
+def good_plot(data):
+    import matplotlib.pyplot as plt
+    plt.figure()
+    plt.bar(['a', 'b'], [1, 2])
+    plt.show()
+
+
+def test_failed_visualization_leaves_no_figures_behind(tmp_path):
+    song = tmp_path / 'song.txt'
+    song.write_text('love story baby just say yes')
+    nlp = Nlp()
+    nlp.load_text(str(song), 'song', use_cache=False)
+    nlp.load_visualization('broken', failing_plot)
+    nlp.load_visualization('good', good_plot)
+
+    # one worker renders both visualizations, one after the other
+    report = nlp.render(str(tmp_path / 'figures'), workers=1)
+
+    assert report['broken']['error'] == 'broken visualization'
+    assert report['broken']['files'] == []
+    assert report['good']['error'] is None
+    assert sorted(os.listdir(tmp_path / 'figures')) == ['good.png']
+
+
+def record_data(data, path):
+    # notes which copy of the data the visualization received
+    with open(path, 'a') as output:
+        output.write(str(id(data)) + '\n')
+
+
+def test_data_is_sent_to_each_worker_once(tmp_path):
+    song = tmp_path / 'song.txt'
+    song.write_text('love story baby just say yes')
+    nlp = Nlp()
+    nlp.load_text(str(song), 'song', use_cache=False)
+    for name in ('first', 'second', 'third'):
+        nlp.load_visualization(name, record_data, str(tmp_path / 'ids.txt'))
+
+    report = nlp.render(str(tmp_path / 'figures'), workers=1)
+
+    assert all(viz_report['error'] is None for viz_report in report.values())
+    assert len(set((tmp_path / 'ids.txt').read_text().split())) == 1
@@ -0,0 +1,41 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+test_sentiment.py: Tests of scoring the sentiment of the registered texts (nlp_sentiment)
+"""
+# import necessary libraries
+from collections import Counter, defaultdict
+import nlp_sentiment
+
+
+def _word_counts():
+    return {'red': Counter(love=3, sad=1), 'lover': Counter(happy=2, hate=1)}
+
+
+def test_plain_dict_without_sentiment_is_scored_and_left_alone():
+    data = {'wordcount': _word_counts()}
+
+    scores = nlp_sentiment.cached_scores(data)
+
+    assert scores == nlp_sentiment.score_corpus(data['wordcount'])
+    assert list(data) == ['wordcount']
+    assert nlp_sentiment.cached_scores(data, ['lover']) == {'lover': scores['lover']}
+
+
+def test_defaultdict_without_sentiment_is_not_changed():
+    data = defaultdict(dict, wordcount=_word_counts())
+
+    nlp_sentiment.cached_scores(data)
+
+    assert list(data) == ['wordcount']
+
+
+def test_scores_are_stored_when_there_is_a_sentiment_entry():
+    data = {'wordcount': _word_counts(), 'sentiment': {}}
+
+    scores = nlp_sentiment.cached_scores(data)
+
+    assert data['sentiment'] == scores
@@ -0,0 +1,56 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+test_snapshot.py: Tests of saving the registered documents as a snapshot and reopening it (Nlp.save and Nlp.open)
+"""
+# import necessary libraries
+import pytest
+from exception import SnapshotError
+from nlp import Nlp
+import nlp_snapshot
+
+
+def _framework(tmp_path, compact):
+    nlp = Nlp(compact=compact)
+    for i, text in enumerate(['love story baby say yes', 'love me like you do', 'shake it off story']):
+        song = tmp_path / 'song{}.txt'.format(i)
+        song.write_text(text)
+        nlp.load_text(str(song), 'song{}'.format(i), use_cache=False)
+    return nlp
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_open_keeps_the_storage_it_was_saved_with(tmp_path, compact):
+    nlp = _framework(tmp_path, compact)
+    nlp.save(str(tmp_path / 'snapshot'))
+
+    opened = Nlp.open(str(tmp_path / 'snapshot'))
+
+    assert opened.compact == compact
+    assert (opened.corpus.compact is not None) == compact
+    assert all(dict(opened.data['wordcount'][label].items()) == dict(nlp.data['wordcount'][label].items())
+               for label in nlp.corpus)
+
+
+def test_open_rejects_a_conflicting_storage(tmp_path):
+    _framework(tmp_path, True).save(str(tmp_path / 'snapshot'))
+
+    with pytest.raises(SnapshotError):
+        Nlp.open(str(tmp_path / 'snapshot'), compact=False)
+
+
+def test_unloaded_words_are_not_saved(tmp_path):
+    nlp = _framework(tmp_path, True)
+    nlp.unload_text('song1')
+    nlp.save(str(tmp_path / 'snapshot'))
+
+    path = str(tmp_path / 'snapshot')
+    saved = nlp_snapshot.documents(path, nlp_snapshot.read_manifest(path))
+    words = set(nlp.data['wordcount']['song0']) | set(nlp.data['wordcount']['song2'])
+
+    # the vocabulary written to the snapshot only holds the words of the documents that are still registered
+    assert sorted(saved['song0']['wordcount'].vocab.words) == sorted(words)
+    assert 'like' not in saved['song0']['wordcount'].vocab
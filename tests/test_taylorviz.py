@@ -0,0 +1,42 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+test_taylorviz.py: Tests of the visualizations of the registered documents
+"""
+# import necessary libraries
+import os
+import subprocess
+import sys
+from collections import Counter
+import taylorviz as tviz
+
+# script printing the node labels of a Sankey diagram of two small documents
+_SANKEY_NODES = '''
+from collections import Counter
+import taylorviz as tviz
+data = {'wordcount': {'red': Counter(love=3, gray=1, mine=2, story=2), 'lover': Counter(mine=5, love=1, paris=2)}}
+print(tviz.wordcount_sankey(data, word_list=['story', 'paris', 'love', 'mine', 'gray'], k=None, render=False)['labels'])
+'''
+
+
+def test_sankey_node_order():
+    data = {'wordcount': {'red': Counter(love=3, gray=1, mine=2, story=2), 'lover': Counter(mine=5, love=1, paris=2)}}
+    links = tviz.wordcount_sankey(data, word_list=['story', 'paris', 'love', 'mine', 'gray'], k=None, render=False)
+
+    # the texts, then the words of each text from most to least frequent (ties in the order of the word list)
+    assert links['labels'] == ['red', 'lover', 'love', 'story', 'mine', 'gray', 'paris']
+
+
+def test_sankey_node_order_ignores_hash_seed():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    outputs = set()
+
+    for seed in ('1', '2', '3'):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        outputs.add(subprocess.run([sys.executable, '-c', _SANKEY_NODES], cwd=root, env=env, capture_output=True,
+                                   text=True, check=True).stdout)
+
+    assert len(outputs) == 1
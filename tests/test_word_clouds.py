@@ -0,0 +1,42 @@
+"""
+Jethro R. Lee and Michelle Wang
+DS 3500
+Reusable NLP Library - HW3
+2/27/2023
+
+test_word_clouds.py: Tests of the word clouds drawn from the word counts of the registered texts
+"""
+# import necessary libraries
+from collections import Counter
+import pytest
+import taylorviz as tviz
+
+# word counts covering what WordCloud does to a text: possessives, numbers, its own stop words, plurals (and words
+# ending in 'ss'), apostrophes and one-letter words
+_WORD_COUNTS = Counter({'love': 3, 'loves': 2, 'story': 1, "taylor's": 2, 'taylor': 1, '1989': 4, 'the': 5,
+                        'glass': 1, 'glas': 1, "don't": 2, 'a': 3, 'i': 1, 'dress': 2, 'dres': 1, 'red': 1})
+
+
+@pytest.mark.parametrize('normalize_plurals', [True, False])
+def test_frequencies_match_wordcloud(normalize_plurals):
+    from wordcloud import WordCloud
+
+    # WordCloud drawing the text that the word counts came from
+    expected = WordCloud(collocations=False, normalize_plurals=normalize_plurals).process_text(
+        tviz.convert_file_to_string(_WORD_COUNTS))
+
+    assert tviz._cloud_frequencies(_WORD_COUNTS, normalize_plurals) == expected
+
+
+def test_cache_forgets_the_least_recently_used_cloud(monkeypatch):
+    monkeypatch.setattr(tviz, '_WORD_CLOUD_CACHE', type(tviz._WORD_CLOUD_CACHE)())
+    monkeypatch.setattr(tviz, '_WORD_CLOUD_CACHE_SIZE', 2)
+
+    tviz._remember_cloud('red', 1)
+    tviz._remember_cloud('lover', 2)
+    assert tviz._cached_cloud('red') == 1
+
+    # lover is the least recently used cloud once red was reused
+    tviz._remember_cloud('folklore', 3)
+    assert list(tviz._WORD_CLOUD_CACHE) == ['red', 'folklore']
+    assert tviz._cached_cloud('lover') is None